@@ -1,16 +1,57 @@
 from flask import Blueprint
+from app.utils.health import get_health_checker
 from .endpoints.products import products_bp
+from .endpoints.locations import locations_bp
+from .endpoints.stock import stock_bp
+from .endpoints.reservations import reservations_bp
+from .endpoints.lots import lots_bp
+from .endpoints.suppliers import suppliers_bp
+from .endpoints.purchasing import purchasing_bp
+from .endpoints.jobs import jobs_bp
+from .endpoints.admin import admin_bp
+from .endpoints.exports import exports_bp
+from .endpoints.analytics import analytics_bp
 
 # Crear un Blueprint principal para la versión 1 de la API
 api_v1 = Blueprint('api_v1', __name__, url_prefix='/api/v1')
 
 # Registrar los endpoints
 api_v1.register_blueprint(products_bp, url_prefix='/products')
+api_v1.register_blueprint(locations_bp, url_prefix='/locations')
+api_v1.register_blueprint(stock_bp, url_prefix='/stock')
+api_v1.register_blueprint(reservations_bp, url_prefix='/reservations')
+api_v1.register_blueprint(lots_bp, url_prefix='/lots')
+api_v1.register_blueprint(suppliers_bp, url_prefix='/suppliers')
+api_v1.register_blueprint(purchasing_bp, url_prefix='/purchase-suggestions')
+api_v1.register_blueprint(jobs_bp, url_prefix='/jobs')
+api_v1.register_blueprint(admin_bp, url_prefix='/admin')
+api_v1.register_blueprint(exports_bp, url_prefix='/exports')
+api_v1.register_blueprint(analytics_bp, url_prefix='/analytics')
 
 # Definir una ruta para verificar el estado de la API
 @api_v1.route('/health', methods=['GET'])
 def health_check():
     """
     Endpoint para verificar el estado de la API.
+    No comprueba dependencias: para los balanceadores, /health/ready.
     """
     return {'status': 'ok', 'version': '1.0.0'}, 200
+
+
+@api_v1.route('/health/live', methods=['GET'])
+def liveness_check():
+    """
+    Liveness: el proceso atiende peticiones. No toca la base de datos, para que una caída
+    de esta no haga reiniciar todos los procesos.
+    """
+    return {'status': 'ok'}, 200
+
+
+@api_v1.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness: base de datos, pools, colas y migraciones (resultado en caché unos segundos).
+    Responde 503 si alguna comprobación falla, para que el balanceador deje de enviar tráfico.
+    """
+    ready, report = get_health_checker().readiness()
+    return report, 200 if ready else 503, {'Cache-Control': 'no-store'}
@@ -0,0 +1,94 @@
+# app/api/v1/endpoints/admin.py
+from flask import Blueprint, Response, request, jsonify
+from app.utils.profiling import ProfilerBusy, sample_stacks, collapsed_text, top_functions, get_request_profile
+from app.utils.security import admin_required
+from app.services.alert_service import get_alert_dispatcher
+from app.api.v1.endpoints.jobs import enqueue_job
+
+# Crear un Blueprint para los endpoints de administración
+admin_bp = Blueprint('admin', __name__)
+
+MAX_PROFILE_SECONDS = 300
+# Más allá de esto el muestreo ocuparía un hilo de peticiones: se hace como trabajo (async=true)
+MAX_SYNC_PROFILE_SECONDS = 10
+
+
+@admin_bp.route('/profile', methods=['GET'])
+@admin_required
+def profile():
+    """
+    Muestrea las pilas de todos los hilos del proceso durante `seconds` segundos.
+    format=collapsed (por defecto) devuelve pilas colapsadas para flamegraph; format=json, las funciones más costosas.
+    Hasta MAX_SYNC_PROFILE_SECONDS responde en la propia petición; con async=true se encola como
+    trabajo profile_sample (hasta MAX_PROFILE_SECONDS) y responde 202 con la URL para consultarlo.
+    """
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval_ms = float(request.args.get('interval_ms', 5))
+        output_format = request.args.get('format', 'collapsed')
+        run_async = request.args.get('async', 'false').lower() == 'true'
+
+        if not 0 < seconds <= MAX_PROFILE_SECONDS or not 1 <= interval_ms <= 1000 \
+                or output_format not in ('collapsed', 'json'):
+            return jsonify({
+                'error': 'Parámetros de perfilado inválidos'
+            }), 400
+        if seconds > MAX_SYNC_PROFILE_SECONDS and not run_async:
+            return jsonify({
+                'error': f'Los perfilados de más de {MAX_SYNC_PROFILE_SECONDS} s se ejecutan como trabajo: use async=true'
+            }), 400
+
+        if run_async:
+            return enqueue_job('profile_sample', {
+                'seconds': seconds, 'interval_ms': interval_ms, 'format': output_format
+            })
+
+        stacks = sample_stacks(seconds, interval_ms / 1000.0)
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de perfilado inválidos'
+        }), 400
+    except ProfilerBusy:
+        return jsonify({
+            'error': 'Ya hay un perfilado en curso'
+        }), 409
+
+    if output_format == 'json':
+        return jsonify({
+            'seconds': seconds,
+            'samples': sum(stacks.values()),
+            'functions': top_functions(stacks)
+        }), 200
+    return Response(collapsed_text(stacks), mimetype='text/plain'), 200
+
+
+@admin_bp.route('/profile/<profile_id>', methods=['GET'])
+@admin_required
+def get_profile(profile_id: str):
+    """
+    Obtiene el informe cProfile de una petición perfilada con la cabecera X-Profile.
+    """
+    report = get_request_profile(profile_id)
+    if report is None:
+        return jsonify({
+            'error': 'Perfil no encontrado'
+        }), 404
+    return Response(report, mimetype='text/plain'), 200
+
+
+@admin_bp.route('/alerts/digest', methods=['POST'])
+@admin_required
+def send_alert_digest():
+    """
+    Adelanta el próximo resumen de alertas de stock (se envía en segundo plano).
+    """
+    dispatcher = get_alert_dispatcher()
+    if dispatcher is None or not dispatcher.is_alive():
+        return jsonify({
+            'error': 'El despachador de alertas no está activo'
+        }), 503
+    dispatcher.request_digest()
+    return jsonify({
+        'recipients': len(dispatcher.recipients),
+        'pending_deliveries': dispatcher.pending_deliveries
+    }), 202
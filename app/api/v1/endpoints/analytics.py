@@ -0,0 +1,50 @@
+# app/api/v1/endpoints/analytics.py
+from flask import Blueprint, request, jsonify
+from app.schemas.analytics import ClassificationRequest
+from app.services.analytics_service import AnalyticsService
+from app.api.v1.endpoints.jobs import enqueue_job
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para la analítica de inventario
+analytics_bp = Blueprint('analytics', __name__)
+
+
+@analytics_bp.route('/classification', methods=['POST'])
+def classify_products():
+    """
+    Reclasifica el catálogo completo (ABC por valor de consumo, XYZ por variabilidad de la demanda).
+    Con ?async=true se encola como trabajo y responde 202.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json(silent=True) or {}
+
+        options = ClassificationRequest(**data)
+        if request.args.get('async', 'false').lower() == 'true':
+            return enqueue_job('inventory_classification', options.model_dump())
+
+        result = AnalyticsService.classify_products(db, options)
+        return jsonify(result.model_dump()), 200
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al clasificar los productos'
+        }), 500
+
+
+@analytics_bp.route('/classification', methods=['GET'])
+def get_classification():
+    """
+    Obtiene cuántos productos hay en cada clase ABC/XYZ.
+    """
+    try:
+        db = next(get_db())
+        return jsonify(AnalyticsService.get_classification_summary(db).model_dump(exclude={'parameters', 'seconds'})), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar la clasificación'
+        }), 500
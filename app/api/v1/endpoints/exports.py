@@ -0,0 +1,89 @@
+# app/api/v1/endpoints/exports.py
+import os
+from flask import Blueprint, request, jsonify, send_file
+from app.services.export_service import ExportService, ExportUnavailable, EXPORT_FORMATS
+from app.api.v1.endpoints.jobs import enqueue_job
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para las exportaciones analíticas
+exports_bp = Blueprint('exports', __name__)
+
+_MIMETYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
+@exports_bp.route('', methods=['POST'])
+def create_export():
+    """
+    Genera una instantánea columnar (format=parquet|arrow) del catálogo y del registro de movimientos.
+    Con ?async=true se encola como trabajo y responde 202.
+    """
+    export_format = request.args.get('format', 'parquet')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'error': f'Formato de exportación no soportado: {export_format}'
+        }), 400
+
+    if request.args.get('async', 'false').lower() == 'true':
+        return enqueue_job('export_snapshot', {'format': export_format})
+
+    try:
+        manifest = ExportService.create_snapshot(export_format=export_format)
+        return jsonify(manifest), 201
+    except ExportUnavailable as e:
+        return jsonify({
+            'error': str(e)
+        }), 503
+    except (SQLAlchemyError, OSError) as e:
+        return jsonify({
+            'error': 'Error al generar la exportación'
+        }), 500
+
+
+@exports_bp.route('', methods=['GET'])
+def list_exports():
+    """
+    Lista las instantáneas disponibles, de la más reciente a la más antigua.
+    """
+    return jsonify(ExportService.list_snapshots()), 200
+
+
+def _snapshot_or_404(snapshot_id: str):
+    if snapshot_id == 'latest':
+        return ExportService.get_latest_snapshot()
+    return ExportService.get_snapshot(snapshot_id)
+
+
+@exports_bp.route('/<snapshot_id>', methods=['GET'])
+def get_export(snapshot_id: str):
+    """
+    Obtiene el manifiesto de una instantánea (o de la más reciente con 'latest').
+    """
+    manifest = _snapshot_or_404(snapshot_id)
+    if manifest is None:
+        return jsonify({
+            'error': 'Exportación no encontrada'
+        }), 404
+    return jsonify(manifest), 200
+
+
+@exports_bp.route('/<snapshot_id>/<table_name>', methods=['GET'])
+def download_export(snapshot_id: str, table_name: str):
+    """
+    Descarga el fichero de una tabla de una instantánea (o de la más reciente con 'latest').
+    """
+    manifest = _snapshot_or_404(snapshot_id)
+    path = ExportService.get_snapshot_file(manifest['id'], table_name) if manifest else None
+    if path is None:
+        return jsonify({
+            'error': 'Exportación no encontrada'
+        }), 404
+
+    return send_file(
+        os.path.abspath(path),
+        mimetype=_MIMETYPES[manifest['format']],
+        as_attachment=True,
+        download_name=f"{manifest['id']}-{os.path.basename(path)}",
+    )
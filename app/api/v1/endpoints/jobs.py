@@ -0,0 +1,129 @@
+# app/api/v1/endpoints/jobs.py
+from flask import Blueprint, request, jsonify, url_for
+from app.schemas.job import JobCreate, JobResponse
+from app.services.job_service import JobService, JobQueueFull, JOB_HANDLERS, get_job_runner
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para los endpoints de trabajos en segundo plano
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def enqueue_job(job_type: str, params: dict):
+    """
+    Encola un trabajo y arma la respuesta 202 con la URL para consultar su estado.
+    Compartido por los endpoints que ofrecen ejecución asíncrona.
+    """
+    runner = get_job_runner()
+    if runner is None:
+        return jsonify({
+            'error': 'El ejecutor de trabajos no está disponible'
+        }), 503
+    try:
+        job_id = runner.submit(job_type, params)
+    except JobQueueFull:
+        return jsonify({
+            'error': 'Demasiados trabajos en cola, intente más tarde'
+        }), 503, {'Retry-After': '5'}
+
+    db = next(get_db())
+    job = JobService.get_job(db, job_id)
+    location = url_for('api_v1.jobs.get_job', job_id=job_id)
+    return jsonify(JobResponse.model_validate(job).model_dump()), 202, {'Location': location}
+
+
+@jobs_bp.route('', methods=['POST'])
+def create_job():
+    """
+    Encola un trabajo en segundo plano.
+    """
+    try:
+        data = request.get_json()
+        job_create = JobCreate(**data)
+        return enqueue_job(job_create.type, job_create.params)
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al encolar el trabajo'
+        }), 500
+
+
+@jobs_bp.route('', methods=['GET'])
+def get_jobs():
+    """
+    Obtiene la lista de trabajos, filtrable por status.
+    """
+    try:
+        db = next(get_db())
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+        status = request.args.get('status')
+
+        if skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de paginación inválidos'
+            }), 400
+
+        jobs = JobService.get_jobs(db, status, skip, limit)
+        return jsonify([JobResponse.model_validate(job).model_dump() for job in jobs]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de paginación inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar trabajos'
+        }), 500
+
+
+@jobs_bp.route('/types', methods=['GET'])
+def get_job_types():
+    """
+    Obtiene los tipos de trabajo registrados.
+    """
+    return jsonify(sorted(JOB_HANDLERS)), 200
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    """
+    Obtiene el estado, progreso y resultado de un trabajo.
+    """
+    try:
+        db = next(get_db())
+        job = JobService.get_job(db, job_id)
+
+        if job is None:
+            return jsonify({
+                'error': 'Trabajo no encontrado'
+            }), 404
+
+        return jsonify(JobResponse.model_validate(job).model_dump()), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar el trabajo'
+        }), 500
+
+
+@jobs_bp.route('/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id: str):
+    """
+    Solicita la cancelación de un trabajo.
+    """
+    try:
+        db = next(get_db())
+        job = JobService.cancel_job(db, job_id)
+
+        if job is None:
+            return jsonify({
+                'error': 'Trabajo no encontrado'
+            }), 404
+
+        return jsonify(JobResponse.model_validate(job).model_dump()), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al cancelar el trabajo'
+        }), 500
@@ -0,0 +1,206 @@
+# app/api/v1/endpoints/locations.py
+from flask import Blueprint, request, jsonify
+from app.schemas.location import (
+    LocationCreate, LocationResponse, OpeningBalanceCreate, OpeningBalanceResult, StockBalanceResponse,
+    StockBalanceUpdate
+)
+from app.services.location_service import LocationService
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para los endpoints de ubicaciones
+locations_bp = Blueprint('locations', __name__)
+
+
+@locations_bp.route('', methods=['GET'])
+def get_locations():
+    """
+    Obtiene la lista de ubicaciones.
+    """
+    try:
+        db = next(get_db())
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+
+        if skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de paginación inválidos'
+            }), 400
+
+        locations = LocationService.get_locations(db, skip, limit)
+        return jsonify([LocationResponse.model_validate(location).model_dump() for location in locations]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de paginación inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar ubicaciones'
+        }), 500
+
+
+@locations_bp.route('', methods=['POST'])
+def create_location():
+    """
+    Crea una nueva ubicación.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        location_create = LocationCreate(**data)
+        new_location = LocationService.create_location(db, location_create)
+        return jsonify(LocationResponse.model_validate(new_location).model_dump()), 201
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al crear la ubicación'
+        }), 500
+
+
+@locations_bp.route('/<int:location_id>', methods=['GET'])
+def get_location(location_id: int):
+    """
+    Obtiene una ubicación por su ID.
+    """
+    try:
+        db = next(get_db())
+        location = LocationService.get_location_by_id(db, location_id)
+
+        if location is None:
+            return jsonify({
+                'error': 'Ubicación no encontrada'
+            }), 404
+
+        return jsonify(LocationResponse.model_validate(location).model_dump()), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar la ubicación'
+        }), 500
+
+
+@locations_bp.route('/<int:location_id>/stock', methods=['GET'])
+def get_location_stock(location_id: int):
+    """
+    Obtiene los saldos de stock de una ubicación.
+    """
+    try:
+        db = next(get_db())
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+
+        if skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de paginación inválidos'
+            }), 400
+
+        if LocationService.get_location_by_id(db, location_id) is None:
+            return jsonify({
+                'error': 'Ubicación no encontrada'
+            }), 404
+
+        balances = LocationService.get_location_balances(db, location_id, skip, limit)
+        return jsonify([StockBalanceResponse.model_validate(balance).model_dump() for balance in balances]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de paginación inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar el stock de la ubicación'
+        }), 500
+
+
+@locations_bp.route('/<int:location_id>/opening-balances', methods=['POST'])
+def create_opening_balances(location_id: int):
+    """
+    Registra en la ubicación el saldo inicial de los productos que aún no tienen saldos.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json(silent=True) or {}
+
+        opening = OpeningBalanceCreate(**data)
+        if LocationService.get_location_by_id(db, location_id) is None:
+            return jsonify({
+                'error': 'Ubicación no encontrada'
+            }), 404
+
+        opened = LocationService.open_balances(db, location_id, opening.product_ids)
+        result = OpeningBalanceResult(location_id=location_id, opened=len(opened), product_ids=opened)
+        return jsonify(result.model_dump()), 201
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al registrar los saldos iniciales'
+        }), 500
+
+
+@locations_bp.route('/<int:location_id>/stock/<int:product_id>', methods=['PATCH'])
+def update_location_stock(location_id: int, product_id: int):
+    """
+    Actualiza el stock mínimo de un producto en una ubicación.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        balance_update = StockBalanceUpdate(**data)
+        balance = LocationService.update_balance_min_stock(db, location_id, product_id, balance_update.min_stock)
+
+        if balance is None:
+            return jsonify({
+                'error': 'El producto no tiene saldo en esta ubicación'
+            }), 404
+
+        return jsonify(StockBalanceResponse.model_validate(balance).model_dump()), 200
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al actualizar el stock de la ubicación'
+        }), 500
+
+
+@locations_bp.route('/alerts', methods=['GET'])
+def get_all_location_alerts():
+    """
+    Obtiene los saldos por debajo del mínimo en todas las ubicaciones.
+    """
+    try:
+        db = next(get_db())
+        alerts = LocationService.get_low_stock_balances(db)
+        return jsonify([alert.model_dump() for alert in alerts]), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar alertas de stock'
+        }), 500
+
+
+@locations_bp.route('/<int:location_id>/alerts', methods=['GET'])
+def get_location_alerts(location_id: int):
+    """
+    Obtiene los saldos por debajo del mínimo en una ubicación.
+    """
+    try:
+        db = next(get_db())
+
+        if LocationService.get_location_by_id(db, location_id) is None:
+            return jsonify({
+                'error': 'Ubicación no encontrada'
+            }), 404
+
+        alerts = LocationService.get_low_stock_balances(db, location_id)
+        return jsonify([alert.model_dump() for alert in alerts]), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar alertas de stock'
+        }), 500
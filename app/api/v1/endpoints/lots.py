@@ -0,0 +1,38 @@
+# app/api/v1/endpoints/lots.py
+from flask import Blueprint, request, jsonify
+from app.schemas.lot import LotResponse
+from app.services.lot_service import LotService
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para los endpoints de lotes
+lots_bp = Blueprint('lots', __name__)
+
+
+@lots_bp.route('/expiring', methods=['GET'])
+def get_expiring_lots():
+    """
+    Obtiene los lotes con existencias que caducan en los próximos `days` días.
+    """
+    try:
+        db = next(get_db())
+        days = int(request.args.get('days', 30))
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+        include_expired = request.args.get('include_expired', 'false').lower() == 'true'
+
+        if days < 0 or skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de consulta inválidos'
+            }), 400
+
+        lots = LotService.get_expiring_lots(db, days, include_expired, skip, limit)
+        return jsonify([LotResponse.model_validate(lot).model_dump() for lot in lots]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de consulta inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar lotes por caducar'
+        }), 500
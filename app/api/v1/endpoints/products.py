@@ -1,21 +1,80 @@
 # app/api/v1/endpoints/products.py
-from flask import Blueprint, request, jsonify
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
-from app.services.product_service import ProductService
+import csv
+import os
+import shutil
+import tempfile
+from flask import Blueprint, request, jsonify, current_app
+from app.schemas.product import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductBulkUpdate, ProductBulkDelete, ProductBulkResult,
+    StockAdjustment
+)
+from app.schemas.location import StockBalanceResponse
+from app.schemas.lot import LotCreate, LotConsume, LotResponse, LotConsumeResponse
+from app.services.product_service import (
+    ProductService, VersionConflictError, PRODUCT_FIELD_COLUMNS, ALERT_FIELD_COLUMNS
+)
+from app.services.location_service import LocationService
+from app.services.lot_service import LotService
+from app.services.import_service import ImportService
+from app.api.v1.endpoints.jobs import enqueue_job
 from app.db.session import get_db
+from app.schemas.analytics import ABC_CLASSES, XYZ_CLASSES
+from app.utils.fields import InvalidFields, InvalidFilter, parse_choices, parse_fields
 from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional
 
 # Crear un Blueprint para los endpoints de productos
 products_bp = Blueprint('products', __name__)
 
 
+
+def _etag(version: int) -> str:
+    """ETag de un producto: su número de versión."""
+    return f'"{version}"'
+
+
+def _product_response(product, status: int):
+    """Respuesta con el producto completo y su versión como ETag."""
+    response = jsonify(ProductResponse.model_validate(product).model_dump())
+    response.headers['ETag'] = _etag(product.version)
+    return response, status
+
+
+def _if_match_versions() -> Optional[List[int]]:
+    """
+    Versiones aceptadas por la cabecera If-Match, o None si no hay condición (sin cabecera o '*').
+    Se aceptan también ETags débiles (W/"n"), ya que la compresión de respuestas debilita el ETag.
+    """
+    if 'If-Match' not in request.headers or request.if_match.star_tag:
+        return None
+    return [int(tag) for tag in request.if_match.as_set(include_weak=True) if tag.isdigit()]
+
+
+def _version_conflict(e: VersionConflictError):
+    """Respuesta 412 con el ETag de la versión actual."""
+    response = jsonify({
+        'error': str(e)
+    })
+    response.headers['ETag'] = _etag(e.current_version)
+    return response, 412
+
+
+def _class_filters():
+    """Filtros ?abc=A,B y ?xyz=X por clase de inventario."""
+    return (parse_choices('abc', request.args.get('abc'), ABC_CLASSES),
+            parse_choices('xyz', request.args.get('xyz'), XYZ_CLASSES))
+
 @products_bp.route('', methods=['GET'])
 def get_products():
     """
     Obtiene la lista de productos.
+    Con ?fields=id,code,... solo se consultan y devuelven esos campos; con ?abc=A,B y ?xyz=X
+    se filtran por clase de inventario.
     """
     try:
         db = next(get_db())
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELD_COLUMNS)
+        abc_classes, xyz_classes = _class_filters()
         skip = int(request.args.get('skip', 0))
         limit = int(request.args.get('limit', 100))
 
@@ -25,10 +84,17 @@ def get_products():
                 'error': 'Parámetros de paginación inválidos'
             }), 400
 
-        products = ProductService.get_products(db, skip, limit)
+        if fields:
+            return jsonify(ProductService.get_products_fields(db, fields, skip, limit, abc_classes, xyz_classes)), 200
+
+        products = ProductService.get_products(db, skip, limit, abc_classes, xyz_classes)
         # Convertir productos a objetos Pydantic para la respuesta
         product_responses = [ProductResponse.model_validate(product) for product in products]
         return jsonify([product.model_dump() for product in product_responses]), 200
+    except (InvalidFields, InvalidFilter) as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
     except ValueError:
         return jsonify({
             'error': 'Parámetros de paginación inválidos'
@@ -53,7 +119,7 @@ def create_product():
 
         # Intenta crear el producto
         new_product = ProductService.create_product(db, product_create)
-        return jsonify(ProductResponse.model_validate(new_product).model_dump()), 201
+        return _product_response(new_product, 201)
     except ValueError as e:
         return jsonify({
             'error': f'Datos inválidos: {str(e)}'
@@ -64,21 +130,153 @@ def create_product():
         }), 500
 
 
+def _enqueue_import(stream, import_format: str, params: dict):
+    """
+    Guarda el fichero subido en un temporal y encola su importación (respuesta 202 de enqueue_job).
+    Si no se puede encolar, el temporal se borra.
+    """
+    handle, path = tempfile.mkstemp(prefix='import-', suffix=f'.{import_format}',
+                                    dir=current_app.config['IMPORT_UPLOAD_DIR'])
+    with os.fdopen(handle, 'wb') as upload:
+        shutil.copyfileobj(stream, upload)
+    response = enqueue_job('product_import', {**params, 'path': path, 'format': import_format})
+    if response[1] != 202:
+        os.remove(path)
+    return response
+
+
+@products_bp.route('/import', methods=['POST'])
+def import_products():
+    """
+    Importa productos desde un CSV o Excel (campo multipart "file" o el cuerpo de la petición).
+    Las filas se insertan o actualizan por código; las inválidas se omiten y se devuelven en el informe.
+    Con dry_run=true solo se valida. Con ?async=true, o si el fichero supera IMPORT_ASYNC_MIN_BYTES,
+    se guarda en un fichero temporal y se importa como trabajo en segundo plano (202).
+    """
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            stream, filename, content_type = upload.stream, upload.filename, upload.mimetype
+        else:
+            stream, filename, content_type = request.stream, None, request.mimetype
+        import_format = request.args.get('format') or ImportService.detect_format(filename, content_type)
+        dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+
+        if import_format == 'xlsx':
+            rows = ImportService.iter_xlsx_rows(stream)
+        elif import_format == 'csv':
+            rows = ImportService.iter_csv_rows(stream)
+        else:
+            raise ValueError("Formato de fichero no soportado: use CSV o XLSX")
+
+        # Los ficheros grandes se validan en paralelo en el pool de procesos
+        config = current_app.config
+        large = (request.content_length or 0) >= config['IMPORT_PARALLEL_MIN_BYTES']
+        run_async = request.args.get('async')
+        if run_async is None:
+            run_async = (request.content_length or 0) >= config['IMPORT_ASYNC_MIN_BYTES']
+        else:
+            run_async = run_async.lower() == 'true'
+        if run_async:
+            return _enqueue_import(stream, import_format, {
+                'dry_run': dry_run,
+                'chunk_size': config['IMPORT_CHUNK_SIZE'],
+                'workers': config['IMPORT_WORKERS'] if large else 1,
+                'max_errors': config['IMPORT_MAX_ERRORS'],
+            })
+
+        db = next(get_db())
+        report = ImportService.import_products(
+            db,
+            rows,
+            chunk_size=config['IMPORT_CHUNK_SIZE'],
+            workers=config['IMPORT_WORKERS'] if large else 1,
+            dry_run=dry_run,
+            max_errors=config['IMPORT_MAX_ERRORS'],
+        )
+        return jsonify(report), 200
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({
+            'error': f'Fichero inválido: {str(e)}'
+        }), 400
+    except (SQLAlchemyError, OSError) as e:
+        return jsonify({
+            'error': 'Error al importar productos'
+        }), 500
+
+
+@products_bp.route('/bulk', methods=['PATCH'])
+def bulk_update_products():
+    """
+    Actualiza en bloque los productos seleccionados por ids, codes o filter
+    con un único UPDATE en una transacción.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        bulk_update = ProductBulkUpdate(**data)
+        ids = ProductService.bulk_update(db, bulk_update, bulk_update.changes)
+        return jsonify(ProductBulkResult(affected=len(ids), ids=ids).model_dump()), 200
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al actualizar los productos'
+        }), 500
+
+
+@products_bp.route('/bulk', methods=['DELETE'])
+def bulk_delete_products():
+    """
+    Elimina en bloque los productos seleccionados por ids, codes o filter
+    con un único DELETE en una transacción.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        bulk_delete = ProductBulkDelete(**data)
+        ids = ProductService.bulk_delete(db, bulk_delete)
+        return jsonify(ProductBulkResult(affected=len(ids), ids=ids).model_dump()), 200
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al eliminar los productos'
+        }), 500
+
+
 @products_bp.route('/<int:product_id>', methods=['GET'])
 def get_product(product_id: int):
     """
     Obtiene un producto por su ID.
+    Con ?fields=id,code,... solo se consultan y devuelven esos campos.
     """
     try:
         db = next(get_db())
-        product = ProductService.get_product_by_id(db, product_id)
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELD_COLUMNS)
+        if fields:
+            product = ProductService.get_product_fields(db, product_id, fields)
+        else:
+            product = ProductService.get_product_by_id(db, product_id)
 
         if product is None:
             return jsonify({
                 'error': 'Producto no encontrado'
             }), 404
 
-        return jsonify(ProductResponse.model_validate(product).model_dump()), 200
+        if fields:
+            return jsonify(product), 200
+        return _product_response(product, 200)
+    except InvalidFields as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
     except SQLAlchemyError as e:
         return jsonify({
             'error': 'Error al consultar el producto'
@@ -90,6 +288,7 @@ def update_product(product_id: int):
     """
     Actualiza completamente un producto existente.
     Requiere todos los campos del producto.
+    Con If-Match solo se aplica si la versión (ETag) sigue siendo la actual; si no, 412.
     """
     try:
         db = next(get_db())
@@ -99,14 +298,16 @@ def update_product(product_id: int):
         product_update = ProductUpdate(**data)
 
         # Intenta actualizar el producto
-        updated_product = ProductService.update_product(db, product_id, product_update)
+        updated_product = ProductService.update_product(db, product_id, product_update, _if_match_versions())
 
         if updated_product is None:
             return jsonify({
                 'error': 'Producto no encontrado'
             }), 404
 
-        return jsonify(ProductResponse.model_validate(updated_product).model_dump()), 200
+        return _product_response(updated_product, 200)
+    except VersionConflictError as e:
+        return _version_conflict(e)
     except ValueError as e:
         return jsonify({
             'error': f'Datos inválidos: {str(e)}'
@@ -122,6 +323,7 @@ def patch_product(product_id: int):
     """
     Actualiza parcialmente un producto existente.
     Solo requiere los campos que se desean actualizar.
+    Con If-Match solo se aplica si la versión (ETag) sigue siendo la actual; si no, 412.
     """
     try:
         db = next(get_db())
@@ -131,14 +333,16 @@ def patch_product(product_id: int):
         product_update = ProductUpdate(**data)
 
         # Intenta actualizar parcialmente el producto
-        updated_product = ProductService.update_product(db, product_id, product_update)
+        updated_product = ProductService.update_product(db, product_id, product_update, _if_match_versions())
 
         if updated_product is None:
             return jsonify({
                 'error': 'Producto no encontrado'
             }), 404
 
-        return jsonify(ProductResponse.model_validate(updated_product).model_dump()), 200
+        return _product_response(updated_product, 200)
+    except VersionConflictError as e:
+        return _version_conflict(e)
     except ValueError as e:
         return jsonify({
             'error': f'Datos inválidos: {str(e)}'
@@ -172,15 +376,152 @@ def delete_product(product_id: int):
         }), 500
 
 
+@products_bp.route('/<int:product_id>/stock', methods=['GET'])
+def get_product_stock(product_id: int):
+    """
+    Obtiene el stock de un producto desglosado por ubicación.
+    """
+    try:
+        db = next(get_db())
+        product = ProductService.get_product_by_id(db, product_id)
+
+        if product is None:
+            return jsonify({
+                'error': 'Producto no encontrado'
+            }), 404
+
+        balances = LocationService.get_product_balances(db, product_id)
+        return jsonify({
+            'product_id': product_id,
+            'current_stock': product.current_stock,
+            'locations': [StockBalanceResponse.model_validate(balance).model_dump() for balance in balances]
+        }), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar el stock del producto'
+        }), 500
+
+
+@products_bp.route('/<int:product_id>/stock/adjust', methods=['POST'])
+def adjust_product_stock(product_id: int):
+    """
+    Suma o resta stock a un producto sin ubicaciones (sin consumir lo reservado).
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        adjustment = StockAdjustment(**data)
+        product = ProductService.adjust_stock(db, product_id, adjustment.delta)
+
+        if product is None:
+            return jsonify({
+                'error': 'Producto no encontrado'
+            }), 404
+
+        return _product_response(product, 200)
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al ajustar el stock del producto'
+        }), 500
+
+
+@products_bp.route('/<int:product_id>/lots', methods=['GET'])
+def get_product_lots(product_id: int):
+    """
+    Obtiene los lotes con existencias de un producto en orden FEFO.
+    """
+    try:
+        db = next(get_db())
+        if ProductService.get_product_by_id(db, product_id) is None:
+            return jsonify({
+                'error': 'Producto no encontrado'
+            }), 404
+
+        include_empty = request.args.get('include_empty', 'false').lower() == 'true'
+        lots = LotService.get_product_lots(db, product_id, include_empty)
+        return jsonify([LotResponse.model_validate(lot).model_dump() for lot in lots]), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar los lotes del producto'
+        }), 500
+
+
+@products_bp.route('/<int:product_id>/lots', methods=['POST'])
+def receive_product_lot(product_id: int):
+    """
+    Registra la recepción de un lote de un producto.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        lot_create = LotCreate(**data)
+        lot = LotService.receive_lot(db, product_id, lot_create)
+        return jsonify(LotResponse.model_validate(lot).model_dump()), 201
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al registrar el lote'
+        }), 500
+
+
+@products_bp.route('/<int:product_id>/lots/consume', methods=['POST'])
+def consume_product_lots(product_id: int):
+    """
+    Consume stock de los lotes de un producto en orden FEFO.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        lot_consume = LotConsume(**data)
+        if ProductService.get_product_by_id(db, product_id) is None:
+            return jsonify({
+                'error': 'Producto no encontrado'
+            }), 404
+
+        allocations = LotService.consume(db, product_id, lot_consume.quantity, lot_consume.location_id,
+                                         lot_consume.reference)
+        response = LotConsumeResponse(product_id=product_id, quantity=lot_consume.quantity, allocations=allocations)
+        return jsonify(response.model_dump()), 200
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consumir los lotes'
+        }), 500
+
+
 @products_bp.route('/alerts', methods=['GET'])
 def get_alerts():
     """
     Obtiene productos con stock por debajo del mínimo.
+    Con ?fields=id,code,... solo se consultan y devuelven esos campos; con ?abc=A,B y ?xyz=X
+    se filtran por clase de inventario.
     """
     try:
         db = next(get_db())
-        low_stock_products = ProductService.get_low_stock_products(db)
+        fields = parse_fields(request.args.get('fields'), ALERT_FIELD_COLUMNS)
+        abc_classes, xyz_classes = _class_filters()
+        if fields:
+            return jsonify(ProductService.get_low_stock_fields(db, fields, abc_classes, xyz_classes)), 200
+
+        low_stock_products = ProductService.get_low_stock_products(db, abc_classes, xyz_classes)
         return jsonify([product.model_dump() for product in low_stock_products]), 200
+    except (InvalidFields, InvalidFilter) as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
     except SQLAlchemyError as e:
         return jsonify({
             'error': 'Error al consultar alertas de stock'
@@ -0,0 +1,102 @@
+# app/api/v1/endpoints/purchasing.py
+from flask import Blueprint, request, jsonify
+from app.schemas.purchasing import (
+    PurchaseSuggestionRequest, PurchaseSuggestionBatchResponse, PurchaseSuggestionResponse
+)
+from app.services.purchasing_service import PurchasingService
+from app.api.v1.endpoints.jobs import enqueue_job
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para las sugerencias de compra
+purchasing_bp = Blueprint('purchasing', __name__)
+
+
+def _batch_response(db, batch) -> dict:
+    """Arma la respuesta de un lote con su resumen por proveedor."""
+    return PurchaseSuggestionBatchResponse(
+        id=batch.id,
+        created_at=batch.created_at,
+        line_count=batch.line_count,
+        suppliers=PurchasingService.get_batch_summary(db, batch.id),
+    ).model_dump()
+
+
+@purchasing_bp.route('', methods=['POST'])
+def generate_suggestions():
+    """
+    Genera un lote de órdenes de compra sugeridas a partir de los productos en alerta.
+    Con ?async=true se encola como trabajo y responde 202.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json(silent=True) or {}
+
+        options = PurchaseSuggestionRequest(**data)
+        if request.args.get('async', 'false').lower() == 'true':
+            return enqueue_job('purchase_suggestions', options.model_dump())
+
+        batch = PurchasingService.generate_suggestions(db, options.use_available)
+        return jsonify(_batch_response(db, batch)), 201
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al generar sugerencias de compra'
+        }), 500
+
+
+@purchasing_bp.route('/<int:batch_id>', methods=['GET'])
+def get_suggestion_batch(batch_id: int):
+    """
+    Obtiene un lote de sugerencias agrupado por proveedor.
+    """
+    try:
+        db = next(get_db())
+        batch = PurchasingService.get_batch(db, batch_id)
+
+        if batch is None:
+            return jsonify({
+                'error': 'Lote de sugerencias no encontrado'
+            }), 404
+
+        return jsonify(_batch_response(db, batch)), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar sugerencias de compra'
+        }), 500
+
+
+@purchasing_bp.route('/<int:batch_id>/lines', methods=['GET'])
+def get_suggestion_lines(batch_id: int):
+    """
+    Obtiene las líneas de un lote de sugerencias, filtrables por supplier_id.
+    """
+    try:
+        db = next(get_db())
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+        supplier_id = request.args.get('supplier_id', type=int)
+
+        if skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de paginación inválidos'
+            }), 400
+
+        if PurchasingService.get_batch(db, batch_id) is None:
+            return jsonify({
+                'error': 'Lote de sugerencias no encontrado'
+            }), 404
+
+        lines = PurchasingService.get_batch_lines(db, batch_id, supplier_id, skip, limit)
+        return jsonify([PurchaseSuggestionResponse.model_validate(line).model_dump() for line in lines]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de paginación inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar sugerencias de compra'
+        }), 500
@@ -0,0 +1,134 @@
+# app/api/v1/endpoints/reservations.py
+from flask import Blueprint, request, jsonify
+from app.schemas.reservation import ReservationCreate, ReservationCommit, ReservationResponse
+from app.services.reservation_service import ReservationService
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para los endpoints de reservas
+reservations_bp = Blueprint('reservations', __name__)
+
+
+@reservations_bp.route('', methods=['POST'])
+def create_reservation():
+    """
+    Reserva stock de un producto durante ttl_seconds.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        reservation_create = ReservationCreate(**data)
+        reservation = ReservationService.reserve(db, reservation_create)
+        return jsonify(ReservationResponse.model_validate(reservation).model_dump()), 201
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al crear la reserva'
+        }), 500
+
+
+@reservations_bp.route('', methods=['GET'])
+def get_reservations():
+    """
+    Obtiene la lista de reservas, filtrable por product_id y status.
+    """
+    try:
+        db = next(get_db())
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+        product_id = request.args.get('product_id', type=int)
+        status = request.args.get('status')
+
+        if skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de paginación inválidos'
+            }), 400
+
+        reservations = ReservationService.get_reservations(db, product_id, status, skip, limit)
+        return jsonify([ReservationResponse.model_validate(r).model_dump() for r in reservations]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de paginación inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar reservas'
+        }), 500
+
+
+@reservations_bp.route('/<int:reservation_id>', methods=['GET'])
+def get_reservation(reservation_id: int):
+    """
+    Obtiene una reserva por su ID.
+    """
+    try:
+        db = next(get_db())
+        reservation = ReservationService.get_reservation(db, reservation_id)
+
+        if reservation is None:
+            return jsonify({
+                'error': 'Reserva no encontrada'
+            }), 404
+
+        return jsonify(ReservationResponse.model_validate(reservation).model_dump()), 200
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar la reserva'
+        }), 500
+
+
+@reservations_bp.route('/<int:reservation_id>/release', methods=['POST'])
+def release_reservation(reservation_id: int):
+    """
+    Libera una reserva activa.
+    """
+    try:
+        db = next(get_db())
+        reservation = ReservationService.release(db, reservation_id)
+
+        if reservation is None:
+            return jsonify({
+                'error': 'Reserva no encontrada'
+            }), 404
+
+        return jsonify(ReservationResponse.model_validate(reservation).model_dump()), 200
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 409
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al liberar la reserva'
+        }), 500
+
+
+@reservations_bp.route('/<int:reservation_id>/commit', methods=['POST'])
+def commit_reservation(reservation_id: int):
+    """
+    Confirma una reserva activa descontando el stock reservado.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json(silent=True) or {}
+
+        reservation_commit = ReservationCommit(**data)
+        reservation = ReservationService.commit(db, reservation_id, reservation_commit.location_id)
+
+        if reservation is None:
+            return jsonify({
+                'error': 'Reserva no encontrada'
+            }), 404
+
+        return jsonify(ReservationResponse.model_validate(reservation).model_dump()), 200
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 409
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al confirmar la reserva'
+        }), 500
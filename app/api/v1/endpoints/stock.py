@@ -0,0 +1,111 @@
+# app/api/v1/endpoints/stock.py
+from flask import Blueprint, request, jsonify, current_app, url_for
+from app.schemas.location import StockMovementCreate, StockMovementResponse
+from app.services.location_service import LocationService
+from app.services.write_queue import WriteOutcomeUnknown, WriteQueueFull, get_write_queue
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para los movimientos de stock
+stock_bp = Blueprint('stock', __name__)
+
+
+@stock_bp.route('/movements', methods=['POST'])
+def create_movement():
+    """
+    Registra una entrada, salida o transferencia de stock entre ubicaciones.
+    Con la cola de escritura activa (WRITE_QUEUE_ENABLED) se confirma en lote con otras escrituras.
+    """
+    try:
+        data = request.get_json()
+        movement_create = StockMovementCreate(**data)
+
+        write_queue = get_write_queue()
+        if write_queue is not None:
+            movement = LocationService.move_stock_queued(
+                write_queue, movement_create, timeout=current_app.config['WRITE_QUEUE_TIMEOUT']
+            )
+            return jsonify(movement.model_dump()), 201
+
+        db = next(get_db())
+        movement = LocationService.move_stock(db, movement_create)
+        return jsonify(StockMovementResponse.model_validate(movement).model_dump()), 201
+    except WriteOutcomeUnknown as e:
+        # Puede confirmarse todavía: no se invita a repetirlo, se da dónde consultar el resultado
+        location = url_for('api_v1.stock.get_queued_movement', operation_id=e.operation_id)
+        return jsonify({
+            'status': 'pending',
+            'operation_id': e.operation_id,
+            'message': 'El movimiento sigue en curso; consulte su resultado antes de repetirlo'
+        }), 202, {'Location': location}
+    except (WriteQueueFull, TimeoutError) as e:
+        response = jsonify({
+            'error': 'Demasiadas escrituras pendientes, reintente más tarde'
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al registrar el movimiento'
+        }), 500
+
+
+@stock_bp.route('/movements/queued/<operation_id>', methods=['GET'])
+def get_queued_movement(operation_id):
+    """
+    Resultado de un movimiento que no se confirmó dentro del plazo (respuesta 202).
+    Solo lo conoce el proceso que lo recibió.
+    """
+    write_queue = get_write_queue()
+    future = write_queue.lookup(operation_id) if write_queue is not None else None
+    if future is None:
+        return jsonify({
+            'error': 'Operación no encontrada'
+        }), 404
+    if not future.done():
+        return jsonify({'status': 'pending', 'operation_id': operation_id}), 202
+    error = future.exception()
+    if error is not None:
+        return jsonify({
+            'status': 'failed',
+            'operation_id': operation_id,
+            'error': f'Datos inválidos: {str(error)}' if isinstance(error, ValueError) else 'Error al registrar el movimiento'
+        }), 200
+    return jsonify({
+        'status': 'committed',
+        'operation_id': operation_id,
+        'movement': future.result().model_dump()
+    }), 200
+
+
+@stock_bp.route('/movements', methods=['GET'])
+def get_movements():
+    """
+    Obtiene los movimientos de stock, filtrables por producto o ubicación.
+    """
+    try:
+        db = next(get_db())
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+        product_id = request.args.get('product_id', type=int)
+        location_id = request.args.get('location_id', type=int)
+
+        if skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de paginación inválidos'
+            }), 400
+
+        movements = LocationService.get_movements(db, product_id, location_id, skip, limit)
+        return jsonify([StockMovementResponse.model_validate(m).model_dump() for m in movements]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de paginación inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar movimientos'
+        }), 500
@@ -0,0 +1,58 @@
+# app/api/v1/endpoints/suppliers.py
+from flask import Blueprint, request, jsonify
+from app.schemas.purchasing import SupplierCreate, SupplierResponse
+from app.services.purchasing_service import PurchasingService
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+# Crear un Blueprint para los endpoints de proveedores
+suppliers_bp = Blueprint('suppliers', __name__)
+
+
+@suppliers_bp.route('', methods=['GET'])
+def get_suppliers():
+    """
+    Obtiene la lista de proveedores.
+    """
+    try:
+        db = next(get_db())
+        skip = int(request.args.get('skip', 0))
+        limit = int(request.args.get('limit', 100))
+
+        if skip < 0 or limit < 1 or limit > 100:
+            return jsonify({
+                'error': 'Parámetros de paginación inválidos'
+            }), 400
+
+        suppliers = PurchasingService.get_suppliers(db, skip, limit)
+        return jsonify([SupplierResponse.model_validate(supplier).model_dump() for supplier in suppliers]), 200
+    except ValueError:
+        return jsonify({
+            'error': 'Parámetros de paginación inválidos'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al consultar proveedores'
+        }), 500
+
+
+@suppliers_bp.route('', methods=['POST'])
+def create_supplier():
+    """
+    Crea un nuevo proveedor.
+    """
+    try:
+        db = next(get_db())
+        data = request.get_json()
+
+        supplier_create = SupplierCreate(**data)
+        supplier = PurchasingService.create_supplier(db, supplier_create)
+        return jsonify(SupplierResponse.model_validate(supplier).model_dump()), 201
+    except ValueError as e:
+        return jsonify({
+            'error': f'Datos inválidos: {str(e)}'
+        }), 400
+    except SQLAlchemyError as e:
+        return jsonify({
+            'error': 'Error al crear el proveedor'
+        }), 500
@@ -1,22 +1,185 @@
 # app/db/base.py
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, has_app_context
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
+from typing import Iterator, Optional, Tuple
+import math
 import os
+import sqlite3
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Base de datos SQLite
+# Base de datos SQLite (primaria: recibe las escrituras)
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./inventory.db")
 
-# Motor de la base de datos
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Réplica para lecturas (bases de datos servidor); por defecto la misma base de datos
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL", SQLALCHEMY_DATABASE_URL)
+
+# Sentencias compiladas que guarda cada motor (LRU); sus aciertos se ven en /metrics
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", 1000))
+
+
+def _is_sqlite_file(url: str) -> bool:
+    """SQLite en fichero (no en memoria), donde tiene sentido WAL y separar conexiones."""
+    return url.startswith("sqlite") and ":memory:" not in url and not url.endswith("://")
+
+
+def _sqlite_connect_listener(writer: bool, wal: bool):
+    """
+    Ajustes de cada conexión SQLite nueva: claves foráneas activadas, ceil() si la librería
+    no la trae, espera ante bloqueos y, con WAL, modo WAL en el escritor y solo lectura en el resto.
+    """
+    def _on_connect(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        # SQLite no aplica las claves foráneas (ni sus ON DELETE) salvo que se pida en cada conexión
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+        try:
+            dbapi_connection.execute("SELECT ceil(1.5)")
+        except sqlite3.OperationalError:
+            dbapi_connection.create_function("ceil", 1, math.ceil, deterministic=True)
+        if not wal:
+            return
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA busy_timeout = 5000")
+        if writer:
+            # WAL: los lectores no bloquean al escritor ni el escritor a los lectores
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        else:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+    return _on_connect
+
+
+def create_engines(write_url: str, read_url: str) -> Tuple[Engine, Engine]:
+    """
+    Crea los motores de escritura y de lectura.
+
+    Con SQLite en fichero se usa WAL: una única conexión de escritura (SQLite admite un solo
+    escritor; así las escrituras del proceso esperan turno en el pool en lugar de fallar con
+    "database is locked") y un pool de conexiones de solo lectura. Con bases de datos
+    servidor, la primaria y la réplica. Si no hay nada que separar (misma URL de servidor,
+    o SQLite en memoria) ambos son el mismo motor.
+    """
+    wal = _is_sqlite_file(write_url) and read_url == write_url
+
+    write_options = {"query_cache_size": DB_QUERY_CACHE_SIZE}
+    if write_url.startswith("sqlite"):
+        write_options["connect_args"] = {"check_same_thread": False}
+    if wal:
+        write_options.update(
+            pool_size=int(os.getenv("DB_WRITE_POOL_SIZE", 1)),
+            max_overflow=0,
+            pool_timeout=float(os.getenv("DB_WRITE_POOL_TIMEOUT", 30)),
+        )
+    writer = create_engine(write_url, **write_options)
+    if writer.dialect.name == "sqlite":
+        event.listen(writer, "connect", _sqlite_connect_listener(writer=True, wal=wal))
+
+    if read_url == write_url and not wal:
+        return writer, writer
+
+    read_options = {
+        "query_cache_size": DB_QUERY_CACHE_SIZE,
+        "pool_size": int(os.getenv("DB_READ_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_READ_MAX_OVERFLOW", 10)),
+    }
+    if read_url.startswith("sqlite"):
+        read_options["connect_args"] = {"check_same_thread": False}
+    reader = create_engine(read_url, **read_options)
+    if reader.dialect.name == "sqlite":
+        event.listen(reader, "connect", _sqlite_connect_listener(writer=False, wal=wal))
+    return writer, reader
+
+
+# Motores de la base de datos: `engine` recibe las escrituras, `read_engine` las lecturas
+engine, read_engine = create_engines(SQLALCHEMY_DATABASE_URL, SQLALCHEMY_READ_DATABASE_URL)
+
+# Motores de las sesiones creadas en el contexto actual (p. ej. los del tenant de la petición);
+# sin valor se usan los globales
+_context_engines: ContextVar[Optional[Tuple[Engine, Engine]]] = ContextVar("context_engines", default=None)
+
+
+def current_engines() -> Tuple[Engine, Engine]:
+    """Motores (escritura, lectura) del contexto actual."""
+    return _context_engines.get() or (engine, read_engine)
+
+
+@contextmanager
+def use_engines(engines: Tuple[Engine, Engine]) -> Iterator[None]:
+    """Las sesiones creadas dentro del bloque usan estos motores (escritura, lectura)."""
+    token = _context_engines.set(engines)
+    try:
+        yield
+    finally:
+        _context_engines.reset(token)
+
+
+def _is_write(clause) -> bool:
+    """INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE o SQL textual (que puede escribir)."""
+    if clause is None:
+        return False
+    if getattr(clause, "is_dml", False) or isinstance(clause, TextClause):
+        return True
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+def request_wrote() -> bool:
+    """Indica si la petición en curso ya escribió en la base de datos."""
+    return has_app_context() and g.get("_db_wrote", False)
+
+
+class RoutingSession(Session):
+    """
+    Sesión que envía las lecturas al motor de lectura y las escrituras al de escritura.
+    Los motores se fijan al crearla: los globales o los del contexto (use_engines).
+
+    Lectura de lo escrito: en cuanto la sesión escribe (flush o DML), sus consultas siguientes
+    van al escritor hasta que termina la transacción. Con una réplica, además, la sesión sigue
+    en el escritor tras el commit y las sesiones nuevas de una petición que ya escribió empiezan
+    en el escritor, para no leer de la réplica datos anteriores a la propia escritura.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer_engine, self.reader_engine = current_engines()
+        # Con una réplica lo escrito puede tardar en verse en el lector; con SQLite en WAL
+        # lo confirmado es visible enseguida para todas las conexiones
+        self.replica_lag = (self.reader_engine is not self.writer_engine
+                            and self.reader_engine.url != self.writer_engine.url)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.reader_engine is self.writer_engine or self.info.get("use_writer"):
+            return self.writer_engine
+        if self._flushing or _is_write(clause) or (self.replica_lag and request_wrote()):
+            self.use_writer()
+            return self.writer_engine
+        return self.reader_engine
+
+    def use_writer(self):
+        """Fija la sesión al motor de escritura (y, con réplica, el resto de la petición)."""
+        self.info["use_writer"] = True
+        if self.replica_lag and has_app_context():
+            g._db_wrote = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session, transaction):
+    # Sin réplica, tras el commit o el rollback se vuelve a leer del lector: así la conexión
+    # única de escritura no queda retenida por lecturas posteriores de la petición
+    if not session.replica_lag and transaction.parent is None:
+        session.info.pop("use_writer", None)
+
 
 # Sesión local para manejar transacciones
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
 # Base para los modelos ORM
 Base = declarative_base()
@@ -0,0 +1,281 @@
+# app/db/seed.py
+"""
+Carga masiva de productos para bases de datos de desarrollo, staging y benchmarks.
+
+    python -m app.db.seed --truncate                          # productos de ejemplo
+    python -m app.db.seed --generate 1000000 --truncate       # catálogo sintético
+    python -m app.db.seed --file productos.csv                # JSON, CSV o NDJSON
+    flask --app app.main:create_app seed --generate 100000
+
+No pregunta nada: solo borra datos con --truncate.
+"""
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+import click
+from pydantic import ValidationError
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.base import Base, SQLALCHEMY_DATABASE_URL
+from app.db.bulk import DEFAULT_CHUNK_SIZE, bulk_insert_products, bulk_load_engine
+from app.db.synthetic import generate_products
+from app.schemas.product import ProductCreate
+
+# Registrar todos los modelos para crear el esquema y resolver dependencias
+from app.models.product import Product
+from app.models.location import StockLocation, StockBalance, StockMovement  # noqa: F401
+from app.models.reservation import Reservation  # noqa: F401
+from app.models.lot import Lot  # noqa: F401
+from app.models.purchasing import Supplier, PurchaseSuggestionBatch, PurchaseSuggestion  # noqa: F401
+from app.models.job import Job  # noqa: F401
+from app.models.inventory_state import InventoryCheckpoint  # noqa: F401
+from app.models.alert import StockAlertState  # noqa: F401
+
+# Lista de productos de ejemplo para insertar
+SAMPLE_PRODUCTS = [
+    {
+        "name": "Tornillo hexagonal 10mm",
+        "code": "TOR-HEX-001",
+        "current_stock": 150,
+        "min_stock": 50
+    },
+    {
+        "name": "Tuerca autoblocante 8mm",
+        "code": "TUE-AUTO-002",
+        "current_stock": 300,
+        "min_stock": 100
+    },
+    {
+        "name": "Arandela plana 12mm",
+        "code": "ARA-PLA-003",
+        "current_stock": 400,
+        "min_stock": 100
+    },
+    {
+        "name": "Cable eléctrico 2.5mm (metro)",
+        "code": "CAB-ELEC-004",
+        "current_stock": 200,
+        "min_stock": 50
+    },
+    {
+        "name": "Pintura blanca mate (litro)",
+        "code": "PIN-BLA-005",
+        "current_stock": 25,
+        "min_stock": 10
+    },
+    {
+        "name": "Cemento Portland (saco 25kg)",
+        "code": "CEM-PORT-006",
+        "current_stock": 15,
+        "min_stock": 5
+    },
+    {
+        "name": "Varilla de acero 10mm x 6m",
+        "code": "VAR-ACE-007",
+        "current_stock": 50,
+        "min_stock": 15
+    },
+    {
+        "name": "Ladrillo cerámico estándar",
+        "code": "LAD-CER-008",
+        "current_stock": 1000,
+        "min_stock": 200
+    },
+    {
+        "name": "Perfil de aluminio 2m",
+        "code": "PERF-ALU-009",
+        "current_stock": 30,
+        "min_stock": 10
+    },
+    {
+        "name": "Disco de corte metal 115mm",
+        "code": "DISC-MET-010",
+        "current_stock": 45,
+        "min_stock": 20
+    },
+    {
+        "name": "Silicona transparente (tubo)",
+        "code": "SIL-TRA-011",
+        "current_stock": 28,
+        "min_stock": 15
+    },
+    {
+        "name": "Cinta aislante negra",
+        "code": "CIN-AIS-012",
+        "current_stock": 60,
+        "min_stock": 25
+    },
+    # Productos con stock por debajo del mínimo (para probar alertas)
+    {
+        "name": "Madera contrachapada 120x240cm",
+        "code": "MAD-CONT-013",
+        "current_stock": 5,
+        "min_stock": 10
+    },
+    {
+        "name": "Bisagra de acero inoxidable",
+        "code": "BIS-INOX-014",
+        "current_stock": 12,
+        "min_stock": 20
+    },
+    {
+        "name": "Clavos 2 pulgadas (caja)",
+        "code": "CLA-2P-015",
+        "current_stock": 8,
+        "min_stock": 15
+    }
+]
+
+FORMATS = ("json", "ndjson", "csv")
+
+_NUMERIC_FIELDS = ("current_stock", "min_stock", "unit_cost", "lot_size", "min_order_qty")
+
+
+def detect_format(path: str) -> str:
+    """Deduce el formato a partir de la extensión del fichero."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "jsonl":
+        extension = "ndjson"
+    if extension not in FORMATS:
+        raise ValueError(f"Formato no reconocido para {path}: use --format ({', '.join(FORMATS)})")
+    return extension
+
+
+def read_products(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Lee productos de un fichero JSON (lista u objeto con clave "products"), NDJSON o CSV con cabecera.
+    NDJSON y CSV se leen en streaming.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "json":
+        with open(path, encoding="utf-8") as source:
+            data = json.load(source)
+        yield from (data.get("products", []) if isinstance(data, dict) else data)
+    elif fmt == "ndjson":
+        with open(path, encoding="utf-8") as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8", newline="") as source:
+            for row in csv.DictReader(source):
+                # Las celdas vacías toman el valor por defecto del esquema
+                yield {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def prepare_rows(rows: Iterable[Dict], validate: bool = True) -> Iterator[Dict]:
+    """
+    Normaliza las filas a las columnas de la tabla products.
+    Con `validate` cada fila pasa por ProductCreate (códigos en mayúsculas, rangos, etc.).
+    """
+    for number, row in enumerate(rows, start=1):
+        if validate:
+            try:
+                yield ProductCreate.model_validate(row).model_dump()
+            except ValidationError as e:
+                raise ValueError(f"Fila {number} inválida: {e}") from e
+        else:
+            prepared = {
+                "name": row["name"],
+                "code": str(row["code"]).upper(),
+                "supplier_id": int(row["supplier_id"]) if row.get("supplier_id") not in (None, "") else None,
+            }
+            for field in _NUMERIC_FIELDS:
+                default = 1 if field == "lot_size" else 0
+                prepared[field] = float(row.get(field, default))
+            yield prepared
+
+
+def _dependent_tables(table):
+    """Tablas que referencian (directa o indirectamente) a `table`, de la más dependiente a la menos."""
+    dependents = []
+    for candidate in reversed(Base.metadata.sorted_tables):
+        if candidate is table or candidate in dependents:
+            continue
+        targets = {fk.column.table for fk in candidate.foreign_keys}
+        if table in targets or targets & set(dependents):
+            dependents.append(candidate)
+    return dependents
+
+
+def truncate_products(connection):
+    """Borra los productos y todo lo que depende de ellos (stock, reservas, lotes, sugerencias)."""
+    products = Product.__table__
+    for table in _dependent_tables(products) + [products]:
+        connection.execute(delete(table))
+
+
+def load_products(rows: Iterable[Dict], database_url: str = SQLALCHEMY_DATABASE_URL,
+                  truncate: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Carga los productos en una sola transacción con los PRAGMA de carga masiva.
+    Si la tabla está vacía, los índices se eliminan durante la carga y se reconstruyen al final,
+    que es bastante más rápido que mantenerlos fila a fila.
+    Devuelve el número de filas, los segundos y las filas por segundo.
+    """
+    engine = bulk_load_engine(database_url)
+    try:
+        Base.metadata.create_all(bind=engine)
+        began = time.perf_counter()
+        with engine.begin() as connection:
+            if truncate:
+                truncate_products(connection)
+            products = Product.__table__
+            defer_indexes = connection.execute(select(func.count()).select_from(products)).scalar() == 0
+            if defer_indexes:
+                for index in products.indexes:
+                    index.drop(connection)
+            inserted = bulk_insert_products(connection, rows, chunk_size)
+            if defer_indexes:
+                for index in products.indexes:
+                    index.create(connection)
+        elapsed = time.perf_counter() - began
+    finally:
+        engine.dispose()
+
+    return {
+        "rows": inserted,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(inserted / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+@click.command("seed")
+@click.option("--file", "path", type=click.Path(exists=True, dir_okay=False), help="Fichero JSON, CSV o NDJSON.")
+@click.option("--format", "fmt", type=click.Choice(FORMATS), help="Formato del fichero (por defecto, según la extensión).")
+@click.option("--generate", type=int, help="Generar N productos sintéticos.")
+@click.option("--low-stock-ratio", type=float, default=0.1, show_default=True, help="Proporción de productos en alerta al generar.")
+@click.option("--start", type=int, default=0, show_default=True, help="Primer número de código al generar (para ampliar un catálogo ya sintético).")
+@click.option("--seed", "random_seed", type=int, default=42, show_default=True, help="Semilla del generador.")
+@click.option("--truncate", is_flag=True, help="Borrar los productos existentes (y sus datos dependientes) antes de cargar.")
+@click.option("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, show_default=True, help="Filas por executemany.")
+@click.option("--no-validate", is_flag=True, help="No validar las filas del fichero con el esquema de productos.")
+@click.option("--database-url", default=SQLALCHEMY_DATABASE_URL, show_default=True, help="Base de datos destino.")
+def seed_command(path, fmt, generate, low_stock_ratio, start, random_seed, truncate, chunk_size, no_validate, database_url):
+    """Carga productos de forma masiva (sin los datos de ejemplo si se indica --file o --generate)."""
+    if path and generate:
+        raise click.UsageError("Use --file o --generate, no ambos")
+
+    try:
+        if generate:
+            rows = generate_products(generate, low_stock_ratio, random_seed, start)
+        elif path:
+            rows = prepare_rows(read_products(path, fmt), validate=not no_validate)
+        else:
+            rows = prepare_rows(SAMPLE_PRODUCTS)
+        stats = load_products(rows, database_url, truncate=truncate, chunk_size=chunk_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    except SQLAlchemyError as e:
+        raise click.ClickException(f"Error al cargar productos: {e.__class__.__name__}: {e.orig if hasattr(e, 'orig') else e}")
+
+    click.echo(f"Insertados {stats['rows']} productos en {stats['seconds']} s ({stats['rows_per_sec']} filas/s)")
+
+
+if __name__ == "__main__":
+    sys.exit(seed_command())
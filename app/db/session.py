@@ -1,13 +1,27 @@
 # app/db/session.py
+from flask import g, has_app_context
 from .base import SessionLocal
 
 def get_db():
     """
     Obtiene una sesión de la base de datos.
     Se utiliza como generador para asegurar que la sesión se cierre después de su uso.
+    Dentro de una petición la sesión queda registrada y se cierra al terminarla: con
+    `next(get_db())` el generador se libera enseguida y la conexión que la sesión vuelve
+    a abrir al usarse no se devolvería al pool hasta la recolección de basura.
     """
     db = SessionLocal()
+    if has_app_context():
+        g.setdefault('_db_sessions', []).append(db)
     try:
         yield db
     finally:
         db.close()
+
+
+def close_request_sessions(exception=None):
+    """
+    Cierra las sesiones abiertas durante la petición (registrar con teardown_appcontext).
+    """
+    for db in g.pop('_db_sessions', []):
+        db.close()
@@ -0,0 +1,51 @@
+# app/db/synthetic.py
+"""
+Generador de catálogos sintéticos para pruebas de carga y bases de datos de staging.
+Con la misma semilla produce siempre el mismo catálogo.
+"""
+import random
+from typing import Dict, Iterator
+
+_FAMILIES = [
+    ("TOR", "Tornillo"), ("TUE", "Tuerca"), ("ARA", "Arandela"), ("CAB", "Cable"),
+    ("TUB", "Tubo"), ("BIS", "Bisagra"), ("CLA", "Clavo"), ("PIN", "Pintura"),
+    ("CIN", "Cinta"), ("MAD", "Madera"), ("SIL", "Silicona"), ("VAL", "Válvula"),
+]
+_VARIANTS = ["acero", "inoxidable", "galvanizado", "PVC", "cobre", "aluminio", "latón", "nylon"]
+_LOT_SIZES = (1.0, 1.0, 1.0, 5.0, 10.0, 25.0, 100.0)
+_MIN_ORDER_QTYS = (0.0, 0.0, 10.0, 50.0)
+
+
+def generate_products(count: int, low_stock_ratio: float = 0.1, seed: int = 42,
+                      start: int = 0) -> Iterator[Dict]:
+    """
+    Genera `count` productos como diccionarios listos para insertar en la tabla products.
+    Aproximadamente `low_stock_ratio` de ellos quedan por debajo del stock mínimo.
+    Los códigos son únicos: SYN-<familia>-<número correlativo desde `start`>.
+    """
+    if count < 0:
+        raise ValueError("La cantidad de productos no puede ser negativa")
+    if not 0 <= low_stock_ratio <= 1:
+        raise ValueError("La proporción de productos en alerta debe estar entre 0 y 1")
+
+    # Un solo random() por decisión: es varias veces más rápido que randint/choice
+    # y el generador llega a millones de filas por carga
+    rand = random.Random(seed).random
+    families = len(_FAMILIES)
+    variants = len(_VARIANTS)
+    for number in range(start, start + count):
+        prefix, family = _FAMILIES[int(rand() * families)]
+        min_stock = float(5 + int(rand() * 196))
+        if rand() < low_stock_ratio:
+            current_stock = float(int(rand() * min_stock))
+        else:
+            current_stock = float(int(min_stock + rand() * min_stock * 9))
+        yield {
+            "name": f"{family} {_VARIANTS[int(rand() * variants)]} {1 + int(rand() * 500)}mm",
+            "code": f"SYN-{prefix}-{number:08d}",
+            "current_stock": current_stock,
+            "min_stock": min_stock,
+            "unit_cost": round(0.05 + rand() * 249.95, 2),
+            "lot_size": _LOT_SIZES[int(rand() * 7)],
+            "min_order_qty": _MIN_ORDER_QTYS[int(rand() * 4)],
+        }
@@ -0,0 +1,324 @@
+# app/db/tenancy.py
+"""
+Multi-tenant: cada tenant (empresa cliente) tiene su propia base de datos.
+
+- Resolución: cabecera X-Tenant-ID o subdominio (<tenant>.TENANT_BASE_DOMAIN).
+- Enrutado: la URL del tenant sale de TENANTS_FILE (JSON {tenant: url}) o de la plantilla
+  TENANT_DATABASE_URL (por defecto un fichero SQLite por tenant). Sus motores se crean al
+  primer uso y se guardan en una caché LRU; al expulsarlos se cierran sus pools, así miles
+  de tenants pequeños comparten proceso sin mantener abiertas miles de conexiones.
+- Cada tenant en SQLite tiene su propio fichero y, con él, su propio bloqueo de escritura:
+  las escrituras de un tenant no esperan a las de otro.
+- Migraciones: `flask tenants migrate` aplica Alembic a todas las bases de datos.
+"""
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+import click
+from flask import g, jsonify, request
+from sqlalchemy.engine import Engine, make_url
+from app.db.base import create_engines, use_engines
+from app.utils.metrics import REGISTRY
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TENANCY_ENABLED = os.getenv("TENANCY_ENABLED", "False").lower() == "true"
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Tenant-ID")
+TENANT_BASE_DOMAIN = os.getenv("TENANT_BASE_DOMAIN", "")
+TENANT_DATABASE_URL = os.getenv("TENANT_DATABASE_URL", "sqlite:///./tenants/{tenant}.db")
+TENANTS_FILE = os.getenv("TENANTS_FILE", "")
+TENANT_ENGINE_CACHE_SIZE = int(os.getenv("TENANT_ENGINE_CACHE_SIZE", 64))
+
+# Identificadores válidos: se usan en rutas de fichero y URLs, nada de separadores ni puntos
+TENANT_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+# Rutas que no pertenecen a ningún tenant
+_TENANTLESS_PREFIXES = ("/api/v1/health", "/api/v1/admin/")
+
+TENANT_ENGINE_EVENTS = REGISTRY.counter(
+    "tenant_engine_events_total", "Motores de tenants creados y expulsados de la caché", ("event",))
+
+_current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+
+class UnknownTenant(ValueError):
+    """
+    El tenant no es válido o no tiene base de datos.
+    """
+    pass
+
+
+def current_tenant() -> Optional[str]:
+    """Tenant del contexto actual (petición o trabajo), o None."""
+    return _current_tenant.get()
+
+
+def _load_registry(path: str) -> Dict[str, str]:
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        registry = json.load(f)
+    invalid = [tenant for tenant in registry if not TENANT_ID_PATTERN.match(tenant)]
+    if invalid:
+        raise ValueError(f"Identificadores de tenant inválidos en {path}: {', '.join(invalid)}")
+    return registry
+
+
+def _dispose(engines: Tuple[Engine, Engine]):
+    for target in set(engines):
+        target.dispose()
+
+
+class TenantRouter:
+    """
+    Resuelve la URL de cada tenant y mantiene sus motores en una caché LRU.
+    """
+
+    def __init__(self, url_template: str = TENANT_DATABASE_URL, registry: Optional[Dict[str, str]] = None,
+                 max_engines: int = TENANT_ENGINE_CACHE_SIZE):
+        if "{tenant}" not in url_template:
+            raise ValueError("TENANT_DATABASE_URL debe contener {tenant}")
+        self.url_template = url_template
+        self.registry = registry or {}
+        self.max_engines = max(1, max_engines)
+        self._engines: "OrderedDict[str, Tuple[Engine, Engine]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sqlite_path(self, tenant_id: str) -> Optional[str]:
+        url = make_url(self.url_template.replace("{tenant}", tenant_id))
+        return url.database if url.get_backend_name() == "sqlite" else None
+
+    def database_url(self, tenant_id: str) -> str:
+        """URL de la base de datos del tenant."""
+        if not TENANT_ID_PATTERN.match(tenant_id or ""):
+            raise UnknownTenant(f"Identificador de tenant inválido: {tenant_id!r}")
+        if tenant_id in self.registry:
+            return self.registry[tenant_id]
+        return self.url_template.replace("{tenant}", tenant_id)
+
+    def exists(self, tenant_id: str) -> bool:
+        """
+        Indica si el tenant tiene base de datos: figura en el registro o, con la plantilla
+        SQLite, existe su fichero. Con bases de datos servidor se da por existente.
+        """
+        if tenant_id in self.registry:
+            return True
+        path = self._sqlite_path(tenant_id)
+        return path is None or os.path.exists(path)
+
+    def tenants(self) -> List[str]:
+        """Tenants conocidos: los del registro y los ficheros SQLite que siguen la plantilla."""
+        found = set(self.registry)
+        pattern = self._sqlite_path("{tenant}")
+        if pattern is not None:
+            prefix, _, suffix = pattern.partition("{tenant}")
+            for path in glob.glob(glob.escape(prefix) + "*" + glob.escape(suffix)):
+                tenant_id = path[len(prefix):len(path) - len(suffix)]
+                if TENANT_ID_PATTERN.match(tenant_id):
+                    found.add(tenant_id)
+        return sorted(found)
+
+    def engines_for(self, tenant_id: str) -> Tuple[Engine, Engine]:
+        """Motores (escritura, lectura) del tenant, creándolos si no están en caché."""
+        with self._lock:
+            engines = self._engines.get(tenant_id)
+            if engines is not None:
+                self._engines.move_to_end(tenant_id)
+                return engines
+
+        url = self.database_url(tenant_id)
+        created = create_engines(url, url)
+        evicted, discarded = [], None
+        with self._lock:
+            engines = self._engines.get(tenant_id)
+            if engines is None:
+                engines = self._engines[tenant_id] = created
+                TENANT_ENGINE_EVENTS.inc(event="created")
+                while len(self._engines) > self.max_engines:
+                    evicted.append(self._engines.popitem(last=False)[1])
+                    TENANT_ENGINE_EVENTS.inc(event="evicted")
+            else:
+                # Otro hilo lo creó a la vez: se descarta el nuestro
+                discarded = created
+            self._engines.move_to_end(tenant_id)
+
+        # Las conexiones en uso siguen válidas: el pool las cierra al devolverlas
+        for pair in evicted + ([discarded] if discarded else []):
+            _dispose(pair)
+        return engines
+
+    def cached_tenants(self) -> List[str]:
+        """Tenants con motores en caché (los usados recientemente)."""
+        with self._lock:
+            return list(self._engines)
+
+    def dispose(self):
+        """Cierra los pools de todos los tenants."""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for pair in engines:
+            _dispose(pair)
+
+
+_router: Optional[TenantRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_tenant_router() -> TenantRouter:
+    """Router de tenants del proceso, creado con la configuración del entorno."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = TenantRouter(registry=_load_registry(TENANTS_FILE))
+        return _router
+
+
+def _tenant_count() -> Dict[tuple, float]:
+    if _router is None:
+        return {}
+    return {(): len(_router.cached_tenants())}
+
+
+REGISTRY.gauge("tenant_engines_cached", "Tenants con motores abiertos en caché", callback=_tenant_count)
+
+
+@contextmanager
+def tenant_scope(tenant_id: Optional[str]) -> Iterator[None]:
+    """
+    Las sesiones creadas dentro del bloque usan la base de datos del tenant
+    (con None, la base de datos por defecto).
+    """
+    if tenant_id is None:
+        yield
+        return
+    token = _current_tenant.set(tenant_id)
+    try:
+        with use_engines(get_tenant_router().engines_for(tenant_id)):
+            yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def resolve_tenant_id() -> Optional[str]:
+    """
+    Tenant de la petición: la cabecera TENANT_HEADER o, si no viene,
+    el subdominio de TENANT_BASE_DOMAIN.
+    """
+    tenant_id = request.headers.get(TENANT_HEADER)
+    if tenant_id:
+        return tenant_id.strip().lower()
+    if TENANT_BASE_DOMAIN:
+        host = request.host.split(":", 1)[0].lower()
+        suffix = "." + TENANT_BASE_DOMAIN.lower()
+        if host.endswith(suffix):
+            return host[:-len(suffix)]
+    return None
+
+
+def setup_tenancy(app):
+    """
+    Resuelve el tenant de cada petición de la API y enruta sus sesiones a su base de datos.
+    Registrar antes que los demás before_request que usen la base de datos.
+    """
+    router = get_tenant_router()
+
+    @app.before_request
+    def _enter_tenant():
+        if not request.path.startswith("/api/") or request.path.startswith(_TENANTLESS_PREFIXES):
+            return None
+        tenant_id = resolve_tenant_id()
+        if tenant_id is None:
+            return jsonify({
+                'error': f'Indique el tenant (cabecera {TENANT_HEADER} o subdominio)'
+            }), 400
+        try:
+            router.database_url(tenant_id)
+            if not router.exists(tenant_id):
+                raise UnknownTenant(f"No existe el tenant {tenant_id}")
+        except UnknownTenant as e:
+            return jsonify({
+                'error': str(e)
+            }), 404
+        g.tenant_id = tenant_id
+        g.tenant_scope = ExitStack()
+        g.tenant_scope.enter_context(tenant_scope(tenant_id))
+        return None
+
+    @app.teardown_request
+    def _exit_tenant(exc):
+        scope = g.pop("tenant_scope", None)
+        if scope is not None:
+            scope.close()
+
+    return app
+
+
+def migrate_tenant(tenant_id: str, revision: str = "head", router: Optional[TenantRouter] = None):
+    """
+    Aplica las migraciones de Alembic a la base de datos del tenant (creando el fichero
+    SQLite si no existe).
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    router = router or get_tenant_router()
+    url = router.database_url(tenant_id)
+    path = router._sqlite_path(tenant_id) if tenant_id not in router.registry else None
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    config = Config()
+    config.set_main_option("script_location", os.path.join(project_root, "migrations"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(config, revision)
+
+
+@click.group("tenants")
+def tenants_command():
+    """Gestión de las bases de datos de los tenants."""
+
+
+@tenants_command.command("list")
+def list_tenants_command():
+    """Lista los tenants conocidos y su base de datos."""
+    router = get_tenant_router()
+    for tenant_id in router.tenants():
+        click.echo(f"{tenant_id}\t{make_url(router.database_url(tenant_id)).render_as_string(hide_password=True)}")
+
+
+@tenants_command.command("migrate")
+@click.option("--tenant", "tenant_ids", multiple=True, help="Tenant a migrar (repetible); por defecto, todos.")
+@click.option("--revision", default="head", show_default=True, help="Revisión de Alembic de destino.")
+def migrate_tenants_command(tenant_ids, revision):
+    """
+    Aplica las migraciones a todos los tenants (o a los indicados, que se crean si no existen).
+    Un fallo en un tenant no detiene al resto; el comando termina con error si alguno falló.
+    """
+    router = get_tenant_router()
+    targets = list(tenant_ids) or router.tenants()
+    failed = []
+    for tenant_id in targets:
+        try:
+            migrate_tenant(tenant_id, revision, router)
+            click.echo(f"{tenant_id}: ok")
+        except Exception as e:
+            logger.exception("Error al migrar el tenant %s", tenant_id)
+            failed.append(tenant_id)
+            click.echo(f"{tenant_id}: error: {e}", err=True)
+    click.echo(f"{len(targets) - len(failed)} de {len(targets)} tenants migrados a {revision}")
+    if failed:
+        raise click.ClickException(f"Fallaron: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    sys.exit(tenants_command())
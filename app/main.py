@@ -2,8 +2,25 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from app.api.v1 import api_v1
-from app.db.base import Base, engine
+from app.db.base import Base, engine, read_engine
+from app.db.session import close_request_sessions
+from app.db.tenancy import TENANCY_ENABLED, get_tenant_router, setup_tenancy, tenants_command
+from app.db.seed import seed_command
+from app.services.export_service import export_command
 from app.utils.swagger import setup_swagger
+from app.utils.metrics import setup_metrics, instrument_engine
+from app.utils.diagnostics import setup_diagnostics
+from app.utils.profiling import setup_profiling
+from app.utils.compression import setup_compression
+from app.utils.health import configure_health
+from app.utils.admission import (
+    AdmissionController, DEFAULT_LIMITS, DEFAULT_QUEUE_SIZES, parse_class_values, setup_admission
+)
+from app.services.reservation_service import start_reservation_sweeper
+from app.services.job_service import start_job_runner
+from app.services.write_queue import start_write_queue
+from app.services.inventory_state import start_inventory_state
+from app.services.alert_service import SmtpChannel, WebhookChannel, start_alert_dispatcher
 import os
 import logging
 from dotenv import load_dotenv
@@ -29,14 +46,83 @@ def create_app():
     app.config['JSON_SORT_KEYS'] = False
     app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
 
+    # Importación de catálogos
+    app.config['IMPORT_CHUNK_SIZE'] = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+    app.config['IMPORT_WORKERS'] = int(os.getenv("IMPORT_WORKERS", os.cpu_count() or 1))
+    app.config['IMPORT_PARALLEL_MIN_BYTES'] = int(os.getenv("IMPORT_PARALLEL_MIN_BYTES", 1024 * 1024))
+    app.config['IMPORT_MAX_ERRORS'] = int(os.getenv("IMPORT_MAX_ERRORS", 1000))
+    # Ficheros a partir de este tamaño se importan como trabajo en segundo plano (o con ?async=true)
+    app.config['IMPORT_ASYNC_MIN_BYTES'] = int(os.getenv("IMPORT_ASYNC_MIN_BYTES", 10 * 1024 * 1024))
+    # Directorio de los ficheros subidos que esperan a su trabajo (por defecto, el temporal del sistema)
+    app.config['IMPORT_UPLOAD_DIR'] = os.getenv("IMPORT_UPLOAD_DIR") or None
+
+    # Espera máxima de una petición por la confirmación de la cola de escritura
+    app.config['WRITE_QUEUE_TIMEOUT'] = float(os.getenv("WRITE_QUEUE_TIMEOUT", 30))
+
     # CORS para permitir solicitudes desde el frontend
     CORS(app, resources={r"/api/*": {"origins": os.getenv("CORS_ORIGINS", "*")}})
 
+    # Compresión negociada (gzip/zstd/br); se registra pronto para ejecutarse tras los demás after_request
+    if os.getenv("COMPRESSION_ENABLED", "True").lower() == "true":
+        setup_compression(app, min_size=int(os.getenv("COMPRESSION_MIN_SIZE", 1024)))
+
     # Registrar blueprints de la API
     app.register_blueprint(api_v1)
 
     setup_swagger(app)
 
+    # Comandos de línea de órdenes (flask seed, flask export, flask tenants)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(export_command)
+    app.cli.add_command(tenants_command)
+
+    # Devolver al pool las conexiones de las sesiones de cada petición
+    app.teardown_appcontext(close_request_sessions)
+
+    # Métricas de latencia, SQL y pool en /metrics
+    setup_metrics(app, engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine, "reader")
+
+    # Multi-tenant: cada petición de la API usa la base de datos de su tenant
+    if TENANCY_ENABLED:
+        setup_tenancy(app)
+
+    # Control de admisión: límites de concurrencia por clase de ruta y 503 al saturarse
+    if os.getenv("ADMISSION_CONTROL_ENABLED", "True").lower() == "true":
+        setup_admission(
+            app,
+            AdmissionController(
+                max_concurrency=int(os.getenv("ADMISSION_MAX_CONCURRENCY", 32)),
+                limits=parse_class_values(os.getenv("ADMISSION_LIMITS"), DEFAULT_LIMITS),
+                queue_sizes=parse_class_values(os.getenv("ADMISSION_QUEUE_SIZES"), DEFAULT_QUEUE_SIZES),
+                max_wait=float(os.getenv("ADMISSION_MAX_WAIT_MS", 2000)) / 1000,
+            ),
+            retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", 1)),
+        )
+
+    # Perfilado de peticiones individuales (cabecera X-Profile, solo administradores)
+    setup_profiling(app)
+
+    # Diagnóstico de consultas lentas y repetidas (opcional, con EXPLAIN)
+    if os.getenv("DB_DIAGNOSTICS_ENABLED", "False").lower() == "true":
+        setup_diagnostics(
+            app,
+            {engine, read_engine},
+            slow_query_ms=float(os.getenv("SLOW_QUERY_MS", 100)),
+            explain=os.getenv("DB_EXPLAIN_SLOW_QUERIES", "True").lower() == "true",
+            repeat_threshold=int(os.getenv("REPEATED_STATEMENT_THRESHOLD", 2)),
+        )
+
+    # Comprobaciones de /health/ready: plazo de la consulta, caché y umbrales de saturación
+    configure_health(
+        ttl=float(os.getenv("HEALTH_CACHE_TTL", 2)),
+        timeout=float(os.getenv("HEALTH_DB_TIMEOUT", 2)),
+        pool_max_utilization=float(os.getenv("HEALTH_POOL_MAX_UTILIZATION", 1)),
+        backlog_max_utilization=float(os.getenv("HEALTH_BACKLOG_MAX_UTILIZATION", 0.9)),
+        check_migrations=os.getenv("HEALTH_CHECK_MIGRATIONS", "True").lower() == "true",
+    )
+
     # Configurar manejo de errores
     @app.errorhandler(404)
     def not_found(e):
@@ -49,6 +135,70 @@ def create_app():
     # Crear tablas en la base de datos
     Base.metadata.create_all(bind=engine)
 
+    # Trabajos en segundo plano (importaciones, exportaciones, recálculos...)
+    start_job_runner(
+        max_workers=int(os.getenv("JOBS_MAX_WORKERS", 2)),
+        max_pending=int(os.getenv("JOBS_MAX_PENDING", 100)),
+        retention_hours=float(os.getenv("JOBS_RETENTION_HOURS", 24)),
+    )
+
+    # Cola de escritura con group commit para los movimientos de stock (opcional)
+    if os.getenv("WRITE_QUEUE_ENABLED", "False").lower() == "true":
+        start_write_queue(
+            max_batch_size=int(os.getenv("WRITE_QUEUE_MAX_BATCH", 64)),
+            max_latency=float(os.getenv("WRITE_QUEUE_MAX_LATENCY_MS", 2)) / 1000,
+            max_pending=int(os.getenv("WRITE_QUEUE_MAX_PENDING", 10000)),
+        )
+
+    # Estado de inventario en memoria con log y checkpoints (opcional, requiere numpy)
+    if os.getenv("INVENTORY_STATE_ENABLED", "False").lower() == "true":
+        start_inventory_state(
+            log_dir=os.getenv("INVENTORY_STATE_DIR", "./inventory_state"),
+            fsync=os.getenv("INVENTORY_STATE_FSYNC", "True").lower() == "true",
+            checkpoint_interval=float(os.getenv("INVENTORY_STATE_CHECKPOINT_INTERVAL", 1)),
+            checkpoint_max_pending=int(os.getenv("INVENTORY_STATE_CHECKPOINT_MAX_PENDING", 10000)),
+        )
+
+    # Resúmenes periódicos de alertas de stock por correo (mailto:) y webhook (http(s)://) (opcional)
+    if os.getenv("ALERT_DISPATCHER_ENABLED", "False").lower() == "true":
+        webhook = WebhookChannel(
+            timeout=float(os.getenv("ALERT_WEBHOOK_TIMEOUT", 10)),
+            secret=os.getenv("ALERT_WEBHOOK_SECRET"),
+        )
+        start_alert_dispatcher(
+            recipients=[r.strip() for r in os.getenv("ALERT_RECIPIENTS", "").split(",") if r.strip()],
+            channels={
+                "mailto": SmtpChannel(
+                    host=os.getenv("SMTP_HOST", "localhost"),
+                    port=int(os.getenv("SMTP_PORT", 25)),
+                    sender=os.getenv("ALERT_EMAIL_FROM", "inventario@localhost"),
+                    username=os.getenv("SMTP_USERNAME"),
+                    password=os.getenv("SMTP_PASSWORD"),
+                    starttls=os.getenv("SMTP_STARTTLS", "False").lower() == "true",
+                    timeout=float(os.getenv("SMTP_TIMEOUT", 10)),
+                ),
+                "http": webhook,
+                "https": webhook,
+            },
+            digest_interval=float(os.getenv("ALERT_DIGEST_INTERVAL", 300)),
+            scan_interval=float(os.getenv("ALERT_SCAN_INTERVAL", 60)),
+            max_workers=int(os.getenv("ALERT_DELIVERY_WORKERS", 4)),
+            max_pending_deliveries=int(os.getenv("ALERT_DELIVERY_MAX_PENDING", 100)),
+            max_attempts=int(os.getenv("ALERT_DELIVERY_MAX_ATTEMPTS", 5)),
+            retry_backoff=float(os.getenv("ALERT_DELIVERY_BACKOFF", 1)),
+            retry_backoff_max=float(os.getenv("ALERT_DELIVERY_BACKOFF_MAX", 60)),
+            max_items=int(os.getenv("ALERT_DIGEST_MAX_ITEMS", 500)),
+            tenants=get_tenant_router().cached_tenants if TENANCY_ENABLED else None,
+        )
+
+    # Expiración de reservas en segundo plano
+    if os.getenv("RESERVATION_SWEEPER_ENABLED", "True").lower() == "true":
+        start_reservation_sweeper(
+            batch_size=int(os.getenv("RESERVATION_SWEEP_BATCH_SIZE", 1000)),
+            max_interval=float(os.getenv("RESERVATION_SWEEP_INTERVAL", 5)),
+            tenants=get_tenant_router().cached_tenants if TENANCY_ENABLED else None,
+        )
+
     return app
 
 
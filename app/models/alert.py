@@ -0,0 +1,32 @@
+# app/models/alert.py
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, text
+from app.db.base import Base
+
+
+class StockAlertState(Base):
+    """
+    Último estado de alerta conocido de un producto (low: por debajo del mínimo, ok: recuperado).
+    `pending` indica que el estado difiere del último notificado: el despachador de alertas
+    lo incluye en el próximo resumen y lo reclama al enviarlo, de modo que cada transición
+    se notifica una sola vez aunque el stock oscile entre resúmenes.
+    """
+    __tablename__ = "stock_alert_states"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(10), nullable=False)  # low, ok
+    pending = Column(Boolean, nullable=False, default=True)
+    changed_at = Column(DateTime, nullable=False)
+    notified_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Índice parcial de las transiciones por notificar: el resumen nunca recorre la tabla
+        Index(
+            "ix_stock_alert_states_pending",
+            "product_id",
+            sqlite_where=text("pending"),
+            postgresql_where=text("pending"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<StockAlertState product={self.product_id}: {self.status}{' (pending)' if self.pending else ''}>"
@@ -0,0 +1,19 @@
+# app/models/inventory_state.py
+from sqlalchemy import Column, String, Integer, DateTime
+from app.db.base import Base
+
+
+class InventoryCheckpoint(Base):
+    """
+    Último registro del log del estado de inventario en memoria aplicado a la tabla de productos.
+    Se actualiza en la misma transacción que el checkpoint: al recuperar, solo se reaplican
+    los registros posteriores.
+    """
+    __tablename__ = "inventory_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    last_sequence = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<InventoryCheckpoint {self.name}: {self.last_sequence}>"
@@ -0,0 +1,33 @@
+# app/models/job.py
+from sqlalchemy import Column, String, Float, Boolean, DateTime, Text, Index
+from app.db.base import Base
+
+
+class Job(Base):
+    """
+    Trabajo en segundo plano (importaciones, exportaciones, recálculos...).
+    Su estado se persiste para poder consultarlo desde cualquier petición.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(String(36), primary_key=True)
+    type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed, cancelled
+    progress = Column(Float, nullable=False, default=0)
+    params = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    owner = Column(String(100), nullable=True)  # host:pid del proceso que lo ejecuta
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Consultas por estado y purga de trabajos terminados por antigüedad
+        Index("ix_jobs_status_finished_at", "status", "finished_at"),
+        Index("ix_jobs_created_at", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.type}: {self.status}>"
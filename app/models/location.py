@@ -0,0 +1,71 @@
+# app/models/location.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class StockLocation(Base):
+    """
+    Modelo SQLAlchemy para las ubicaciones (almacenes) de stock.
+    """
+    __tablename__ = "stock_locations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(50), unique=True, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<StockLocation {self.code}: {self.name}>"
+
+
+class StockBalance(Base):
+    """
+    Saldo de un producto en una ubicación.
+    La suma de los saldos de un producto se mantiene agregada en Product.current_stock.
+    """
+    __tablename__ = "stock_balances"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    location_id = Column(Integer, ForeignKey("stock_locations.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Float, nullable=False, default=0)
+    min_stock = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("location_id", "product_id", name="uq_stock_balances_location_product"),
+        # Índice parcial con las alertas de cada ubicación
+        Index(
+            "ix_stock_balances_low_stock",
+            "location_id",
+            sqlite_where=text("quantity < min_stock"),
+            postgresql_where=text("quantity < min_stock"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<StockBalance product={self.product_id} location={self.location_id}: {self.quantity}>"
+
+
+class StockMovement(Base):
+    """
+    Registro (ledger) de movimientos de stock entre ubicaciones.
+    """
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    from_location_id = Column(Integer, ForeignKey("stock_locations.id", ondelete="SET NULL"), nullable=True)
+    to_location_id = Column(Integer, ForeignKey("stock_locations.id", ondelete="SET NULL"), nullable=True)
+    kind = Column(String(20), nullable=False)  # receipt, issue, transfer, opening (saldo inicial)
+    quantity = Column(Float, nullable=False)
+    reference = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_stock_movements_product_created", "product_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<StockMovement {self.kind} product={self.product_id}: {self.quantity}>"
@@ -0,0 +1,47 @@
+# app/models/lot.py
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Lot(Base):
+    """
+    Lote de un producto con su cantidad remanente, fecha de caducidad y ubicación.
+    La suma de los lotes de una ubicación es (a lo sumo) el saldo del producto en ella.
+    """
+    __tablename__ = "lots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    # Nulo solo en lotes anteriores a las ubicaciones que la migración no pudo asignar
+    location_id = Column(Integer, ForeignKey("stock_locations.id", ondelete="CASCADE", name="fk_lots_location_id_stock_locations"), nullable=True)
+    lot_number = Column(String(50), nullable=False)
+    quantity = Column(Float, nullable=False)
+    initial_quantity = Column(Float, nullable=False)
+    expiry_date = Column(Date, nullable=False)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("product_id", "lot_number", name="uq_lots_product_lot_number"),
+        # Lotes con existencias de un producto y ubicación en orden FEFO: la asignación solo toca
+        # los lotes que consume
+        Index(
+            "ix_lots_product_location_expiry",
+            "product_id",
+            "location_id",
+            "expiry_date",
+            "id",
+            sqlite_where=text("quantity > 0"),
+            postgresql_where=text("quantity > 0"),
+        ),
+        # Lotes con existencias por caducidad en todo el catálogo
+        Index(
+            "ix_lots_expiry",
+            "expiry_date",
+            sqlite_where=text("quantity > 0"),
+            postgresql_where=text("quantity > 0"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Lot {self.lot_number} product={self.product_id}: {self.quantity}>"
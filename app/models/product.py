@@ -1,5 +1,5 @@
 # app/models/product.py
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -14,8 +14,40 @@ class Product(Base):
     code = Column(String(50), unique=True, nullable=False, index=True)
     current_stock = Column(Float, nullable=False, default=0)
     min_stock = Column(Float, nullable=False, default=0)
+    reserved_stock = Column(Float, nullable=False, default=0, server_default="0")
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="SET NULL", name="fk_products_supplier_id_suppliers"), nullable=True, index=True)
+    unit_cost = Column(Float, nullable=False, default=0, server_default="0")
+    lot_size = Column(Float, nullable=False, default=1, server_default="1")
+    min_order_qty = Column(Float, nullable=False, default=0, server_default="0")
+    # Versión de la fila para control de concurrencia optimista (ETag / If-Match);
+    # se incrementa en cada UPDATE del producto
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Clasificación ABC (valor de consumo) y XYZ (variabilidad de la demanda); la calcula
+    # AnalyticsService.classify_products, NULL hasta la primera clasificación
+    abc_class = Column(String(1), nullable=True)
+    xyz_class = Column(String(1), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Índice parcial: solo contiene los productos en alerta, así /alerts no recorre todo el catálogo
+        Index(
+            "ix_products_low_stock",
+            "id",
+            sqlite_where=text("current_stock < min_stock"),
+            postgresql_where=text("current_stock < min_stock"),
+        ),
+        # Filtros por clase en /products y /alerts
+        Index("ix_products_abc_xyz", "abc_class", "xyz_class"),
+        # Sin AUTOINCREMENT, SQLite reutiliza el ID más alto tras borrarlo: un producto nuevo
+        # heredaría referencias externas (pedidos, integraciones) del eliminado
+        {"sqlite_autoincrement": True},
+    )
+
+    @property
+    def available_stock(self) -> float:
+        """Stock disponible: el actual menos lo reservado."""
+        return (self.current_stock or 0) - (self.reserved_stock or 0)
+
     def __repr__(self):
         return f"<Product {self.code}: {self.name}>"
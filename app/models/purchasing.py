@@ -0,0 +1,57 @@
+# app/models/purchasing.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Supplier(Base):
+    """
+    Modelo SQLAlchemy para los proveedores.
+    """
+    __tablename__ = "suppliers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(50), unique=True, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<Supplier {self.code}: {self.name}>"
+
+
+class PurchaseSuggestionBatch(Base):
+    """
+    Lote (ejecución) de sugerencias de compra generado a partir de las alertas.
+    """
+    __tablename__ = "purchase_suggestion_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    use_available = Column(Integer, nullable=False, default=1)
+    line_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<PurchaseSuggestionBatch {self.id}: {self.line_count} líneas>"
+
+
+class PurchaseSuggestion(Base):
+    """
+    Línea de compra sugerida para un producto, agrupable por proveedor.
+    """
+    __tablename__ = "purchase_suggestions"
+
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(Integer, ForeignKey("purchase_suggestion_batches.id", ondelete="CASCADE"), nullable=False)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="SET NULL"), nullable=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    shortage = Column(Float, nullable=False)
+    quantity = Column(Float, nullable=False)
+    unit_cost = Column(Float, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_purchase_suggestions_batch_supplier", "batch_id", "supplier_id", "product_id"),
+    )
+
+    def __repr__(self):
+        return f"<PurchaseSuggestion batch={self.batch_id} product={self.product_id}: {self.quantity}>"
@@ -0,0 +1,35 @@
+# app/models/reservation.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Reservation(Base):
+    """
+    Reserva (retención) de stock de un producto con fecha de expiración.
+    Mientras está activa, su cantidad se suma en Product.reserved_stock.
+    """
+    __tablename__ = "reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    quantity = Column(Float, nullable=False)
+    status = Column(String(20), nullable=False, default="active")  # active, released, committed, expired
+    reference = Column(String(100), nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    closed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Índice parcial sobre las reservas activas ordenadas por expiración:
+        # el barrido lee solo las vencidas, nunca la tabla completa
+        Index(
+            "ix_reservations_active_expires_at",
+            "expires_at",
+            sqlite_where=text("status = 'active'"),
+            postgresql_where=text("status = 'active'"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Reservation {self.id} product={self.product_id}: {self.quantity} ({self.status})>"
@@ -0,0 +1,34 @@
+# app/schemas/alert.py
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+from typing import List, Optional
+from app.schemas.product import AlertProduct
+
+
+class ResolvedAlert(BaseModel):
+    """
+    Producto que salió de la alerta (su stock volvió a alcanzar el mínimo).
+    """
+    id: int
+    name: str
+    code: str
+    current_stock: float
+    min_stock: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AlertDigest(BaseModel):
+    """
+    Resumen periódico de alertas de stock: productos que entraron en alerta y que se
+    recuperaron desde el resumen anterior. `id` se repite en los reintentos de un envío.
+    """
+    id: str
+    generated_at: datetime
+    tenant: Optional[str] = None
+    alerts: List[AlertProduct]
+    resolved: List[ResolvedAlert]
+    total_alerts: int
+    total_resolved: int
+    # Productos cuyas transiciones se reclamaron (no se envía): se liberan si falla la entrega
+    product_ids: List[int] = Field(default_factory=list, exclude=True)
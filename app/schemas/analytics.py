@@ -0,0 +1,38 @@
+# app/schemas/analytics.py
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Optional
+
+ABC_CLASSES = ("A", "B", "C")
+XYZ_CLASSES = ("X", "Y", "Z")
+
+
+class ClassificationRequest(BaseModel):
+    """
+    Parámetros de la clasificación ABC/XYZ.
+    """
+    period_days: int = Field(7, ge=1, le=366, description="Días de cada periodo de demanda")
+    periods: int = Field(26, ge=2, le=520, description="Periodos de historia analizados")
+    a_share: float = Field(0.8, gt=0, lt=1, description="Parte acumulada del valor de consumo que forma la clase A")
+    b_share: float = Field(0.95, gt=0, le=1, description="Parte acumulada del valor de consumo que cubren A y B")
+    x_max_cv: float = Field(0.5, gt=0, description="Coeficiente de variación máximo de la clase X")
+    y_max_cv: float = Field(1.0, gt=0, description="Coeficiente de variación máximo de la clase Y")
+
+    @model_validator(mode='after')
+    def thresholds_ordered(self):
+        """Los umbrales de cada clase deben ser crecientes"""
+        if self.a_share >= self.b_share:
+            raise ValueError('a_share debe ser menor que b_share')
+        if self.x_max_cv >= self.y_max_cv:
+            raise ValueError('x_max_cv debe ser menor que y_max_cv')
+        return self
+
+
+class ClassificationResult(BaseModel):
+    """
+    Resultado de una clasificación: productos por clase (p. ej. "AX") y cuántos cambiaron.
+    """
+    products: int
+    changed: int
+    seconds: Optional[float] = None
+    classes: Dict[str, int]
+    parameters: Optional[ClassificationRequest] = None
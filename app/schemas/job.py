@@ -0,0 +1,39 @@
+# app/schemas/job.py
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Any, Dict, Optional
+from datetime import datetime
+import json
+
+
+class JobCreate(BaseModel):
+    """
+    Esquema para encolar un trabajo.
+    """
+    type: str = Field(..., min_length=1, max_length=50, description="Tipo de trabajo registrado")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parámetros del trabajo")
+
+
+class JobResponse(BaseModel):
+    """
+    Esquema para respuestas de trabajos.
+    """
+    id: str
+    type: str
+    status: str
+    progress: float
+    params: Optional[Dict[str, Any]] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('params', 'result', mode='before')
+    def parse_json(cls, v):
+        """Los parámetros y el resultado se almacenan como JSON en texto"""
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
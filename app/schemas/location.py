@@ -0,0 +1,125 @@
+# app/schemas/location.py
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
+from typing import List, Optional
+from datetime import datetime
+import re
+
+
+class LocationBase(BaseModel):
+    """
+    Esquema base para ubicaciones de stock.
+    """
+    code: str = Field(..., min_length=1, max_length=50, description="Código único de la ubicación")
+    name: str = Field(..., min_length=1, max_length=100, description="Nombre de la ubicación")
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('code')
+    def code_must_be_alphanumeric(cls, v):
+        """Validar que el código sea alfanumérico, sin espacios ni caracteres especiales"""
+        if not re.match(r'^[a-zA-Z0-9-_]+$', v):
+            raise ValueError('El código debe contener solo letras, números, guiones o guiones bajos')
+        return v.upper()
+
+
+class LocationCreate(LocationBase):
+    """
+    Esquema para la creación de ubicaciones.
+    """
+    pass
+
+
+class LocationResponse(LocationBase):
+    """
+    Esquema para respuestas de ubicaciones.
+    """
+    id: int
+    created_at: datetime
+
+
+class StockBalanceResponse(BaseModel):
+    """
+    Esquema para el saldo de un producto en una ubicación.
+    """
+    product_id: int
+    location_id: int
+    quantity: float
+    min_stock: float
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockBalanceUpdate(BaseModel):
+    """
+    Esquema para actualizar el stock mínimo de un producto en una ubicación.
+    """
+    min_stock: float = Field(..., ge=0)
+
+
+class OpeningBalanceCreate(BaseModel):
+    """
+    Esquema para registrar el saldo inicial de productos sin saldos por ubicación.
+    """
+    product_ids: Optional[List[int]] = Field(None, min_length=1, description="Productos a abrir (todos los que no tienen saldos si se omite)")
+
+
+class OpeningBalanceResult(BaseModel):
+    """
+    Resultado del registro de saldos iniciales.
+    """
+    location_id: int
+    opened: int
+    product_ids: List[int]
+
+
+class StockMovementCreate(BaseModel):
+    """
+    Esquema para registrar un movimiento de stock.
+    Sin origen es una entrada, sin destino una salida y con ambos una transferencia.
+    """
+    product_id: int
+    quantity: float = Field(..., gt=0, description="Cantidad a mover")
+    from_location_id: Optional[int] = None
+    to_location_id: Optional[int] = None
+    reference: Optional[str] = Field(None, max_length=100)
+
+    @model_validator(mode='after')
+    def check_locations(self):
+        """Validar que el movimiento tenga al menos una ubicación y que no sea a sí misma"""
+        if self.from_location_id is None and self.to_location_id is None:
+            raise ValueError('Debe indicar una ubicación de origen o de destino')
+        if self.from_location_id == self.to_location_id:
+            raise ValueError('La ubicación de origen y destino no pueden ser la misma')
+        return self
+
+
+class StockMovementResponse(BaseModel):
+    """
+    Esquema para respuestas de movimientos de stock.
+    """
+    id: int
+    product_id: int
+    from_location_id: Optional[int] = None
+    to_location_id: Optional[int] = None
+    kind: str
+    quantity: float
+    reference: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LocationAlert(BaseModel):
+    """
+    Esquema para alertas de stock bajo en una ubicación.
+    """
+    product_id: int
+    product_code: str
+    location_id: int
+    location_code: str
+    quantity: float
+    min_stock: float
+    difference: float
+
+    model_config = ConfigDict(from_attributes=True)
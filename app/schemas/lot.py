@@ -0,0 +1,66 @@
+# app/schemas/lot.py
+from pydantic import BaseModel, Field, field_validator, ConfigDict
+from typing import List, Optional
+from datetime import date, datetime
+import re
+
+
+class LotCreate(BaseModel):
+    """
+    Esquema para la recepción de un lote.
+    """
+    lot_number: str = Field(..., min_length=1, max_length=50, description="Número de lote del proveedor")
+    quantity: float = Field(..., gt=0, description="Cantidad recibida")
+    expiry_date: date = Field(..., description="Fecha de caducidad")
+    location_id: int = Field(..., description="Ubicación donde se recibe el lote")
+
+    @field_validator('lot_number')
+    def lot_number_must_be_alphanumeric(cls, v):
+        """Validar que el número de lote sea alfanumérico, sin espacios ni caracteres especiales"""
+        if not re.match(r'^[a-zA-Z0-9-_]+$', v):
+            raise ValueError('El número de lote debe contener solo letras, números, guiones o guiones bajos')
+        return v.upper()
+
+
+class LotResponse(BaseModel):
+    """
+    Esquema para respuestas de lotes.
+    """
+    id: int
+    product_id: int
+    location_id: Optional[int] = None
+    lot_number: str
+    quantity: float
+    initial_quantity: float
+    expiry_date: date
+    received_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LotConsume(BaseModel):
+    """
+    Esquema para consumir stock de los lotes de un producto.
+    """
+    quantity: float = Field(..., gt=0, description="Cantidad a consumir")
+    location_id: int = Field(..., description="Ubicación de la que sale el stock")
+    reference: Optional[str] = Field(None, max_length=100)
+
+
+class LotAllocation(BaseModel):
+    """
+    Cantidad tomada de un lote en un consumo.
+    """
+    lot_id: int
+    lot_number: str
+    expiry_date: date
+    quantity: float
+
+
+class LotConsumeResponse(BaseModel):
+    """
+    Esquema de respuesta de un consumo FEFO.
+    """
+    product_id: int
+    quantity: float
+    allocations: List[LotAllocation]
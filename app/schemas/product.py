@@ -1,6 +1,6 @@
 # app/schemas/product.py
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
+from typing import Any, List, Literal, Optional
 from datetime import datetime
 import re
 
@@ -13,6 +13,10 @@ class ProductBase(BaseModel):
     code: str = Field(..., min_length=1, max_length=50, description="Código único del producto")
     current_stock: float = Field(..., ge=0, description="Stock actual del producto")
     min_stock: float = Field(..., ge=0, description="Stock mínimo del producto")
+    supplier_id: Optional[int] = Field(None, description="Proveedor habitual del producto")
+    unit_cost: float = Field(0, ge=0, description="Costo unitario de compra")
+    lot_size: float = Field(1, gt=0, description="Múltiplo de pedido al proveedor")
+    min_order_qty: float = Field(0, ge=0, description="Cantidad mínima de pedido")
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -38,15 +42,38 @@ class ProductUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     current_stock: Optional[float] = Field(None, ge=0)
     min_stock: Optional[float] = Field(None, ge=0)
+    supplier_id: Optional[int] = None
+    unit_cost: Optional[float] = Field(None, ge=0)
+    lot_size: Optional[float] = Field(None, gt=0)
+    min_order_qty: Optional[float] = Field(None, ge=0)
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductImportUpdate(ProductUpdate):
+    """
+    Fila de importación para un código que ya existe: basta el código y las columnas a cambiar.
+    """
+    code: str = Field(..., min_length=1, max_length=50, description="Código del producto existente")
+
+    @field_validator('code')
+    def code_must_be_alphanumeric(cls, v):
+        """Mismas reglas y normalización que el código de ProductBase"""
+        if not re.match(r'^[a-zA-Z0-9-_]+$', v):
+            raise ValueError('El código debe contener solo letras, números, guiones o guiones bajos')
+        return v.upper()
+
+
 class ProductInDB(ProductBase):
     """
     Esquema para representar un producto almacenado en la base de datos.
     """
     id: int
+    reserved_stock: float = 0
+    available_stock: float = 0
+    abc_class: Optional[str] = Field(None, description="Clase ABC por valor de consumo")
+    xyz_class: Optional[str] = Field(None, description="Clase XYZ por variabilidad de la demanda")
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -68,5 +95,80 @@ class AlertProduct(BaseModel):
     current_stock: float
     min_stock: float
     difference: float
+    abc_class: Optional[str] = None
+    xyz_class: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StockAdjustment(BaseModel):
+    """
+    Esquema para sumar (o restar, con delta negativo) stock a un producto.
+    """
+    delta: float = Field(..., description="Cantidad a sumar al stock actual (negativa para restar)")
+
+    @field_validator('delta')
+    def delta_not_zero(cls, v):
+        """Un ajuste nulo no tiene efecto"""
+        if v == 0:
+            raise ValueError('El ajuste no puede ser 0')
+        return v
+
+
+class ProductFilterCondition(BaseModel):
+    """
+    Condición de un filtro de productos para operaciones masivas.
+    """
+    field: str = Field(..., description="Campo del producto")
+    op: Literal["eq", "ne", "lt", "le", "gt", "ge", "in", "prefix", "is_null"] = Field("eq", description="Operador")
+    value: Any = Field(None, description="Valor a comparar (lista para 'in', booleano para 'is_null')")
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+
+class ProductSelector(BaseModel):
+    """
+    Selección de productos para operaciones masivas: por IDs, por códigos o por filtro.
+    """
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    codes: Optional[List[str]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[List[ProductFilterCondition]] = Field(None, min_length=1, description="Condiciones (AND)")
+
+    @field_validator('codes')
+    def normalize_codes(cls, v):
+        """Los códigos se guardan en mayúsculas"""
+        return [code.upper() for code in v] if v is not None else v
+
+    @model_validator(mode='after')
+    def exactly_one_selector(self):
+        """Exigir exactamente un criterio de selección"""
+        selectors = [self.ids, self.codes, self.filter]
+        if sum(selector is not None for selector in selectors) != 1:
+            raise ValueError('Indique exactamente uno de: ids, codes o filter')
+        return self
+
+
+class ProductBulkUpdate(ProductSelector):
+    """
+    Esquema para la actualización masiva de productos.
+    """
+    changes: ProductUpdate = Field(..., description="Campos a asignar en todos los productos seleccionados")
+
+    @model_validator(mode='after')
+    def changes_not_empty(self):
+        """Exigir al menos un campo a modificar"""
+        if not self.changes.model_dump(exclude_unset=True):
+            raise ValueError('Indique al menos un campo en changes')
+        return self
+
+
+class ProductBulkDelete(ProductSelector):
+    """
+    Esquema para el borrado masivo de productos.
+    """
+    pass
+
+
+class ProductBulkResult(BaseModel):
+    """
+    Resultado de una operación masiva.
+    """
+    affected: int
+    ids: List[int]
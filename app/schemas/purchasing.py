@@ -0,0 +1,75 @@
+# app/schemas/purchasing.py
+from pydantic import BaseModel, Field, field_validator, ConfigDict
+from typing import List, Optional
+from datetime import datetime
+import re
+
+
+class SupplierCreate(BaseModel):
+    """
+    Esquema para la creación de proveedores.
+    """
+    code: str = Field(..., min_length=1, max_length=50, description="Código único del proveedor")
+    name: str = Field(..., min_length=1, max_length=100, description="Nombre del proveedor")
+
+    @field_validator('code')
+    def code_must_be_alphanumeric(cls, v):
+        """Validar que el código sea alfanumérico, sin espacios ni caracteres especiales"""
+        if not re.match(r'^[a-zA-Z0-9-_]+$', v):
+            raise ValueError('El código debe contener solo letras, números, guiones o guiones bajos')
+        return v.upper()
+
+
+class SupplierResponse(SupplierCreate):
+    """
+    Esquema para respuestas de proveedores.
+    """
+    id: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PurchaseSuggestionRequest(BaseModel):
+    """
+    Opciones para generar sugerencias de compra.
+    """
+    use_available: bool = Field(
+        True, description="Calcular el faltante sobre el disponible (actual menos reservado) en lugar del stock actual"
+    )
+
+
+class SupplierSuggestionSummary(BaseModel):
+    """
+    Resumen de la orden de compra sugerida para un proveedor.
+    """
+    supplier_id: Optional[int] = None
+    supplier_code: Optional[str] = None
+    lines: int
+    total_quantity: float
+    total_amount: float
+
+
+class PurchaseSuggestionBatchResponse(BaseModel):
+    """
+    Esquema de respuesta de un lote de sugerencias agrupado por proveedor.
+    """
+    id: int
+    created_at: datetime
+    line_count: int
+    suppliers: List[SupplierSuggestionSummary]
+
+
+class PurchaseSuggestionResponse(BaseModel):
+    """
+    Esquema para una línea de compra sugerida.
+    """
+    id: int
+    supplier_id: Optional[int] = None
+    product_id: int
+    shortage: float
+    quantity: float
+    unit_cost: float
+    amount: float
+
+    model_config = ConfigDict(from_attributes=True)
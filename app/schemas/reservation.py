@@ -0,0 +1,37 @@
+# app/schemas/reservation.py
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+
+class ReservationCreate(BaseModel):
+    """
+    Esquema para la creación de reservas de stock.
+    """
+    product_id: int
+    quantity: float = Field(..., gt=0, description="Cantidad a reservar")
+    ttl_seconds: int = Field(900, ge=1, le=7 * 24 * 3600, description="Segundos hasta que la reserva expire")
+    reference: Optional[str] = Field(None, max_length=100, description="Referencia externa (p. ej. pedido)")
+
+
+class ReservationCommit(BaseModel):
+    """
+    Esquema para confirmar (consumir) una reserva.
+    """
+    location_id: Optional[int] = Field(None, description="Ubicación desde la que se despacha el stock (obligatoria si el producto tiene saldos por ubicación)")
+
+
+class ReservationResponse(BaseModel):
+    """
+    Esquema para respuestas de reservas.
+    """
+    id: int
+    product_id: int
+    quantity: float
+    status: str
+    reference: Optional[str] = None
+    expires_at: datetime
+    created_at: datetime
+    closed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
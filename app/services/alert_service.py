@@ -0,0 +1,556 @@
+# app/services/alert_service.py
+"""
+Despacho de alertas de stock bajo en resúmenes periódicos.
+
+- Detección: un receptor de products_changed solo anota los IDs afectados (sin consultas,
+  sin añadir latencia a las escrituras). El hilo despachador aplica cada segundo las
+  transiciones de esos productos con sentencias set-based sobre stock_alert_states, y cada
+  ALERT_SCAN_INTERVAL revisa el catálogo completo (cambios de otros procesos o sin señal).
+  Con el estado de inventario en memoria activo, antes de cada detección se aplican sus
+  incrementos pendientes (checkpoint), que avisan con products_changed: las transiciones
+  se calculan sobre el stock vigente y no sobre el del último checkpoint periódico.
+- Deduplicación: cada producto guarda su último estado (low/ok) y si difiere del último
+  notificado (pending). Un producto que sigue en alerta no se vuelve a notificar y una
+  oscilación entre dos resúmenes se anula.
+- Resumen: cada ALERT_DIGEST_INTERVAL se reclaman las transiciones pendientes con un único
+  UPDATE ... RETURNING (con varios procesos, cada transición la envía solo uno) y se arma un
+  resumen que se entrega por separado a cada destinatario.
+- Entrega: canales por esquema del destinatario (mailto: por SMTP, http(s): por webhook) en un
+  pool de hilos acotado, con reintentos y espera exponencial ante errores transitorios. Si un
+  resumen no llega a algún destinatario (reintentos agotados o descartado), sus transiciones
+  vuelven a quedar pendientes y entran en el resumen siguiente.
+"""
+import hashlib
+import hmac
+import logging
+import random
+import smtplib
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from sqlalchemy import exists, insert, literal, not_, select, true, update, delete
+from sqlalchemy.orm import Session
+from app.db.base import SessionLocal
+from app.db.tenancy import current_tenant, tenant_scope
+from app.models.alert import StockAlertState
+from app.models.product import Product
+from app.schemas.alert import AlertDigest, ResolvedAlert
+from app.schemas.product import AlertProduct
+from app.services.inventory_state import get_inventory_state
+from app.services.signals import products_changed
+from app.utils.dates import utcnow
+from app.utils.metrics import REGISTRY
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Campos cuyo cambio puede hacer entrar o salir un producto de la alerta
+_ALERT_FIELDS = {"current_stock", "min_stock"}
+
+# IDs por sentencia al aplicar transiciones de productos concretos
+_CHUNK_SIZE = 500
+
+# Cada cuánto aplica el despachador las transiciones anotadas por las señales
+_DETECT_INTERVAL = 1.0
+
+ALERT_TRANSITIONS = REGISTRY.counter(
+    "stock_alert_transitions_total", "Productos que entraron (low) o salieron (ok) de la alerta", ("status",))
+ALERT_DIGESTS = REGISTRY.counter(
+    "stock_alert_digests_total", "Resúmenes de alertas generados")
+ALERT_DELIVERIES = REGISTRY.counter(
+    "stock_alert_deliveries_total", "Entregas de resúmenes de alertas", ("channel", "result"))
+
+
+class DeliveryError(Exception):
+    """
+    Fallo al entregar un resumen. Si no es `retryable` (destinatario rechazado, 4xx)
+    no se reintenta.
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def render_digest_text(digest: AlertDigest) -> str:
+    """Texto plano del resumen (cuerpo del correo)."""
+    lines = [f"Resumen de alertas de stock ({digest.generated_at:%Y-%m-%d %H:%M} UTC)"]
+    if digest.tenant:
+        lines.append(f"Tenant: {digest.tenant}")
+    lines.append("")
+    lines.append(f"Productos en alerta: {digest.total_alerts}")
+    for alert in digest.alerts:
+        classes = f" [{alert.abc_class or '-'}{alert.xyz_class or '-'}]" if alert.abc_class or alert.xyz_class else ""
+        lines.append(f"  {alert.code}  {alert.name}{classes}: stock {alert.current_stock:g}, "
+                     f"mínimo {alert.min_stock:g}, faltan {alert.difference:g}")
+    if digest.total_alerts > len(digest.alerts):
+        lines.append(f"  ... y {digest.total_alerts - len(digest.alerts)} más")
+    lines.append("")
+    lines.append(f"Productos recuperados: {digest.total_resolved}")
+    for resolved in digest.resolved:
+        lines.append(f"  {resolved.code}  {resolved.name}: stock {resolved.current_stock:g}, mínimo {resolved.min_stock:g}")
+    if digest.total_resolved > len(digest.resolved):
+        lines.append(f"  ... y {digest.total_resolved - len(digest.resolved)} más")
+    return "\n".join(lines) + "\n"
+
+
+class AlertChannel:
+    """
+    Canal de entrega de resúmenes. `send` lanza DeliveryError si falla.
+    """
+    name = "channel"
+
+    def send(self, recipient: str, digest: AlertDigest):
+        raise NotImplementedError
+
+
+class SmtpChannel(AlertChannel):
+    """
+    Envío por correo a destinatarios mailto:dirección.
+    """
+    name = "smtp"
+
+    def __init__(self, host: str = "localhost", port: int = 25, sender: str = "inventario@localhost",
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = False, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, recipient: str, digest: AlertDigest):
+        message = EmailMessage()
+        message["Subject"] = (f"Stock bajo: {digest.total_alerts} en alerta, "
+                              f"{digest.total_resolved} recuperados")
+        message["From"] = self.sender
+        message["To"] = recipient.split(":", 1)[1]
+        message["X-Digest-Id"] = digest.id
+        message.set_content(render_digest_text(digest))
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                smtp.send_message(message)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise DeliveryError(f"Destinatario rechazado: {recipient}", retryable=False) from e
+        except smtplib.SMTPResponseException as e:
+            # 4xx: error transitorio del servidor; 5xx: permanente
+            raise DeliveryError(f"SMTP {e.smtp_code}: {e.smtp_error!r}", retryable=e.smtp_code < 500) from e
+        except (smtplib.SMTPException, OSError) as e:
+            raise DeliveryError(f"Error SMTP: {e}") from e
+
+
+class WebhookChannel(AlertChannel):
+    """
+    POST del resumen en JSON a destinatarios http(s)://. Con `secret`, el cuerpo se firma
+    con HMAC-SHA256 en la cabecera X-Signature; X-Digest-Id permite descartar reintentos.
+    """
+    name = "webhook"
+
+    def __init__(self, timeout: float = 10.0, secret: Optional[str] = None):
+        self.timeout = timeout
+        self.secret = secret
+
+    def send(self, recipient: str, digest: AlertDigest):
+        body = digest.model_dump_json().encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Digest-Id": digest.id}
+        if self.secret:
+            signature = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature"] = f"sha256={signature}"
+        request = urllib.request.Request(recipient, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            raise DeliveryError(f"HTTP {e.code} de {recipient}", retryable=e.code >= 500 or e.code in (408, 429)) from e
+        except (urllib.error.URLError, OSError) as e:
+            raise DeliveryError(f"Error al conectar con {recipient}: {e}") from e
+
+
+class AlertService:
+    """
+    Servicio para el estado de alerta de los productos.
+    """
+
+    @staticmethod
+    def apply_transitions(db: Session, ids: Optional[List[int]] = None) -> Dict[str, int]:
+        """
+        Actualiza stock_alert_states para los productos indicados (todos con None) y devuelve
+        cuántos entraron (low) y salieron (ok) de la alerta. Cada cambio de estado invierte
+        `pending`: si la transición anterior aún no se había notificado, ambas se anulan.
+        """
+        now = utcnow()
+        low = Product.current_stock < Product.min_stock
+        counts = {"low": 0, "ok": 0}
+        chunks = [None] if ids is None else [ids[start:start + _CHUNK_SIZE] for start in range(0, len(ids), _CHUNK_SIZE)]
+        for chunk in chunks:
+            scope = [Product.id.in_(chunk)] if chunk is not None else []
+            state_scope = [StockAlertState.product_id.in_(chunk)] if chunk is not None else []
+            # Productos sin estado previo que están en alerta
+            counts["low"] += db.execute(
+                insert(StockAlertState).from_select(
+                    ["product_id", "status", "pending", "changed_at"],
+                    select(Product.id, literal("low"), true(), literal(now, StockAlertState.changed_at.type))
+                    .where(low, *scope, ~exists().where(StockAlertState.product_id == Product.id)),
+                )
+            ).rowcount
+            for status, condition in (("low", low), ("ok", not_(low))):
+                counts[status] += db.execute(
+                    update(StockAlertState)
+                    .where(
+                        StockAlertState.status != status,
+                        StockAlertState.product_id.in_(select(Product.id).where(condition, *scope)),
+                    )
+                    .values(status=status, pending=not_(StockAlertState.pending), changed_at=now)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+            # Estados de productos eliminados (si la base de datos no aplica el ON DELETE CASCADE)
+            db.execute(
+                delete(StockAlertState)
+                .where(*state_scope, ~exists().where(Product.id == StockAlertState.product_id))
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        for status, count in counts.items():
+            if count:
+                ALERT_TRANSITIONS.inc(count, status=status)
+        return counts
+
+    @staticmethod
+    def claim_digest(db: Session, max_items: int = 500) -> Optional[AlertDigest]:
+        """
+        Reclama las transiciones pendientes y arma el resumen, o None si no hay ninguna.
+        Las listas se limitan a max_items (los totales cuentan todas).
+        """
+        now = utcnow()
+        claimed = db.execute(
+            update(StockAlertState)
+            .where(StockAlertState.pending)
+            .values(pending=False, notified_at=now)
+            .returning(StockAlertState.product_id, StockAlertState.status)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not claimed:
+            db.rollback()
+            return None
+
+        statuses = dict(claimed)
+        ids = sorted(statuses)
+        alerts: List[AlertProduct] = []
+        resolved: List[ResolvedAlert] = []
+        for start in range(0, len(ids), _CHUNK_SIZE):
+            for product in db.execute(
+                select(Product).where(Product.id.in_(ids[start:start + _CHUNK_SIZE]))
+            ).scalars():
+                if statuses[product.id] == "low":
+                    alerts.append(AlertProduct(
+                        id=product.id, name=product.name, code=product.code,
+                        current_stock=product.current_stock, min_stock=product.min_stock,
+                        difference=product.min_stock - product.current_stock,
+                        abc_class=product.abc_class, xyz_class=product.xyz_class,
+                    ))
+                else:
+                    resolved.append(ResolvedAlert.model_validate(product))
+        db.commit()
+
+        # Primero los que más faltan
+        alerts.sort(key=lambda alert: (-alert.difference, alert.id))
+        return AlertDigest(
+            id=str(uuid.uuid4()),
+            generated_at=now,
+            tenant=current_tenant(),
+            alerts=alerts[:max_items],
+            resolved=resolved[:max_items],
+            total_alerts=len(alerts),
+            total_resolved=len(resolved),
+            product_ids=ids,
+        )
+
+    @staticmethod
+    def release_digest(db: Session, product_ids: List[int]) -> int:
+        """
+        Devuelve a pendientes las transiciones de un resumen que no se entregó. Se invierte
+        `pending` como en apply_transitions: si el producto volvió a cambiar de estado tras
+        reclamarlo, la transición no entregada y la nueva se anulan.
+        """
+        released = 0
+        for start in range(0, len(product_ids), _CHUNK_SIZE):
+            released += db.execute(
+                update(StockAlertState)
+                .where(StockAlertState.product_id.in_(product_ids[start:start + _CHUNK_SIZE]))
+                .values(pending=not_(StockAlertState.pending))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        db.commit()
+        return released
+
+
+class AlertDispatcher(threading.Thread):
+    """
+    Hilo que detecta transiciones de alerta, arma los resúmenes y los reparte a los
+    destinatarios a través de un pool de entregas acotado.
+    """
+
+    def __init__(self, recipients: List[str], channels: Dict[str, AlertChannel],
+                 digest_interval: float = 300.0, scan_interval: float = 60.0,
+                 max_workers: int = 4, max_pending_deliveries: int = 100,
+                 max_attempts: int = 5, retry_backoff: float = 1.0, retry_backoff_max: float = 60.0,
+                 max_items: int = 500, tenants: Optional[Callable[[], List[str]]] = None):
+        super().__init__(name="alert-dispatcher", daemon=True)
+        for recipient in recipients:
+            scheme = recipient.split(":", 1)[0].lower()
+            if scheme not in channels:
+                raise ValueError(f"Destinatario de alertas sin canal ({scheme}): {recipient}")
+        self.recipients = list(recipients)
+        self.channels = channels
+        self.digest_interval = digest_interval
+        self.scan_interval = scan_interval
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.max_items = max_items
+        self.tenants = tenants
+        self.max_pending_deliveries = max_pending_deliveries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alert-delivery")
+        self._lock = threading.Lock()
+        # Entregas en curso o esperando un hilo del pool
+        self.pending_deliveries = 0
+        # Resúmenes con entregas sin terminar: id -> [entregas restantes, alguna falló]
+        self._digests: Dict[str, list] = {}
+        # IDs por revisar de cada tenant (None: todo el catálogo)
+        self._dirty: Dict[Optional[str], Optional[Set[int]]] = {}
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._digest_requested = threading.Event()
+
+    def _channel(self, recipient: str) -> AlertChannel:
+        return self.channels[recipient.split(":", 1)[0].lower()]
+
+    # --- Detección ---
+
+    def _on_products_changed(self, sender, ids=None, action=None, fields=None, **kwargs):
+        """Solo anota qué revisar: no consulta la base de datos en el hilo que escribió."""
+        if fields is not None and not _ALERT_FIELDS.intersection(fields):
+            return
+        tenant = current_tenant()
+        with self._lock:
+            if ids is None:
+                self._dirty[tenant] = None
+            elif tenant not in self._dirty:
+                self._dirty[tenant] = set(ids)
+            elif self._dirty[tenant] is not None:
+                self._dirty[tenant].update(ids)
+
+    def _tenant_ids(self) -> List[Optional[str]]:
+        return [None] + (self.tenants() if self.tenants else [])
+
+    def detect(self, full: bool = False) -> Dict[str, int]:
+        """Aplica las transiciones pendientes de revisar (con full, las de todo el catálogo)."""
+        # La detección lee current_stock en SQL: primero se vuelcan los incrementos en memoria,
+        # cuyo aviso anota esos productos como pendientes de revisar
+        state = get_inventory_state()
+        if state is not None:
+            try:
+                state.checkpoint()
+            except Exception:
+                logger.exception("Error al aplicar el estado de inventario antes de detectar alertas")
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if full:
+            dirty.update({tenant_id: None for tenant_id in self._tenant_ids()})
+
+        totals = {"low": 0, "ok": 0}
+        for tenant_id, ids in dirty.items():
+            try:
+                with tenant_scope(tenant_id):
+                    db = SessionLocal()
+                    try:
+                        counts = AlertService.apply_transitions(db, sorted(ids) if ids is not None else None)
+                    finally:
+                        db.close()
+                for status, count in counts.items():
+                    totals[status] += count
+            except Exception:
+                logger.exception("Error al detectar alertas de stock%s", f" del tenant {tenant_id}" if tenant_id else "")
+        return totals
+
+    # --- Resúmenes y entregas ---
+
+    def send_digests(self) -> int:
+        """Arma el resumen de cada tenant con transiciones pendientes y lo encola para cada destinatario."""
+        sent = 0
+        for tenant_id in self._tenant_ids():
+            try:
+                with tenant_scope(tenant_id):
+                    db = SessionLocal()
+                    try:
+                        digest = AlertService.claim_digest(db, self.max_items)
+                    finally:
+                        db.close()
+            except Exception:
+                logger.exception("Error al armar el resumen de alertas%s", f" del tenant {tenant_id}" if tenant_id else "")
+                continue
+            if digest is None:
+                continue
+            ALERT_DIGESTS.inc()
+            sent += 1
+            logger.info("Resumen de alertas %s: %d en alerta, %d recuperados, %d destinatarios",
+                        digest.id, digest.total_alerts, digest.total_resolved, len(self.recipients))
+            with self._lock:
+                self._digests[digest.id] = [len(self.recipients), False]
+            for recipient in self.recipients:
+                self._enqueue_delivery(recipient, digest)
+        return sent
+
+    def _enqueue_delivery(self, recipient: str, digest: AlertDigest):
+        channel = self._channel(recipient)
+        # Con la cola llena (destinatarios caídos que agotan reintentos) se descarta en vez de acumular
+        with self._lock:
+            full = self.pending_deliveries >= self.max_pending_deliveries
+            if not full:
+                self.pending_deliveries += 1
+        if full:
+            ALERT_DELIVERIES.inc(channel=channel.name, result="dropped")
+            logger.error("Cola de entregas de alertas llena: se descarta el resumen %s para %s", digest.id, recipient)
+            self._digest_finished(digest, delivered=False)
+            return
+        try:
+            self._executor.submit(self._deliver, channel, recipient, digest)
+        except RuntimeError:
+            self._delivery_done(digest, delivered=False)
+
+    def _delivery_done(self, digest: AlertDigest, delivered: bool):
+        with self._lock:
+            self.pending_deliveries -= 1
+        self._digest_finished(digest, delivered)
+
+    def _digest_finished(self, digest: AlertDigest, delivered: bool):
+        """Anota una entrega terminada; si fue la última y alguna falló, libera el resumen."""
+        with self._lock:
+            entry = self._digests.get(digest.id)
+            if entry is None:
+                return
+            entry[0] -= 1
+            entry[1] = entry[1] or not delivered
+            if entry[0] > 0:
+                return
+            del self._digests[digest.id]
+            failed = entry[1]
+        if failed:
+            self._release(digest)
+
+    def _release(self, digest: AlertDigest):
+        """
+        Vuelve a dejar pendientes las transiciones de un resumen sin entregar. Los destinatarios
+        que sí lo recibieron las recibirán de nuevo en el resumen siguiente.
+        """
+        try:
+            with tenant_scope(digest.tenant):
+                db = SessionLocal()
+                try:
+                    released = AlertService.release_digest(db, digest.product_ids)
+                finally:
+                    db.close()
+            logger.warning("Resumen %s sin entregar: %d transiciones vuelven a quedar pendientes",
+                           digest.id, released)
+        except Exception:
+            logger.exception("Error al liberar las transiciones del resumen %s", digest.id)
+
+    def _deliver(self, channel: AlertChannel, recipient: str, digest: AlertDigest):
+        """Entrega un resumen con reintentos y espera exponencial (con jitter) entre intentos."""
+        delivered = False
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    channel.send(recipient, digest)
+                    ALERT_DELIVERIES.inc(channel=channel.name, result="delivered")
+                    delivered = True
+                    return
+                except Exception as e:
+                    retryable = not isinstance(e, DeliveryError) or e.retryable
+                    if not retryable or attempt == self.max_attempts:
+                        ALERT_DELIVERIES.inc(channel=channel.name, result="failed")
+                        logger.error("No se pudo entregar el resumen %s a %s tras %d intentos: %s",
+                                     digest.id, recipient, attempt, e)
+                        return
+                    ALERT_DELIVERIES.inc(channel=channel.name, result="retried")
+                    delay = min(self.retry_backoff_max, self.retry_backoff * 2 ** (attempt - 1))
+                    logger.warning("Error al entregar el resumen %s a %s (intento %d), reintento en %.1fs: %s",
+                                   digest.id, recipient, attempt, delay, e)
+                    if self._stop_event.wait(delay * random.uniform(0.5, 1.0)):
+                        return
+        finally:
+            self._delivery_done(digest, delivered)
+
+    # --- Ciclo de vida ---
+
+    def request_digest(self):
+        """Adelanta el próximo resumen (se arma en el hilo despachador)."""
+        self._digest_requested.set()
+        self._wake.set()
+
+    def run(self):
+        products_changed.connect(self._on_products_changed)
+        next_scan = 0.0
+        next_digest = time.monotonic() + self.digest_interval
+        try:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                full = now >= next_scan
+                self.detect(full)
+                if full:
+                    next_scan = now + self.scan_interval
+                if now >= next_digest or self._digest_requested.is_set():
+                    self._digest_requested.clear()
+                    # Sin destinatarios, las transiciones quedan pendientes hasta que se configuren
+                    if self.recipients:
+                        self.send_digests()
+                    next_digest = now + self.digest_interval
+                self._wake.wait(_DETECT_INTERVAL)
+                self._wake.clear()
+        finally:
+            products_changed.disconnect(self._on_products_changed)
+
+    def stop(self, wait: bool = True):
+        self._stop_event.set()
+        self._wake.set()
+        self._executor.shutdown(wait=wait)
+
+
+_dispatcher: Optional[AlertDispatcher] = None
+
+
+def _deliveries_in_flight() -> Dict[Tuple[str, ...], float]:
+    if _dispatcher is None:
+        return {}
+    return {(): _dispatcher.pending_deliveries}
+
+
+REGISTRY.gauge("stock_alert_deliveries_in_flight", "Entregas de resúmenes de alertas en curso o en espera",
+               callback=_deliveries_in_flight)
+
+
+def get_alert_dispatcher() -> Optional[AlertDispatcher]:
+    return _dispatcher
+
+
+def start_alert_dispatcher(recipients: List[str], channels: Dict[str, AlertChannel], **options) -> AlertDispatcher:
+    """
+    Inicia (una sola vez por proceso) el despachador de alertas de stock.
+    """
+    global _dispatcher
+    if _dispatcher is None or not _dispatcher.is_alive():
+        if not recipients:
+            logger.warning("Despachador de alertas sin destinatarios: se registran las transiciones pero no se envían")
+        _dispatcher = AlertDispatcher(recipients, channels, **options)
+        _dispatcher.start()
+    return _dispatcher
@@ -0,0 +1,151 @@
+# app/services/analytics_service.py
+import time
+from datetime import timedelta
+from sqlalchemy import Float, Integer, case, cast, literal, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db.base import SessionLocal
+from app.models.product import Product
+from app.models.location import StockMovement
+from app.schemas.analytics import ClassificationRequest, ClassificationResult
+from app.services.job_service import register_job, JobContext
+from app.services.signals import notify_products_changed
+from app.utils.dates import utcnow
+from typing import Dict
+
+
+def _period_index(column, since, period_days: int, dialect: str):
+    """Número de periodo (0, 1, ...) de una fecha contado desde `since`."""
+    if dialect == "postgresql":
+        seconds = func.extract("epoch", column - literal(since))
+        return cast(func.floor(seconds / (period_days * 86400)), Integer)
+    return cast((func.julianday(column) - func.julianday(literal(since))) / period_days, Integer)
+
+
+class AnalyticsService:
+    """
+    Servicio de analítica de inventario.
+    """
+
+    @staticmethod
+    def _classification_select(options: ClassificationRequest, dialect: str):
+        """
+        Construye el SELECT que clasifica todo el catálogo de una vez.
+
+        Demanda: salidas (movimientos issue) de los últimos periods * period_days días, sumadas
+        por producto y periodo. ABC por valor de consumo (demanda * costo unitario): A hasta
+        a_share del valor acumulado, B hasta b_share, C el resto y lo que no tiene consumo.
+        XYZ por coeficiente de variación de la demanda por periodo (contando los periodos sin
+        salidas): X hasta x_max_cv, Y hasta y_max_cv, Z el resto y lo que no tiene demanda.
+        La varianza se compara con cv² · media², sin raíces, para no depender de funciones
+        matemáticas que SQLite puede no traer.
+        """
+        since = utcnow() - timedelta(days=options.period_days * options.periods)
+        period = _period_index(StockMovement.created_at, since, options.period_days, dialect)
+        per_period = (
+            select(
+                StockMovement.product_id.label("product_id"),
+                func.sum(StockMovement.quantity).label("quantity"),
+            )
+            .where(StockMovement.kind == "issue", StockMovement.created_at >= since)
+            .group_by(StockMovement.product_id, period)
+            .subquery("per_period")
+        )
+        demand = (
+            select(
+                per_period.c.product_id,
+                func.sum(per_period.c.quantity).label("total"),
+                func.sum(per_period.c.quantity * per_period.c.quantity).label("total_sq"),
+            )
+            .group_by(per_period.c.product_id)
+            .subquery("demand")
+        )
+
+        total = func.coalesce(demand.c.total, 0)
+        value = cast(total * Product.unit_cost, Float)
+        mean = cast(total, Float) / options.periods
+        variance = cast(func.coalesce(demand.c.total_sq, 0), Float) / options.periods - mean * mean
+        preceding = func.sum(value).over(order_by=(value.desc(), Product.id)) - value
+        catalog_value = func.sum(value).over()
+
+        abc = case(
+            (value <= 0, "C"),
+            (preceding < catalog_value * options.a_share, "A"),
+            (preceding < catalog_value * options.b_share, "B"),
+            else_="C",
+        )
+        xyz = case(
+            (total <= 0, "Z"),
+            (variance <= options.x_max_cv * options.x_max_cv * mean * mean, "X"),
+            (variance <= options.y_max_cv * options.y_max_cv * mean * mean, "Y"),
+            else_="Z",
+        )
+        return (
+            select(Product.id.label("id"), abc.label("abc_class"), xyz.label("xyz_class"))
+            .outerjoin(demand, demand.c.product_id == Product.id)
+            .subquery("classified")
+        )
+
+    @staticmethod
+    def classify_products(db: Session, options: ClassificationRequest) -> ClassificationResult:
+        """
+        Clasifica todos los productos con un único UPDATE ... FROM (SELECT ...): la base de datos
+        agrega la historia de movimientos y calcula las clases con funciones de ventana, sin
+        cargar productos ni movimientos en Python. Solo se escriben las filas cuya clase cambia.
+        """
+        started = time.perf_counter()
+        classified = AnalyticsService._classification_select(options, db.get_bind().dialect.name)
+        statement = (
+            update(Product)
+            .where(
+                Product.id == classified.c.id,
+                or_(
+                    Product.abc_class.is_distinct_from(classified.c.abc_class),
+                    Product.xyz_class.is_distinct_from(classified.c.xyz_class),
+                ),
+            )
+            .values(
+                abc_class=classified.c.abc_class,
+                xyz_class=classified.c.xyz_class,
+                version=Product.version + 1,
+                updated_at=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        changed = db.execute(statement).rowcount
+        db.commit()
+        if changed:
+            notify_products_changed("AnalyticsService", None, "classified", ["abc_class", "xyz_class"])
+
+        summary = AnalyticsService.get_classification_summary(db)
+        summary.changed = changed
+        summary.seconds = round(time.perf_counter() - started, 3)
+        summary.parameters = options
+        return summary
+
+    @staticmethod
+    def get_classification_summary(db: Session) -> ClassificationResult:
+        """
+        Cuenta los productos por clase ABC/XYZ ("AX", "BZ"...; "-" sin clasificar).
+        """
+        rows = db.execute(
+            select(Product.abc_class, Product.xyz_class, func.count())
+            .group_by(Product.abc_class, Product.xyz_class)
+        ).all()
+        classes: Dict[str, int] = {}
+        for abc_class, xyz_class, count in rows:
+            classes[f"{abc_class or '-'}{xyz_class or '-'}"] = count
+        return ClassificationResult(products=sum(classes.values()), changed=0, classes=dict(sorted(classes.items())))
+
+
+@register_job("inventory_classification")
+def classify_products_job(ctx: JobContext) -> dict:
+    """
+    Trabajo en segundo plano que reclasifica el catálogo (ABC/XYZ).
+    """
+    db = SessionLocal()
+    try:
+        result = AnalyticsService.classify_products(db, ClassificationRequest(**ctx.params))
+        return result.model_dump(exclude={"parameters"})
+    finally:
+        db.close()
@@ -0,0 +1,300 @@
+# app/services/export_service.py
+"""
+Instantáneas columnares (Parquet o Arrow IPC) del catálogo y del registro de movimientos.
+
+    python -m app.services.export_service --format parquet
+    flask --app app.main:create_app export
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import click
+from sqlalchemy import Boolean, DateTime, Float, Integer, String, Text, select, type_coerce
+from sqlalchemy.engine import Engine
+
+from app.db.base import current_engines
+from app.db.tenancy import current_tenant
+from app.models.product import Product
+from app.models.location import StockMovement
+from app.services.job_service import register_job, JobContext
+from app.utils.dates import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Tablas incluidas en cada instantánea, en orden
+EXPORT_TABLES = {
+    "products": Product.__table__,
+    "stock_movements": StockMovement.__table__,
+}
+
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+
+DEFAULT_EXPORT_DIR = os.getenv("EXPORT_DIR", "./exports")
+DEFAULT_BATCH_SIZE = 50_000
+
+_SNAPSHOT_ID = re.compile(r"^\d{8}T\d{6}\d{6}Z$")
+
+
+class ExportUnavailable(Exception):
+    """pyarrow no está instalado."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+        return pyarrow
+    except ImportError:
+        raise ExportUnavailable("La exportación columnar requiere pyarrow")
+
+
+def _begin_snapshot(connection) -> None:
+    """
+    Abre explícitamente la transacción de lectura de la instantánea. pysqlite no emite BEGIN
+    antes de un SELECT: sin él, cada lectura vería la base de datos en un momento distinto.
+    """
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("BEGIN")
+
+
+def _arrow_schema(pa, table):
+    """Esquema Arrow equivalente a las columnas de la tabla."""
+    fields = []
+    for column in table.columns:
+        if isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, (String, Text)):
+            arrow_type = pa.string()
+        else:
+            raise ValueError(f"Tipo de columna no soportado en la exportación: {table.name}.{column.name}")
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable or not column.primary_key))
+    return pa.schema(fields)
+
+
+def _resolve_export_dir(export_dir: Optional[str]) -> str:
+    """Directorio de instantáneas: el indicado o, por defecto, uno por tenant dentro de EXPORT_DIR."""
+    if export_dir is not None:
+        return export_dir
+    tenant_id = current_tenant()
+    return os.path.join(DEFAULT_EXPORT_DIR, "tenants", tenant_id) if tenant_id else DEFAULT_EXPORT_DIR
+
+
+class ExportService:
+    """
+    Servicio de exportación de instantáneas para analítica.
+    """
+
+    @staticmethod
+    def list_snapshots(export_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Manifiestos de las instantáneas disponibles, de la más reciente a la más antigua.
+        """
+        export_dir = _resolve_export_dir(export_dir)
+        if not os.path.isdir(export_dir):
+            return []
+        manifests = []
+        for name in sorted(os.listdir(export_dir), reverse=True):
+            manifest = ExportService.get_snapshot(name, export_dir)
+            if manifest is not None:
+                manifests.append(manifest)
+        return manifests
+
+    @staticmethod
+    def get_snapshot(snapshot_id: str, export_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Manifiesto de una instantánea, o None si no existe.
+        """
+        export_dir = _resolve_export_dir(export_dir)
+        if not _SNAPSHOT_ID.match(snapshot_id):
+            return None
+        path = os.path.join(export_dir, snapshot_id, "manifest.json")
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    @staticmethod
+    def get_latest_snapshot(export_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Manifiesto de la instantánea más reciente, o None si no hay ninguna.
+        """
+        export_dir = _resolve_export_dir(export_dir)
+        snapshots = ExportService.list_snapshots(export_dir)
+        return snapshots[0] if snapshots else None
+
+    @staticmethod
+    def get_snapshot_file(snapshot_id: str, table_name: str,
+                          export_dir: Optional[str] = None) -> Optional[str]:
+        """
+        Ruta del fichero de una tabla dentro de una instantánea, o None si no existe.
+        """
+        export_dir = _resolve_export_dir(export_dir)
+        manifest = ExportService.get_snapshot(snapshot_id, export_dir)
+        if manifest is None or table_name not in manifest["tables"]:
+            return None
+        return os.path.join(export_dir, snapshot_id, manifest["tables"][table_name]["file"])
+
+    @staticmethod
+    def create_snapshot(engine: Optional[Engine] = None, export_dir: Optional[str] = None,
+                        export_format: str = "parquet", batch_size: int = DEFAULT_BATCH_SIZE,
+                        keep: int = 7, ctx: Optional[JobContext] = None) -> Dict[str, Any]:
+        """
+        Escribe una instantánea de todas las tablas de EXPORT_TABLES.
+
+        Todas las tablas se leen en una misma transacción (vista coherente: BEGIN explícito en
+        SQLite, REPEATABLE READ en PostgreSQL) y por lotes desde el cursor: cada lote se convierte en un RecordBatch y se escribe, sin cargar la tabla entera.
+        Los ficheros se escriben en un directorio temporal que se renombra al terminar, así una
+        instantánea a medias nunca es visible. Se conservan las `keep` más recientes.
+        """
+        export_dir = _resolve_export_dir(export_dir)
+        engine = engine or current_engines()[1]
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Formato de exportación no soportado: {export_format}")
+        pa = _pyarrow()
+
+        os.makedirs(export_dir, exist_ok=True)
+        started = utcnow()
+        snapshot_id = started.strftime("%Y%m%dT%H%M%S%fZ")
+        staging_dir = tempfile.mkdtemp(prefix=".tmp-", dir=export_dir)
+        began = time.perf_counter()
+        manifest: Dict[str, Any] = {
+            "id": snapshot_id,
+            "format": export_format,
+            "created_at": started.isoformat() + "Z",
+            "tables": {},
+        }
+
+        try:
+            with engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    connection.execution_options(isolation_level="REPEATABLE READ")
+                with connection.begin():
+                    _begin_snapshot(connection)
+                    streaming = connection.execution_options(yield_per=batch_size)
+                    for index, (name, table) in enumerate(EXPORT_TABLES.items()):
+                        if ctx is not None:
+                            ctx.check_cancelled()
+                        file_name = f"{name}.{EXPORT_FORMATS[export_format]}"
+                        rows = ExportService._write_table(
+                            pa, streaming, table, os.path.join(staging_dir, file_name), export_format
+                        )
+                        manifest["tables"][name] = {
+                            "file": file_name,
+                            "rows": rows,
+                            "bytes": os.path.getsize(os.path.join(staging_dir, file_name)),
+                        }
+                        if ctx is not None:
+                            ctx.set_progress((index + 1) / len(EXPORT_TABLES))
+
+            manifest["seconds"] = round(time.perf_counter() - began, 3)
+            with open(os.path.join(staging_dir, "manifest.json"), "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+            os.replace(staging_dir, os.path.join(export_dir, snapshot_id))
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        ExportService._prune(export_dir, keep)
+        logger.info(f"Instantánea {snapshot_id} exportada en {manifest['seconds']} s")
+        return manifest
+
+    @staticmethod
+    def _write_table(pa, connection, table, path: str, export_format: str) -> int:
+        """
+        Copia la tabla al fichero por lotes. Devuelve el número de filas escritas.
+        """
+        schema = _arrow_schema(pa, table)
+        if export_format == "parquet":
+            writer = pa.parquet.ParquetWriter(path, schema, compression="zstd")
+            write = writer.write_batch
+        else:
+            sink = pa.OSFile(path, "wb")
+            writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+            write = writer.write_batch
+
+        # SQLite guarda las fechas como texto: se leen sin convertir y Arrow las parsea por columna,
+        # mucho más rápido que crear un datetime de Python por celda
+        raw_dates = connection.dialect.name == "sqlite"
+        columns = []
+        converters = []
+        for column, field in zip(table.columns, schema):
+            if raw_dates and isinstance(column.type, DateTime):
+                columns.append(type_coerce(column, String).label(column.name))
+                converters.append(lambda values, field=field: pa.array(values, type=pa.string()).cast(field.type))
+            else:
+                columns.append(column)
+                converters.append(lambda values, field=field: pa.array(values, type=field.type))
+
+        rows = 0
+        try:
+            result = connection.execute(select(*columns).order_by(table.primary_key.columns.values()[0]))
+            for partition in result.partitions():
+                values = list(zip(*partition))
+                write(pa.RecordBatch.from_arrays(
+                    [convert(column_values) for convert, column_values in zip(converters, values)],
+                    schema=schema,
+                ))
+                rows += len(partition)
+        finally:
+            writer.close()
+            if export_format != "parquet":
+                sink.close()
+        return rows
+
+    @staticmethod
+    def _prune(export_dir: str, keep: int):
+        """Borra las instantáneas más antiguas, conservando las `keep` más recientes."""
+        if keep <= 0:
+            return
+        snapshots = sorted(name for name in os.listdir(export_dir) if _SNAPSHOT_ID.match(name))
+        for name in snapshots[:-keep]:
+            shutil.rmtree(os.path.join(export_dir, name), ignore_errors=True)
+
+
+@register_job("export_snapshot")
+def export_snapshot_job(ctx: JobContext) -> dict:
+    """
+    Trabajo en segundo plano que genera una instantánea.
+    """
+    manifest = ExportService.create_snapshot(
+        export_format=ctx.params.get("format", "parquet"),
+        keep=int(ctx.params.get("keep", 7)),
+        ctx=ctx,
+    )
+    return {"snapshot_id": manifest["id"], "tables": manifest["tables"]}
+
+
+@click.command("export")
+@click.option("--format", "export_format", type=click.Choice(sorted(EXPORT_FORMATS)), default="parquet", show_default=True)
+@click.option("--export-dir", default=DEFAULT_EXPORT_DIR, show_default=True, help="Directorio de las instantáneas.")
+@click.option("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, show_default=True, help="Filas por lote.")
+@click.option("--keep", type=int, default=7, show_default=True, help="Instantáneas que se conservan (0 = todas).")
+def export_command(export_format, export_dir, batch_size, keep):
+    """Genera una instantánea columnar de productos y movimientos de stock."""
+    try:
+        manifest = ExportService.create_snapshot(
+            export_dir=export_dir, export_format=export_format, batch_size=batch_size, keep=keep
+        )
+    except (ValueError, ExportUnavailable) as e:
+        raise click.ClickException(str(e))
+
+    for name, info in manifest["tables"].items():
+        click.echo(f"{name}: {info['rows']} filas, {info['bytes']} bytes")
+    click.echo(f"Instantánea {manifest['id']} en {os.path.join(export_dir, manifest['id'])} ({manifest['seconds']} s)")
+
+
+if __name__ == "__main__":
+    sys.exit(export_command())
@@ -0,0 +1,396 @@
+# app/services/import_service.py
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+from app.db.base import SessionLocal
+from app.models.product import Product
+from app.schemas.product import ProductCreate, ProductImportUpdate
+from app.services.inventory_state import get_inventory_state
+from app.services.job_service import register_job, JobContext
+from app.services.location_service import PRODUCT_HAS_BALANCES
+from app.services.signals import notify_products_changed
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "xlsx")
+
+# Columnas que se pueden actualizar cuando el código ya existe (solo las que trae la fila)
+_UPSERT_COLUMNS = ("name", "current_stock", "min_stock", "supplier_id", "unit_cost", "lot_size", "min_order_qty")
+# Columnas sin valor por defecto: una fila sin alguna de ellas solo puede actualizar un código existente
+_REQUIRED_COLUMNS = ("name", "current_stock", "min_stock")
+
+Row = Tuple[int, Dict[str, Any]]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _row_error(line: int, code: Any, field: str, message: str) -> Dict[str, Any]:
+    """Error de una fila con el formato del informe de importación."""
+    return {"row": line, "code": code, "errors": [{"field": field, "message": message}]}
+
+
+def _validation_error(line: int, row: Dict[str, Any], error: ValidationError) -> Dict[str, Any]:
+    """Error de una fila a partir de los errores de validación de pydantic."""
+    return {
+        "row": line,
+        "code": row.get("code"),
+        "errors": [
+            {"field": ".".join(str(part) for part in detail["loc"]), "message": detail["msg"]}
+            for detail in error.errors()
+        ],
+    }
+
+
+def validate_rows(rows: List[Row]) -> Tuple[List[Row], List[Dict[str, Any]]]:
+    """
+    Valida un bloque de filas con ProductCreate (incluida la normalización del código).
+    Una fila a la que solo le faltan columnas obligatorias (p. ej. una hoja de solo precios) se
+    valida con ProductImportUpdate: vale si su código ya existe, lo que se comprueba al escribir.
+    Devuelve las filas válidas (con su número de línea), solo con las columnas que traía cada
+    fila (los valores por defecto los pone el INSERT), y los errores por fila.
+    Es una función de módulo para poder ejecutarse en el pool de procesos.
+    """
+    valid = []
+    errors = []
+    for line, row in rows:
+        try:
+            valid.append((line, ProductCreate.model_validate(row).model_dump(exclude_unset=True)))
+            continue
+        except ValidationError as e:
+            if any(detail["type"] != "missing" for detail in e.errors()):
+                errors.append(_validation_error(line, row, e))
+                continue
+        try:
+            valid.append((line, ProductImportUpdate.model_validate(row).model_dump(exclude_unset=True)))
+        except ValidationError as e:
+            errors.append(_validation_error(line, row, e))
+    return valid, errors
+
+
+def _merge_duplicates(valid: List[Row]) -> List[Tuple[int, Dict[str, Any], int]]:
+    """
+    Une las filas de un mismo código dentro del bloque, en orden: las columnas de la última
+    ganan, como si se aplicaran una tras otra (un INSERT ... ON CONFLICT no puede tocar dos
+    veces la misma fila). Devuelve (línea de la última, columnas, filas unidas).
+    """
+    merged: Dict[str, Tuple[int, Dict[str, Any], int]] = {}
+    for line, row in valid:
+        previous = merged.get(row["code"])
+        if previous is None:
+            merged[row["code"]] = (line, row, 1)
+        else:
+            merged[row["code"]] = (line, {**previous[1], **row}, previous[2] + 1)
+    return list(merged.values())
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Pool de procesos compartido por las importaciones, creado bajo demanda.
+    Se usa 'spawn': hacer fork de un servidor con hilos puede heredar locks tomados.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor):
+    """Descarta un pool roto (p. ej. un proceso murió) para que la próxima importación cree otro."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _InlineExecutor(Executor):
+    """Ejecuta en el propio hilo: para ficheros pequeños el pool de procesos no compensa."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class ImportService:
+    """
+    Servicio para importar catálogos de productos desde ficheros CSV o Excel.
+    """
+
+    @staticmethod
+    def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+        """
+        Deduce el formato por la extensión o el tipo de contenido.
+        """
+        extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+        if extension in IMPORT_FORMATS:
+            return extension
+        if content_type and "spreadsheetml" in content_type:
+            return "xlsx"
+        if content_type and ("csv" in content_type or content_type.startswith("text/")):
+            return "csv"
+        raise ValueError("Formato de fichero no soportado: use CSV o XLSX")
+
+    @staticmethod
+    def iter_csv_rows(stream: IO[bytes]) -> Iterator[Row]:
+        """
+        Lee un CSV con cabecera fila a fila. Las celdas vacías se omiten: un producto nuevo toma el
+        valor por defecto del esquema y uno existente conserva el que tenía.
+        El número de fila es el del fichero (la cabecera es la fila 1).
+        """
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ValueError("El fichero está vacío o no tiene cabecera")
+        for row in reader:
+            yield reader.line_num, {
+                key.strip(): value.strip() for key, value in row.items()
+                if key and value not in ("", None)
+            }
+
+    @staticmethod
+    def iter_xlsx_rows(stream: IO[bytes]) -> Iterator[Row]:
+        """
+        Lee la primera hoja de un Excel en modo de solo lectura (sin cargar el libro completo).
+        """
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("La importación de Excel requiere openpyxl")
+
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header:
+                raise ValueError("El fichero está vacío o no tiene cabecera")
+            columns = [str(cell).strip() if cell is not None else None for cell in header]
+            for line, values in enumerate(rows, start=2):
+                row = {
+                    column: value.strip() if isinstance(value, str) else value
+                    for column, value in zip(columns, values)
+                    if column and value not in ("", None)
+                }
+                if row:
+                    yield line, row
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _upsert_statement(db: Session, columns: Tuple[str, ...]):
+        """
+        INSERT ... ON CONFLICT (code) DO UPDATE para el dialecto en uso (SQLite o PostgreSQL).
+        Solo se actualizan las columnas de `columns`: las que no vienen en el fichero no se tocan.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(Product.__table__)
+        updates = {column: statement.excluded[column] for column in _UPSERT_COLUMNS if column in columns}
+        updates["updated_at"] = func.now()
+        updates["version"] = Product.__table__.c.version + 1
+        return statement.on_conflict_do_update(index_elements=["code"], set_=updates).returning(Product.id)
+
+    @staticmethod
+    def _check_existing(db: Session, rows: List[Tuple[int, Dict[str, Any], int]]):
+        """
+        Contrasta un bloque con los productos existentes y lo reparte en filas para el upsert,
+        actualizaciones parciales (códigos existentes sin todas las columnas obligatorias) y errores.
+        Se rechazan las filas que asignan current_stock a productos con saldos por ubicación (su
+        stock es la suma de los saldos y solo cambia con movimientos) o por debajo de lo reservado,
+        y las parciales de códigos que no existen. Devuelve también los IDs de las parciales.
+        """
+        codes = {row["code"] for _, row, _ in rows
+                 if "current_stock" in row or any(column not in row for column in _REQUIRED_COLUMNS)}
+        existing = {}
+        if codes:
+            existing = {
+                code: (product_id, located, reserved_stock)
+                for code, product_id, located, reserved_stock in db.execute(
+                    select(Product.code, Product.id, PRODUCT_HAS_BALANCES.label("located"), Product.reserved_stock)
+                    .where(Product.code.in_(codes))
+                )
+            }
+        upserts, updates, errors, update_ids = [], [], [], []
+        for line, row, count in rows:
+            code = row["code"]
+            missing = [column for column in _REQUIRED_COLUMNS if column not in row]
+            if missing and code not in existing:
+                errors.append((count, {"row": line, "code": code, "errors": [
+                    {"field": column, "message": "Field required"} for column in missing
+                ]}))
+                continue
+            if "current_stock" in row and code in existing:
+                _, located, reserved_stock = existing[code]
+                if located:
+                    errors.append((count, _row_error(line, code, "current_stock",
+                                                     "El producto tiene saldos por ubicación: use movimientos de stock")))
+                    continue
+                if row["current_stock"] < reserved_stock:
+                    errors.append((count, _row_error(line, code, "current_stock",
+                                                     f"El producto tiene {reserved_stock:g} unidades reservadas")))
+                    continue
+            if missing:
+                updates.append((count, row))
+                update_ids.append(existing[code][0])
+            else:
+                upserts.append((count, row))
+        return upserts, updates, errors, update_ids
+
+    @staticmethod
+    def _update_statement(columns: Tuple[str, ...]):
+        """
+        UPDATE por código de las columnas de `columns`, para filas parciales de códigos existentes.
+        """
+        table = Product.__table__
+        values = {column: bindparam(column) for column in columns if column != "code"}
+        return (
+            update(table)
+            .where(table.c.code == bindparam("b_code"))
+            .values(**values, updated_at=func.now(), version=table.c.version + 1)
+        )
+
+    @staticmethod
+    def import_products(db: Session, rows: Iterator[Row], chunk_size: int = 1000,
+                        workers: int = 1, dry_run: bool = False, max_errors: int = 1000,
+                        ctx: Optional[JobContext] = None) -> Dict[str, Any]:
+        """
+        Importa productos por bloques: cada bloque se valida (en el pool de procesos si workers > 1)
+        y sus filas válidas se insertan o actualizan por código en una transacción propia.
+        Las filas de un mismo código dentro del bloque se unen (gana la última). Las filas
+        inválidas se omiten y se informan. Solo hay en memoria los bloques en curso.
+        Con ctx (trabajo en segundo plano) se comprueba la cancelación entre bloques.
+        """
+        executor: Executor = _get_process_pool(workers) if workers > 1 else _InlineExecutor()
+        # Bloques validándose a la vez: mantiene ocupados los procesos sin leer el fichero entero
+        max_in_flight = max(2, workers * 2)
+        # Un INSERT (o UPDATE, para filas parciales) por conjunto de columnas presentes
+        statements: Dict[Tuple[Any, ...], Any] = {}
+        state = get_inventory_state()
+        if state is not None and not dry_run:
+            # El stock importado es absoluto: antes se aplican los incrementos pendientes en memoria
+            state.checkpoint()
+
+        report: Dict[str, Any] = {
+            "rows": 0, "imported": 0, "failed": 0, "dry_run": dry_run,
+            "errors": [], "errors_truncated": False,
+        }
+
+        def execute_groups(kind: str, rows_to_write: List[Tuple[int, Dict[str, Any]]], build) -> List[int]:
+            groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for _, row in rows_to_write:
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+            ids = []
+            for columns, group in groups.items():
+                key = (kind,) + columns
+                if key not in statements:
+                    statements[key] = build(columns)
+                if kind == "upsert":
+                    ids.extend(db.execute(statements[key], group).scalars().all())
+                else:
+                    db.execute(statements[key], [{**row, "b_code": row["code"]} for row in group])
+            return ids
+
+        def write(chunk, future):
+            if ctx is not None:
+                ctx.check_cancelled()
+            try:
+                valid, errors = future.result()
+            except BrokenProcessPool:
+                # Se valida el bloque en este proceso y se sigue sin pool
+                logger.warning("Pool de validación roto: se continúa la importación en el proceso actual")
+                nonlocal executor
+                if isinstance(executor, ProcessPoolExecutor):
+                    _discard_process_pool(executor)
+                    executor = _InlineExecutor()
+                valid, errors = validate_rows(chunk)
+            upserts, updates, rejected, update_ids = ImportService._check_existing(db, _merge_duplicates(valid))
+            # Cada fila cuenta una vez: las unidas a otra del mismo código corren su suerte
+            report["rows"] += len(valid) + len(errors)
+            report["failed"] += len(errors) + sum(count for count, _ in rejected)
+            errors = sorted(errors + [error for _, error in rejected], key=lambda error: error["row"])
+            room = max_errors - len(report["errors"])
+            if len(errors) > room:
+                report["errors_truncated"] = True
+            report["errors"].extend(errors[:max(room, 0)])
+            if (upserts or updates) and not dry_run:
+                try:
+                    ids = execute_groups("upsert", upserts, lambda columns: ImportService._upsert_statement(db, columns))
+                    execute_groups("update", updates, ImportService._update_statement)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                notify_products_changed("ImportService", ids + update_ids, "imported")
+            if not dry_run:
+                report["imported"] += sum(count for count, _ in upserts + updates)
+
+        pending = deque()
+        iterator = iter(rows)
+        try:
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                pending.append((chunk, executor.submit(validate_rows, chunk)))
+                if len(pending) >= max_in_flight:
+                    write(*pending.popleft())
+            while pending:
+                write(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+        return report
+
+
+@register_job("product_import")
+def import_products_job(ctx: JobContext) -> dict:
+    """
+    Trabajo en segundo plano que importa un fichero subido (guardado por el endpoint en
+    un fichero temporal, que se borra al terminar) y devuelve el informe de la importación.
+    """
+    params = ctx.params
+    path = params["path"]
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as stream:
+            if params["format"] == "xlsx":
+                rows = ImportService.iter_xlsx_rows(stream)
+            else:
+                rows = ImportService.iter_csv_rows(stream)
+            return ImportService.import_products(
+                db,
+                rows,
+                chunk_size=int(params.get("chunk_size", 1000)),
+                workers=int(params.get("workers", 1)),
+                dry_run=bool(params.get("dry_run", False)),
+                max_errors=int(params.get("max_errors", 1000)),
+                ctx=ctx,
+            )
+    finally:
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            logger.warning("No se pudo borrar el fichero de importación %s", path)
@@ -0,0 +1,572 @@
+# app/services/inventory_state.py
+"""
+Estado de inventario en memoria con log de escritura anticipada y checkpoints (opcional).
+
+Para las sedes de mayor volumen, donde incluso SQLite ajustado limita las lecturas de stock
+y los incrementos, el estado caliente de los productos vive en memoria:
+
+- id, current_stock y min_stock en arrays de NumPy (más un mapa id → posición y
+  código → posición); el resto de columnas del producto, en una lista junto a ellos.
+- Cada incremento de stock se valida y aplica en memoria y se añade al log (registros binarios
+  de tamaño fijo con CRC) antes de responder. fsync agrupado: el primer hilo que sincroniza
+  cubre los registros que otros hilos ya escribieron.
+- Un hilo de checkpoint aplica periódicamente los deltas pendientes a la tabla de productos
+  (current_stock + delta, en un executemany) y anota la secuencia aplicada en
+  inventory_checkpoints en la misma transacción. Los segmentos del log ya aplicados se borran.
+- Al arrancar se cargan los productos y se reaplican los registros del log posteriores al
+  último checkpoint.
+- Los cambios hechos por SQL (movimientos, lotes, reservas, importaciones, PUT/PATCH...) llegan
+  con la señal products_changed y se recargan esas filas; los deltas pendientes se conservan,
+  porque el checkpoint los suma al valor de la base de datos en lugar de sobrescribirlo.
+
+get_product_by_id, los listados y fieldsets de productos, las alertas de stock bajo
+(comparación vectorizada) y adjust_stock de ProductService se sirven desde aquí cuando está
+activo. Los productos con saldos por ubicación no admiten incrementos: su stock solo cambia
+con movimientos.
+
+Cada checkpoint avisa con products_changed de los productos que actualizó (el despachador de
+alertas, además, fuerza uno antes de cada detección, porque calcula las transiciones en SQL).
+
+Limitaciones: un único proceso debe servir la base de datos (otro proceso no vería los deltas
+pendientes ni este los cambios de aquel), y las rutas que comprueban el stock en SQL (reservas,
+consumo de lotes) lo ven con el retraso del último checkpoint.
+"""
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db.base import SessionLocal
+from app.db.tenancy import current_tenant
+from app.models.inventory_state import InventoryCheckpoint
+from app.models.product import Product
+from app.schemas.product import AlertProduct
+from app.services.location_service import PRODUCT_HAS_BALANCES
+from app.services.signals import notify_products_changed, products_changed
+from app.utils.dates import utcnow
+from app.utils.metrics import REGISTRY
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "products"
+
+# Registro del log: secuencia, ID de producto y delta, seguidos del CRC32 de esos bytes
+_RECORD = struct.Struct("<Qqd")
+_CRC = struct.Struct("<I")
+RECORD_SIZE = _RECORD.size + _CRC.size
+
+# Columnas que se guardan tal cual junto a los arrays para servir el producto completo
+_ROW_COLUMNS = ("name", "reserved_stock", "supplier_id", "unit_cost", "lot_size", "min_order_qty",
+                "abc_class", "xyz_class", "created_at", "updated_at")
+_RESERVED_STOCK = _ROW_COLUMNS.index("reserved_stock")
+_ABC_CLASS = _ROW_COLUMNS.index("abc_class")
+_XYZ_CLASS = _ROW_COLUMNS.index("xyz_class")
+
+LOCATED_ADJUST_ERROR = "El producto tiene saldos por ubicación: registre un movimiento de stock en lugar de un ajuste"
+
+# Filas por consulta al recargar productos concretos
+_REFRESH_CHUNK = 500
+
+INVENTORY_CHECKPOINTS = REGISTRY.counter(
+    "inventory_state_checkpoints_total", "Checkpoints del estado de inventario por resultado", ("outcome",))
+INVENTORY_CHECKPOINT_SECONDS = REGISTRY.histogram(
+    "inventory_state_checkpoint_seconds", "Duración de cada checkpoint del estado de inventario")
+
+_products_table = Product.__table__
+
+
+class InventoryStateUnavailable(Exception):
+    """numpy no está instalado."""
+
+
+def _numpy():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        raise InventoryStateUnavailable("El estado de inventario en memoria requiere numpy")
+
+
+class InventoryLog:
+    """
+    Log de solo añadido en segmentos (inventory-<primera secuencia>.log). Al rotar se abre un
+    segmento nuevo; los anteriores se borran cuando un checkpoint los cubre.
+    """
+
+    def __init__(self, directory: str, fsync: bool = True):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._written = 0
+        self._synced = 0
+        self._sync_lock = threading.Lock()
+
+    def segments(self) -> List[str]:
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith("inventory-") and name.endswith(".log"))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def replay(self, after_sequence: int) -> Iterable[Tuple[int, int, float]]:
+        """
+        Registros (secuencia, ID, delta) posteriores a after_sequence, en orden. Un registro
+        incompleto o con CRC erróneo (escritura cortada por una caída) termina la lectura:
+        se trunca el segmento en ese punto.
+        """
+        for path in self.segments():
+            with open(path, "r+b") as segment:
+                data = segment.read()
+                offset = 0
+                while offset + RECORD_SIZE <= len(data):
+                    body = data[offset:offset + _RECORD.size]
+                    (crc,) = _CRC.unpack_from(data, offset + _RECORD.size)
+                    if zlib.crc32(body) != crc:
+                        break
+                    sequence, product_id, delta = _RECORD.unpack(body)
+                    if sequence > after_sequence:
+                        yield sequence, product_id, delta
+                    offset += RECORD_SIZE
+                if offset != len(data):
+                    logger.warning("Log de inventario %s truncado en el byte %d", path, offset)
+                    segment.truncate(offset)
+                    return
+
+    def open(self, first_sequence: int) -> List[str]:
+        """Empieza un segmento nuevo; devuelve los anteriores."""
+        previous = self.segments()
+        path = os.path.join(self.directory, f"inventory-{first_sequence:020d}.log")
+        with self._sync_lock:
+            if self._file is not None:
+                self._sync_all()
+                self._file.close()
+            self._file = open(path, "ab", buffering=0)
+        return [segment for segment in previous if segment != path]
+
+    def append(self, sequence: int, product_id: int, delta: float):
+        """Escribe un registro (sin fsync: ver sync)."""
+        body = _RECORD.pack(sequence, product_id, delta)
+        self._file.write(body + _CRC.pack(zlib.crc32(body)))
+        self._written = sequence
+
+    def sync(self, sequence: int):
+        """
+        Garantiza que el registro `sequence` está en disco. Un solo fsync cubre todos los
+        registros escritos hasta ese momento, así los hilos que esperan se agrupan.
+        """
+        if not self.fsync or self._synced >= sequence:
+            return
+        with self._sync_lock:
+            if self._synced >= sequence:
+                return
+            self._sync_all()
+
+    def _sync_all(self):
+        written = self._written
+        os.fsync(self._file.fileno())
+        self._synced = max(self._synced, written)
+
+    def close(self):
+        with self._sync_lock:
+            if self._file is not None:
+                self._sync_all()
+                self._file.close()
+                self._file = None
+
+
+class InventoryState:
+    """
+    Estado caliente de los productos en arrays, con log y checkpoints a la tabla de productos.
+    """
+
+    def __init__(self, log_dir: str, session_factory: Callable[[], Session] = SessionLocal,
+                 fsync: bool = True, checkpoint_interval: float = 1.0, checkpoint_max_pending: int = 10000):
+        self.np = _numpy()
+        self.session_factory = session_factory
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_max_pending = checkpoint_max_pending
+        self.log = InventoryLog(log_dir, fsync=fsync)
+        # _lock protege arrays, índices y log; _db_lock serializa lecturas de la base de datos
+        # y checkpoints, para que una recarga no vea un checkpoint a medio aplicar
+        self._lock = threading.Lock()
+        self._db_lock = threading.RLock()
+        self._allocate(1024)
+        self._size = 0
+        self._free: List[int] = []
+        self._index_by_id: Dict[int, int] = {}
+        self._index_by_code: Dict[str, int] = {}
+        self._sequence = 0
+        self._pending_count = 0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _allocate(self, capacity: int):
+        np = self.np
+        self._ids = np.full(capacity, -1, dtype=np.int64)
+        self._stock = np.zeros(capacity, dtype=np.float64)       # current_stock de la base de datos
+        self._pending = np.zeros(capacity, dtype=np.float64)     # deltas del log sin checkpoint
+        self._pending_ops = np.zeros(capacity, dtype=np.int64)   # incrementos sin checkpoint
+        self._min_stock = np.zeros(capacity, dtype=np.float64)
+        self._version = np.zeros(capacity, dtype=np.int64)
+        self._located = np.zeros(capacity, dtype=bool)           # con saldos por ubicación
+        self._codes: List[Optional[str]] = [None] * capacity
+        self._rows: List[Optional[Tuple[Any, ...]]] = [None] * capacity
+
+    def _grow(self):
+        np = self.np
+        capacity = len(self._ids) * 2
+        for name in ("_ids", "_stock", "_pending", "_pending_ops", "_min_stock", "_version", "_located"):
+            old = getattr(self, name)
+            new = np.full(capacity, -1, dtype=old.dtype) if name == "_ids" else np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self._codes.extend([None] * (capacity - len(self._codes)))
+        self._rows.extend([None] * (capacity - len(self._rows)))
+
+    # --- Carga y recarga desde la base de datos ---
+
+    @staticmethod
+    def _select():
+        return select(Product.id, Product.code, Product.current_stock, Product.min_stock, Product.version,
+                      PRODUCT_HAS_BALANCES.label("located"),
+                      *[getattr(Product, column) for column in _ROW_COLUMNS])
+
+    def _put(self, row):
+        """Inserta o reemplaza un producto leído de la base de datos (con el lock tomado)."""
+        index = self._index_by_id.get(row.id)
+        if index is None:
+            if self._free:
+                index = self._free.pop()
+            else:
+                if self._size == len(self._ids):
+                    self._grow()
+                index = self._size
+                self._size += 1
+            self._ids[index] = row.id
+            self._pending[index] = 0
+            self._pending_ops[index] = 0
+            self._index_by_id[row.id] = index
+        previous_code = self._codes[index]
+        if previous_code is not None and previous_code != row.code:
+            self._index_by_code.pop(previous_code, None)
+        self._codes[index] = row.code
+        self._index_by_code[row.code] = index
+        self._stock[index] = row.current_stock
+        self._min_stock[index] = row.min_stock
+        self._version[index] = row.version
+        self._located[index] = bool(row.located)
+        self._rows[index] = tuple(getattr(row, column) for column in _ROW_COLUMNS)
+
+    def _remove(self, product_id: int):
+        """Elimina un producto y descarta sus deltas pendientes (con el lock tomado)."""
+        index = self._index_by_id.pop(product_id, None)
+        if index is None:
+            return
+        self._index_by_code.pop(self._codes[index], None)
+        self._pending_count -= int(self._pending_ops[index])
+        self._ids[index] = -1
+        self._pending[index] = 0
+        self._pending_ops[index] = 0
+        self._codes[index] = None
+        self._rows[index] = None
+        self._free.append(index)
+
+    def load(self):
+        """
+        Carga todos los productos, reaplica el log posterior al último checkpoint
+        y abre un segmento nuevo para los incrementos siguientes.
+        """
+        with self._db_lock:
+            db = self.session_factory()
+            try:
+                checkpoint = db.get(InventoryCheckpoint, CHECKPOINT_NAME)
+                last_sequence = checkpoint.last_sequence if checkpoint is not None else 0
+                rows = db.execute(self._select()).all()
+            finally:
+                db.close()
+
+            with self._lock:
+                for row in rows:
+                    self._put(row)
+                self._sequence = last_sequence
+                replayed = 0
+                for sequence, product_id, delta in self.log.replay(last_sequence):
+                    self._sequence = max(self._sequence, sequence)
+                    index = self._index_by_id.get(product_id)
+                    if index is None:
+                        continue
+                    self._pending[index] += delta
+                    self._pending_ops[index] += 1
+                    self._pending_count += 1
+                    replayed += 1
+                self.log.open(self._sequence + 1)
+        logger.info("Estado de inventario cargado: %d productos, %d incrementos del log reaplicados",
+                    len(rows), replayed)
+
+    def refresh(self, ids: Optional[List[int]] = None):
+        """
+        Recarga desde la base de datos los productos indicados (todos con None);
+        los que ya no existen se eliminan.
+        """
+        with self._db_lock:
+            db = self.session_factory()
+            try:
+                if ids is None:
+                    chunks = [(None, db.execute(self._select()).all())]
+                else:
+                    chunks = []
+                    for start in range(0, len(ids), _REFRESH_CHUNK):
+                        chunk = ids[start:start + _REFRESH_CHUNK]
+                        chunks.append((chunk, db.execute(self._select().where(Product.id.in_(chunk))).all()))
+            finally:
+                db.close()
+
+            with self._lock:
+                for requested, rows in chunks:
+                    found = set()
+                    for row in rows:
+                        self._put(row)
+                        found.add(row.id)
+                    missing = (set(self._index_by_id) if requested is None else set(requested)) - found
+                    for product_id in missing:
+                        self._remove(product_id)
+
+    def _on_products_changed(self, sender, ids=None, action=None, fields=None, **kwargs):
+        # Sus propios checkpoints ya están reflejados en memoria
+        if sender == "InventoryState" or current_tenant() is not None:
+            return
+        self.refresh(ids)
+
+    # --- Lecturas ---
+
+    def _product(self, index: int) -> Product:
+        row = dict(zip(_ROW_COLUMNS, self._rows[index]))
+        return Product(
+            id=int(self._ids[index]),
+            code=self._codes[index],
+            current_stock=float(self._stock[index] + self._pending[index]),
+            min_stock=float(self._min_stock[index]),
+            version=int(self._version[index] + self._pending_ops[index]),
+            **row,
+        )
+
+    def get_product(self, product_id: int) -> Optional[Product]:
+        """Producto (instancia sin sesión) con el stock vigente, o None si no existe."""
+        with self._lock:
+            index = self._index_by_id.get(product_id)
+            return self._product(index) if index is not None else None
+
+    def get_products(self, ids: Iterable[int]) -> List[Product]:
+        """Productos con el stock vigente, en el orden de ids (se omiten los que no existen)."""
+        with self._lock:
+            indexes = [self._index_by_id.get(product_id) for product_id in ids]
+            return [self._product(index) for index in indexes if index is not None]
+
+    def get_product_by_code(self, code: str) -> Optional[Product]:
+        with self._lock:
+            index = self._index_by_code.get(code.upper())
+            return self._product(index) if index is not None else None
+
+    def _low_stock_indexes(self):
+        np = self.np
+        size = self._size
+        current = self._stock[:size] + self._pending[:size]
+        mask = (self._ids[:size] >= 0) & (current < self._min_stock[:size])
+        indexes = np.nonzero(mask)[0]
+        return indexes[np.argsort(self._ids[indexes], kind="stable")], current
+
+    def low_stock(self, abc_classes: Optional[List[str]] = None,
+                  xyz_classes: Optional[List[str]] = None) -> List[AlertProduct]:
+        """
+        Productos por debajo del mínimo: una comparación vectorizada sobre los arrays.
+        El filtro de clases ABC/XYZ se aplica después, solo sobre los que están en alerta.
+        """
+        with self._lock:
+            indexes, current = self._low_stock_indexes()
+            alerts = []
+            for index in indexes:
+                row = self._rows[index]
+                if abc_classes and row[_ABC_CLASS] not in abc_classes:
+                    continue
+                if xyz_classes and row[_XYZ_CLASS] not in xyz_classes:
+                    continue
+                alerts.append(AlertProduct(
+                    id=int(self._ids[index]),
+                    name=row[0],
+                    code=self._codes[index],
+                    current_stock=float(current[index]),
+                    min_stock=float(self._min_stock[index]),
+                    difference=float(self._min_stock[index] - current[index]),
+                    abc_class=row[_ABC_CLASS],
+                    xyz_class=row[_XYZ_CLASS],
+                ))
+            return alerts
+
+    def low_stock_fields(self, fields: List[str], abc_classes: Optional[List[str]] = None,
+                         xyz_classes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Productos por debajo del mínimo, solo con los campos de alerta pedidos."""
+        return [{field: getattr(alert, field) for field in fields}
+                for alert in self.low_stock(abc_classes, xyz_classes)]
+
+    # --- Escrituras ---
+
+    def increment(self, product_id: int, delta: float) -> Optional[Product]:
+        """
+        Suma delta al stock del producto: se valida y aplica en memoria, se escribe en el log
+        y se espera al fsync. Devuelve el producto actualizado, o None si no existe.
+        Lanza ValueError si un delta negativo consumiría stock reservado o si el producto
+        tiene saldos por ubicación.
+        """
+        with self._lock:
+            index = self._index_by_id.get(product_id)
+            if index is None:
+                return None
+            if self._located[index]:
+                raise ValueError(LOCATED_ADJUST_ERROR)
+            available = self._stock[index] + self._pending[index] - (self._rows[index][_RESERVED_STOCK] or 0)
+            if delta < 0 and available + delta < 0:
+                raise ValueError(f"Stock insuficiente: disponible {float(available)}, se solicitan {-delta}")
+            self._sequence += 1
+            sequence = self._sequence
+            self.log.append(sequence, product_id, delta)
+            self._pending[index] += delta
+            self._pending_ops[index] += 1
+            self._pending_count += 1
+            product = self._product(index)
+            if self._pending_count >= self.checkpoint_max_pending:
+                self._wakeup.set()
+        self.log.sync(sequence)
+        return product
+
+    def pending(self) -> int:
+        """Incrementos aplicados en memoria y aún no en la tabla de productos."""
+        return self._pending_count
+
+    def checkpoint(self) -> int:
+        """
+        Aplica los deltas pendientes a la tabla de productos y registra la secuencia aplicada,
+        en una transacción. Devuelve el número de productos actualizados.
+        """
+        with self._db_lock:
+            with self._lock:
+                size = self._size
+                dirty = self.np.nonzero(self._pending_ops[:size] > 0)[0]
+                if len(dirty) == 0:
+                    return 0
+                sequence = self._sequence
+                covered = self.log.open(sequence + 1)
+                snapshot = [
+                    (int(index), int(self._ids[index]), float(self._pending[index]), int(self._pending_ops[index]))
+                    for index in dirty
+                ]
+
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                db.execute(
+                    update(_products_table)
+                    .where(_products_table.c.id == bindparam("b_id"))
+                    .values(
+                        current_stock=_products_table.c.current_stock + bindparam("b_delta"),
+                        version=_products_table.c.version + bindparam("b_ops"),
+                        updated_at=func.now(),
+                    ),
+                    [{"b_id": product_id, "b_delta": delta, "b_ops": ops} for _, product_id, delta, ops in snapshot],
+                )
+                db.merge(InventoryCheckpoint(name=CHECKPOINT_NAME, last_sequence=sequence, updated_at=utcnow()))
+                db.commit()
+            except Exception:
+                db.rollback()
+                INVENTORY_CHECKPOINTS.inc(outcome="failed")
+                raise
+            finally:
+                db.close()
+
+            with self._lock:
+                for index, product_id, delta, ops in snapshot:
+                    if self._ids[index] != product_id:
+                        continue
+                    self._stock[index] += delta
+                    self._version[index] += ops
+                    self._pending[index] -= delta
+                    self._pending_ops[index] -= ops
+                    self._pending_count -= ops
+            INVENTORY_CHECKPOINT_SECONDS.observe(time.perf_counter() - started)
+            INVENTORY_CHECKPOINTS.inc(outcome="committed")
+
+        for path in covered:
+            os.remove(path)
+        # Los receptores (alertas, cachés) ven el cambio de stock cuando llega a la base de datos
+        notify_products_changed("InventoryState", [product_id for _, product_id, _, _ in snapshot],
+                                "stock", ["current_stock"])
+        return len(snapshot)
+
+    # --- Ciclo de vida ---
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.checkpoint_interval)
+            self._wakeup.clear()
+            try:
+                self.checkpoint()
+            except Exception:
+                logger.exception("Error en el checkpoint del estado de inventario")
+
+    def start(self):
+        """Carga el estado, se suscribe a products_changed y arranca el hilo de checkpoint."""
+        self.load()
+        products_changed.connect(self._on_products_changed, weak=False)
+        self._thread = threading.Thread(target=self._run, name="inventory-checkpoint", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo, hace un último checkpoint y cierra el log."""
+        products_changed.disconnect(self._on_products_changed)
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.checkpoint()
+        self.log.close()
+
+
+_state: Optional[InventoryState] = None
+
+
+def start_inventory_state(log_dir: str, fsync: bool = True, checkpoint_interval: float = 1.0,
+                          checkpoint_max_pending: int = 10000) -> InventoryState:
+    """
+    Carga (una sola vez por proceso) el estado de inventario en memoria.
+    """
+    global _state
+    if _state is None:
+        state = InventoryState(log_dir, fsync=fsync, checkpoint_interval=checkpoint_interval,
+                               checkpoint_max_pending=checkpoint_max_pending)
+        state.start()
+        _state = state
+    return _state
+
+
+def get_inventory_state() -> Optional[InventoryState]:
+    """
+    Estado en memoria, o None si está desactivado (INVENTORY_STATE_ENABLED) o hay un tenant
+    activo: el estado solo refleja la base de datos por defecto.
+    """
+    if _state is not None and current_tenant() is None:
+        return _state
+    return None
+
+
+def _pending_operations() -> Dict[tuple, float]:
+    if _state is None:
+        return {}
+    return {(): _state.pending()}
+
+
+REGISTRY.gauge("inventory_state_pending_operations", "Incrementos en memoria pendientes de checkpoint",
+               callback=_pending_operations)
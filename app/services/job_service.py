@@ -0,0 +1,307 @@
+# app/services/job_service.py
+import contextvars
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from sqlalchemy.orm import Session
+from app.db.base import SessionLocal
+from app.models.job import Job
+from app.utils.dates import utcnow
+from app.utils.metrics import REGISTRY
+from typing import Any, Callable, Dict, List, Optional, cast
+
+logger = logging.getLogger(__name__)
+
+# Manejadores registrados por tipo de trabajo
+JOB_HANDLERS: Dict[str, Callable[["JobContext"], Any]] = {}
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+HOSTNAME = socket.gethostname()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobCancelled(Exception):
+    """Se lanza dentro de un trabajo cuando se solicitó su cancelación."""
+
+
+class JobQueueFull(Exception):
+    """Se lanza al encolar cuando se alcanzó el máximo de trabajos pendientes."""
+
+
+def register_job(job_type: str):
+    """
+    Decorador para registrar el manejador de un tipo de trabajo.
+    El manejador recibe un JobContext y devuelve un resultado serializable a JSON.
+    """
+    def decorator(func: Callable[["JobContext"], Any]):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+class JobContext:
+    """
+    Contexto que recibe un manejador: parámetros, progreso y cancelación.
+    Las escrituras de progreso y lecturas de cancelación se limitan a una cada `interval` segundos.
+    """
+
+    def __init__(self, job_id: str, params: Dict[str, Any], interval: float = 0.5):
+        self.job_id = job_id
+        self.params = params
+        self.interval = interval
+        self._last_progress = 0.0
+        self._last_check = 0.0
+
+    def set_progress(self, progress: float, force: bool = False):
+        """Actualiza el progreso (0 a 1) del trabajo."""
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.interval:
+            return
+        self._last_progress = now
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == self.job_id).update(
+                {Job.progress: max(0.0, min(1.0, progress))}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def check_cancelled(self):
+        """Lanza JobCancelled si se solicitó cancelar el trabajo."""
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return
+        self._last_check = now
+        db = SessionLocal()
+        try:
+            requested = db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar()
+        finally:
+            db.close()
+        if requested:
+            raise JobCancelled()
+
+
+class JobService:
+    """
+    Servicio para consultar y cancelar trabajos en segundo plano.
+    """
+
+    @staticmethod
+    def get_job(db: Session, job_id: str) -> Optional[Job]:
+        """
+        Obtiene un trabajo por su ID.
+        """
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    @staticmethod
+    def get_jobs(db: Session, status: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[Job]:
+        """
+        Obtiene los trabajos más recientes, filtrados opcionalmente por estado.
+        """
+        query = db.query(Job)
+        if status is not None:
+            query = query.filter(Job.status == status)
+        jobs = query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
+        return cast(List[Job], jobs)
+
+    @staticmethod
+    def cancel_job(db: Session, job_id: str) -> Optional[Job]:
+        """
+        Cancela un trabajo: si está en cola se cancela de inmediato, si está en
+        ejecución se marca para que el manejador se detenga en su próximo punto de control.
+        """
+        db.query(Job).filter(Job.id == job_id, Job.status == "queued").update(
+            {Job.status: "cancelled", Job.cancel_requested: True, Job.finished_at: utcnow()},
+            synchronize_session=False,
+        )
+        db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+            {Job.cancel_requested: True}, synchronize_session=False
+        )
+        db.commit()
+        return JobService.get_job(db, job_id)
+
+    @staticmethod
+    def purge_finished(db: Session, retention: timedelta) -> int:
+        """
+        Elimina los trabajos terminados hace más de `retention`.
+        """
+        deleted = (
+            db.query(Job)
+            .filter(Job.status.in_(FINISHED_STATUSES), Job.finished_at < utcnow() - retention)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+class JobRunner:
+    """
+    Ejecuta trabajos en un pool de hilos acotado, fuera de los hilos de las peticiones.
+
+    Como máximo `max_workers` trabajos corren a la vez y `max_pending` esperan en cola;
+    por encima de eso submit() lanza JobQueueFull en lugar de acumular trabajo sin límite.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 100, retention_hours: float = 24):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = timedelta(hours=retention_hours)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+
+    @property
+    def pending(self) -> int:
+        """Trabajos en cola o en ejecución en este proceso."""
+        return self._pending
+
+    @property
+    def running(self) -> int:
+        """Trabajos en ejecución en este proceso."""
+        return self._running
+
+    def recover(self):
+        """
+        Marca como fallidos los trabajos de este host cuyo proceso ya no existe
+        (quedaron a medias por un reinicio). Los de otros procesos vivos no se tocan.
+        """
+        db = SessionLocal()
+        try:
+            orphaned = [
+                job_id for job_id, owner in
+                db.query(Job.id, Job.owner).filter(
+                    Job.status.in_(("queued", "running")), Job.owner.like(f"{HOSTNAME}:%")
+                )
+                if not _pid_alive(int(owner.rsplit(":", 1)[1]))
+            ]
+            if orphaned:
+                db.query(Job).filter(Job.id.in_(orphaned)).update(
+                    {Job.status: "failed", Job.error: "Interrumpido por reinicio del proceso", Job.finished_at: utcnow()},
+                    synchronize_session=False,
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def submit(self, job_type: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Encola un trabajo y devuelve su ID.
+        """
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Tipo de trabajo desconocido: {job_type}")
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("Cola de trabajos llena")
+
+        params = params or {}
+        job_id = str(uuid.uuid4())
+        db = SessionLocal()
+        try:
+            db.add(Job(id=job_id, type=job_type, status="queued", progress=0, params=json.dumps(params),
+                       owner=f"{HOSTNAME}:{os.getpid()}", created_at=utcnow()))
+            db.commit()
+        except Exception:
+            self._slots.release()
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._pending += 1
+        # El trabajo corre con el contexto de quien lo encola (p. ej. la base de datos de su tenant)
+        self._executor.submit(contextvars.copy_context().run, self._run, job_id, job_type, params)
+        return job_id
+
+    def _finish(self, job_id: str, **values):
+        db = SessionLocal()
+        try:
+            values = {getattr(Job, key): value for key, value in values.items()}
+            values[Job.finished_at] = utcnow()
+            db.query(Job).filter(Job.id == job_id).update(values, synchronize_session=False)
+            db.commit()
+            JobService.purge_finished(db, self.retention)
+        finally:
+            db.close()
+
+    def _run(self, job_id: str, job_type: str, params: Dict[str, Any]):
+        try:
+            db = SessionLocal()
+            try:
+                # Solo pasa a ejecución si no fue cancelado mientras esperaba
+                started = db.query(Job).filter(Job.id == job_id, Job.status == "queued").update(
+                    {Job.status: "running", Job.started_at: utcnow()}, synchronize_session=False
+                )
+                db.commit()
+            finally:
+                db.close()
+            if not started:
+                return
+
+            with self._lock:
+                self._running += 1
+            try:
+                result = JOB_HANDLERS[job_type](JobContext(job_id, params))
+                self._finish(job_id, status="succeeded", progress=1.0, result=json.dumps(result, default=str))
+            except JobCancelled:
+                self._finish(job_id, status="cancelled")
+            except Exception as e:
+                logger.exception("Error en el trabajo %s (%s)", job_id, job_type)
+                self._finish(job_id, status="failed", error=str(e))
+            finally:
+                with self._lock:
+                    self._running -= 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+_runner: Optional[JobRunner] = None
+
+
+def start_job_runner(max_workers: int = 2, max_pending: int = 100, retention_hours: float = 24) -> JobRunner:
+    """
+    Crea (una sola vez por proceso) el ejecutor de trabajos.
+    """
+    global _runner
+    if _runner is None:
+        _runner = JobRunner(max_workers=max_workers, max_pending=max_pending, retention_hours=retention_hours)
+        _runner.recover()
+    return _runner
+
+
+def get_job_runner() -> Optional[JobRunner]:
+    """
+    Obtiene el ejecutor de trabajos del proceso, si fue iniciado.
+    """
+    return _runner
+
+
+def _job_stats():
+    if _runner is None:
+        return {}
+    return {("running",): _runner.running, ("queued",): _runner.pending - _runner.running}
+
+
+REGISTRY.gauge("jobs_in_process", "Trabajos en segundo plano de este proceso", ("state",), callback=_job_stats)
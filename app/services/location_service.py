@@ -0,0 +1,348 @@
+# app/services/location_service.py
+from sqlalchemy import exists, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from app.models.product import Product
+from app.models.location import StockLocation, StockBalance, StockMovement
+from app.schemas.location import LocationCreate, StockMovementCreate, StockMovementResponse, LocationAlert
+from app.services.signals import notify_products_changed
+from app.services.write_queue import WriteOutcomeUnknown
+from typing import List, Optional, cast
+
+# Productos con saldos por ubicación: su current_stock es la suma de los saldos y solo cambia con
+# movimientos. Los demás llevan solo el agregado hasta que se registra su saldo inicial.
+PRODUCT_HAS_BALANCES = exists().where(StockBalance.product_id == Product.id)
+
+# Tolerancia para comparar cantidades en coma flotante
+EPSILON = 1e-9
+
+
+class LocationService:
+    """
+    Servicio para ubicaciones de stock, saldos por ubicación y movimientos.
+    """
+
+    @staticmethod
+    def get_locations(db: Session, skip: int = 0, limit: int = 100) -> List[StockLocation]:
+        """
+        Obtiene lista de ubicaciones paginada.
+        """
+        locations = db.query(StockLocation).order_by(StockLocation.id).offset(skip).limit(limit).all()
+        return cast(List[StockLocation], locations)
+
+    @staticmethod
+    def get_location_by_id(db: Session, location_id: int) -> Optional[StockLocation]:
+        """
+        Obtiene una ubicación por su ID.
+        """
+        return db.query(StockLocation).filter(StockLocation.id == location_id).first()
+
+    @staticmethod
+    def create_location(db: Session, location: LocationCreate) -> StockLocation:
+        """
+        Crea una nueva ubicación.
+        """
+        existing = db.query(StockLocation.id).filter(StockLocation.code == location.code).first()
+        if existing:
+            raise ValueError(f"Ya existe una ubicación con el código {location.code}")
+
+        try:
+            db_location = StockLocation(code=location.code, name=location.name)
+            db.add(db_location)
+            db.commit()
+            db.refresh(db_location)
+            return db_location
+        except IntegrityError:
+            db.rollback()
+            raise ValueError("Error al crear la ubicación. Verifique los datos.")
+
+    @staticmethod
+    def get_location_balances(db: Session, location_id: int, skip: int = 0, limit: int = 100) -> List[StockBalance]:
+        """
+        Obtiene los saldos de una ubicación, paginados.
+        """
+        balances = (
+            db.query(StockBalance)
+            .filter(StockBalance.location_id == location_id)
+            .order_by(StockBalance.product_id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return cast(List[StockBalance], balances)
+
+    @staticmethod
+    def get_product_balances(db: Session, product_id: int) -> List[StockBalance]:
+        """
+        Obtiene los saldos de un producto en todas las ubicaciones.
+        """
+        balances = (
+            db.query(StockBalance)
+            .filter(StockBalance.product_id == product_id)
+            .order_by(StockBalance.location_id)
+            .all()
+        )
+        return cast(List[StockBalance], balances)
+
+    @staticmethod
+    def update_balance_min_stock(db: Session, location_id: int, product_id: int, min_stock: float) -> Optional[StockBalance]:
+        """
+        Actualiza el stock mínimo de un producto en una ubicación.
+        """
+        balance = (
+            db.query(StockBalance)
+            .filter(StockBalance.location_id == location_id, StockBalance.product_id == product_id)
+            .first()
+        )
+        if balance is None:
+            return None
+
+        balance.min_stock = min_stock
+        db.commit()
+        db.refresh(balance)
+        return balance
+
+    @staticmethod
+    def open_balances(db: Session, location_id: int, product_ids: Optional[List[int]] = None) -> List[int]:
+        """
+        Registra el saldo inicial de los productos sin saldos por ubicación: su stock (el que
+        tenían antes de usar ubicaciones) pasa a la ubicación indicada con un movimiento
+        "opening", sin cambiar current_stock, que desde entonces es la suma de los saldos.
+        Sin product_ids se abren todos los productos sin saldos. Devuelve los IDs abiertos.
+        """
+        from app.services.inventory_state import get_inventory_state
+
+        if LocationService.get_location_by_id(db, location_id) is None:
+            raise ValueError(f"No existe la ubicación {location_id}")
+        condition = [~PRODUCT_HAS_BALANCES]
+        if product_ids is not None:
+            condition.append(Product.id.in_(product_ids))
+            located = db.execute(
+                select(Product.id).where(Product.id.in_(product_ids), PRODUCT_HAS_BALANCES).limit(1)
+            ).scalar()
+            if located is not None:
+                raise ValueError(f"El producto {located} ya tiene saldos por ubicación")
+
+        # El saldo inicial parte del stock confirmado en la base de datos
+        state = get_inventory_state()
+        if state is not None:
+            state.checkpoint()
+        try:
+            db.execute(insert(StockMovement).from_select(
+                ["product_id", "to_location_id", "kind", "quantity", "reference"],
+                select(Product.id, literal(location_id), literal("opening"), Product.current_stock,
+                       literal("opening-balance")).where(*condition),
+            ))
+            opened = db.execute(insert(StockBalance).from_select(
+                ["product_id", "location_id", "quantity"],
+                select(Product.id, literal(location_id), Product.current_stock).where(*condition),
+            ).returning(StockBalance.product_id)).scalars().all()
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise ValueError("Error al registrar los saldos iniciales. Verifique los datos.")
+
+        if opened:
+            notify_products_changed("LocationService", opened, "stock", [])
+        return sorted(opened)
+
+    @staticmethod
+    def move_stock(db: Session, movement: StockMovementCreate) -> StockMovement:
+        """
+        Registra un movimiento de stock en una sola transacción.
+        """
+        try:
+            db_movement = LocationService.apply_movement(db, movement)
+            db.commit()
+            db.refresh(db_movement)
+        except ValueError:
+            db.rollback()
+            raise
+        except IntegrityError:
+            db.rollback()
+            raise ValueError("Error al registrar el movimiento. Verifique los datos.")
+
+        LocationService.notify_movement(db_movement)
+        return db_movement
+
+    @staticmethod
+    def apply_movement(db: Session, movement: StockMovementCreate, lots: bool = True) -> StockMovement:
+        """
+        Aplica un movimiento de stock en la transacción en curso, sin confirmarla
+        (la confirma move_stock o, en bloque, la cola de escritura).
+
+        Los saldos se modifican con UPDATE condicionados (sin leer y reescribir la fila) y
+        Product.current_stock se ajusta con el mismo delta, de modo que el agregado nunca
+        necesita recalcularse sumando saldos. Un producto con stock pero sin saldos necesita
+        antes su saldo inicial (open_balances): si no, el agregado dejaría de ser la suma.
+
+        En productos gestionados por lotes, una salida consume los lotes de la ubicación en
+        orden FEFO; las entradas (sin lote) y las transferencias se rechazan, porque dejarían
+        lotes y saldos descuadrados. LotService, que ya gestiona los lotes, pasa lots=False.
+        """
+        quantity = movement.quantity
+        from_id = movement.from_location_id
+        to_id = movement.to_location_id
+
+        if lots:
+            # Importación local: lot_service depende de este módulo
+            from app.services.lot_service import LotService
+            if LotService.is_lot_tracked(db, movement.product_id):
+                if from_id is None:
+                    raise ValueError("El producto se gestiona por lotes: reciba el stock como lote")
+                if to_id is not None:
+                    raise ValueError("El producto se gestiona por lotes: no admite transferencias")
+                LotService.allocate(db, movement.product_id, from_id, quantity)
+
+        if to_id is not None and LocationService.get_location_by_id(db, to_id) is None:
+            raise ValueError(f"No existe la ubicación de destino {to_id}")
+
+        if from_id is not None:
+            # Salida condicionada: falla si el saldo de origen no alcanza
+            updated = (
+                db.query(StockBalance)
+                .filter(
+                    StockBalance.product_id == movement.product_id,
+                    StockBalance.location_id == from_id,
+                    StockBalance.quantity >= quantity,
+                )
+                .update({StockBalance.quantity: StockBalance.quantity - quantity}, synchronize_session=False)
+            )
+            if updated == 0:
+                raise ValueError("Stock insuficiente en la ubicación de origen")
+
+        if to_id is not None:
+            updated = (
+                db.query(StockBalance)
+                .filter(StockBalance.product_id == movement.product_id, StockBalance.location_id == to_id)
+                .update({StockBalance.quantity: StockBalance.quantity + quantity}, synchronize_session=False)
+            )
+            if updated == 0:
+                if from_id is None:
+                    unlocated_stock = db.execute(
+                        select(Product.current_stock).where(Product.id == movement.product_id, ~PRODUCT_HAS_BALANCES)
+                    ).scalar()
+                    if unlocated_stock is not None and abs(unlocated_stock) > EPSILON:
+                        raise ValueError(
+                            f"El producto tiene {unlocated_stock:g} unidades sin ubicación: "
+                            "registre antes su saldo inicial (POST /locations/{id}/opening-balances)"
+                        )
+                db.add(StockBalance(product_id=movement.product_id, location_id=to_id, quantity=quantity))
+
+        if from_id is None:
+            kind, delta = "receipt", quantity
+        elif to_id is None:
+            kind, delta = "issue", -quantity
+        else:
+            kind, delta = "transfer", 0.0
+
+        # Mantener el agregado del producto (O(1) para /alerts y current_stock). Una salida no
+        # puede consumir stock reservado; una transferencia no cambia el disponible del producto
+        product_query = db.query(Product).filter(Product.id == movement.product_id)
+        if kind == "issue":
+            product_query = product_query.filter(Product.current_stock - Product.reserved_stock >= quantity)
+        updated = (
+            product_query
+            .update(
+                {
+                    Product.current_stock: Product.current_stock + delta,
+                    Product.version: Product.version + 1,
+                    Product.updated_at: func.now(),
+                },
+                synchronize_session=False,
+            )
+        )
+        if updated == 0:
+            if kind == "issue" and db.get(Product, movement.product_id) is not None:
+                raise ValueError("Stock disponible insuficiente (descontando las reservas)")
+            raise ValueError(f"No existe el producto {movement.product_id}")
+
+        db_movement = StockMovement(
+            product_id=movement.product_id,
+            from_location_id=from_id,
+            to_location_id=to_id,
+            kind=kind,
+            quantity=quantity,
+            reference=movement.reference,
+        )
+        db.add(db_movement)
+        db.flush()
+        return db_movement
+
+    @staticmethod
+    def move_stock_queued(write_queue, movement: StockMovementCreate,
+                          timeout: Optional[float] = None) -> StockMovementResponse:
+        """
+        Registra un movimiento a través de la cola de escritura: se confirma junto con
+        otras escrituras concurrentes (group commit) y se responde al confirmarse el lote.
+        Si vence el plazo con la operación ya en marcha se propaga WriteOutcomeUnknown; el
+        movimiento se notifica igualmente si acaba confirmándose.
+        """
+        try:
+            db_movement = write_queue.execute(LocationService._apply_movement_detached, movement, timeout=timeout)
+        except WriteOutcomeUnknown as e:
+            def notify_late(future):
+                if future.exception() is None:
+                    LocationService.notify_movement(future.result())
+            e.future.add_done_callback(notify_late)
+            raise
+        LocationService.notify_movement(db_movement)
+        return db_movement
+
+    @staticmethod
+    def _apply_movement_detached(db: Session, movement: StockMovementCreate) -> StockMovementResponse:
+        """Operación de la cola de escritura: aplica el movimiento y lo devuelve como esquema."""
+        try:
+            return StockMovementResponse.model_validate(LocationService.apply_movement(db, movement))
+        except IntegrityError:
+            raise ValueError("Error al registrar el movimiento. Verifique los datos.")
+
+    @staticmethod
+    def notify_movement(movement) -> None:
+        """
+        Emite products_changed tras confirmar un movimiento que cambia el stock del producto.
+        """
+        if movement.kind != "transfer":
+            notify_products_changed("LocationService", [movement.product_id], "stock", ["current_stock"])
+
+    @staticmethod
+    def get_movements(db: Session, product_id: Optional[int] = None, location_id: Optional[int] = None,
+                      skip: int = 0, limit: int = 100) -> List[StockMovement]:
+        """
+        Obtiene los movimientos de stock más recientes, filtrados opcionalmente.
+        """
+        query = db.query(StockMovement)
+        if product_id is not None:
+            query = query.filter(StockMovement.product_id == product_id)
+        if location_id is not None:
+            query = query.filter(
+                (StockMovement.from_location_id == location_id) | (StockMovement.to_location_id == location_id)
+            )
+        movements = query.order_by(StockMovement.id.desc()).offset(skip).limit(limit).all()
+        return cast(List[StockMovement], movements)
+
+    @staticmethod
+    def get_low_stock_balances(db: Session, location_id: Optional[int] = None) -> List[LocationAlert]:
+        """
+        Obtiene los saldos por debajo del mínimo, de una ubicación o de todas.
+        La condición coincide con el índice parcial ix_stock_balances_low_stock.
+        """
+        query = (
+            db.query(
+                StockBalance.product_id,
+                Product.code.label("product_code"),
+                StockBalance.location_id,
+                StockLocation.code.label("location_code"),
+                StockBalance.quantity,
+                StockBalance.min_stock,
+                (StockBalance.min_stock - StockBalance.quantity).label("difference"),
+            )
+            .join(Product, Product.id == StockBalance.product_id)
+            .join(StockLocation, StockLocation.id == StockBalance.location_id)
+            .filter(StockBalance.quantity < StockBalance.min_stock)
+        )
+        if location_id is not None:
+            query = query.filter(StockBalance.location_id == location_id)
+
+        return [LocationAlert.model_validate(dict(row._mapping)) for row in query.all()]
@@ -0,0 +1,161 @@
+# app/services/lot_service.py
+from datetime import date, timedelta
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.models.lot import Lot
+from app.schemas.location import StockMovementCreate
+from app.schemas.lot import LotCreate, LotAllocation
+from app.services.location_service import LocationService
+from app.services.signals import notify_products_changed
+from typing import List, cast
+
+# Lotes leídos por página durante la asignación FEFO
+FEFO_PAGE_SIZE = 20
+# Tolerancia para comparar cantidades en coma flotante
+EPSILON = 1e-9
+
+
+class LotService:
+    """
+    Servicio para lotes con caducidad y consumo FEFO (first-expired-first-out).
+    """
+
+    @staticmethod
+    def get_product_lots(db: Session, product_id: int, include_empty: bool = False) -> List[Lot]:
+        """
+        Obtiene los lotes de un producto en orden FEFO.
+        """
+        query = db.query(Lot).filter(Lot.product_id == product_id)
+        if not include_empty:
+            query = query.filter(Lot.quantity > 0)
+        return cast(List[Lot], query.order_by(Lot.expiry_date, Lot.id).all())
+
+    @staticmethod
+    def is_lot_tracked(db: Session, product_id: int) -> bool:
+        """
+        Indica si el producto se gestiona por lotes (tiene algún lote, aunque esté agotado):
+        entonces todo su stock entra con receive_lot y sale consumiendo lotes.
+        """
+        return bool(db.query(exists().where(Lot.product_id == product_id)).scalar())
+
+    @staticmethod
+    def receive_lot(db: Session, product_id: int, lot: LotCreate) -> Lot:
+        """
+        Registra la recepción de un lote: suma su cantidad al saldo de la ubicación y al stock
+        del producto (con un movimiento de entrada) en la misma transacción.
+        """
+        try:
+            LocationService.apply_movement(db, StockMovementCreate(
+                product_id=product_id,
+                quantity=lot.quantity,
+                to_location_id=lot.location_id,
+                reference=f"lot:{lot.lot_number}",
+            ), lots=False)
+            db_lot = Lot(
+                product_id=product_id,
+                location_id=lot.location_id,
+                lot_number=lot.lot_number,
+                quantity=lot.quantity,
+                initial_quantity=lot.quantity,
+                expiry_date=lot.expiry_date,
+            )
+            db.add(db_lot)
+            db.commit()
+            db.refresh(db_lot)
+            notify_products_changed("LotService", [product_id], "stock", ["current_stock"])
+            return db_lot
+        except ValueError:
+            db.rollback()
+            raise
+        except IntegrityError:
+            db.rollback()
+            raise ValueError(f"Ya existe el lote {lot.lot_number} para este producto")
+
+    @staticmethod
+    def allocate(db: Session, product_id: int, location_id: int, quantity: float,
+                 today: date = None) -> List[LotAllocation]:
+        """
+        Descuenta quantity de los lotes vigentes del producto en la ubicación, primero los que
+        caducan antes, en la transacción en curso y sin confirmarla. Lanza ValueError si no alcanzan.
+
+        Los lotes se leen por páginas siguiendo el índice (product_id, location_id, expiry_date, id),
+        así el coste es proporcional a los lotes tocados y no al total de lotes del producto.
+        """
+        today = today or date.today()
+        remaining = quantity
+        allocations: List[LotAllocation] = []
+        last_key = None
+
+        while remaining > EPSILON:
+            page_query = (
+                db.query(Lot.id, Lot.lot_number, Lot.quantity, Lot.expiry_date)
+                .filter(Lot.product_id == product_id, Lot.location_id == location_id,
+                        Lot.quantity > 0, Lot.expiry_date >= today)
+            )
+            if last_key is not None:
+                # Paginación por clave (keyset) para continuar donde terminó la página anterior
+                page_query = page_query.filter(or_(
+                    Lot.expiry_date > last_key[0],
+                    and_(Lot.expiry_date == last_key[0], Lot.id > last_key[1]),
+                ))
+            page = page_query.order_by(Lot.expiry_date, Lot.id).limit(FEFO_PAGE_SIZE).all()
+            if not page:
+                break
+
+            for lot_id, lot_number, lot_quantity, expiry_date in page:
+                take = min(lot_quantity, remaining)
+                updated = (
+                    db.query(Lot)
+                    .filter(Lot.id == lot_id, Lot.quantity >= take)
+                    .update({Lot.quantity: Lot.quantity - take}, synchronize_session=False)
+                )
+                if updated == 0:
+                    raise ValueError("El lote fue modificado concurrentemente, reintente la operación")
+
+                allocations.append(LotAllocation(
+                    lot_id=lot_id, lot_number=lot_number, expiry_date=expiry_date, quantity=take
+                ))
+                remaining -= take
+                if remaining <= EPSILON:
+                    break
+            last_key = (page[-1][3], page[-1][0])
+
+        if remaining > EPSILON:
+            raise ValueError("Stock insuficiente en lotes vigentes de la ubicación")
+        return allocations
+
+    @staticmethod
+    def consume(db: Session, product_id: int, quantity: float, location_id: int, reference: str = None,
+                today: date = None) -> List[LotAllocation]:
+        """
+        Consume stock de los lotes vigentes de un producto en una ubicación, primero los que
+        caducan antes, y lo descuenta del saldo de la ubicación y del stock del producto con
+        un movimiento de salida. Todo se aplica en una sola transacción; si no hay suficiente
+        (en lotes, en la ubicación o sin contar lo reservado) no se aplica nada.
+        """
+        try:
+            allocations = LotService.allocate(db, product_id, location_id, quantity, today)
+            LocationService.apply_movement(db, StockMovementCreate(
+                product_id=product_id, quantity=quantity, from_location_id=location_id, reference=reference,
+            ), lots=False)
+            db.commit()
+        except ValueError:
+            db.rollback()
+            raise
+        notify_products_changed("LotService", [product_id], "stock", ["current_stock"])
+        return allocations
+
+    @staticmethod
+    def get_expiring_lots(db: Session, days: int, include_expired: bool = False,
+                          skip: int = 0, limit: int = 100, today: date = None) -> List[Lot]:
+        """
+        Obtiene los lotes con existencias que caducan en los próximos `days` días,
+        en todo el catálogo, servidos por el índice parcial ix_lots_expiry.
+        """
+        today = today or date.today()
+        query = db.query(Lot).filter(Lot.quantity > 0, Lot.expiry_date <= today + timedelta(days=days))
+        if not include_expired:
+            query = query.filter(Lot.expiry_date >= today)
+        lots = query.order_by(Lot.expiry_date, Lot.id).offset(skip).limit(limit).all()
+        return cast(List[Lot], lots)
@@ -1,9 +1,194 @@
 # app/services/product_service.py
+from functools import lru_cache
+from sqlalchemy import and_, bindparam, delete, or_, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from sqlalchemy.sql.elements import Label
 from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductUpdate, AlertProduct
-from typing import List, Optional, cast
+from app.schemas.product import ProductCreate, ProductUpdate, AlertProduct, ProductSelector
+from app.services.inventory_state import LOCATED_ADJUST_ERROR, get_inventory_state
+from app.services.location_service import PRODUCT_HAS_BALANCES
+from app.services.signals import notify_products_changed
+from typing import Any, Dict, List, Optional, cast
+
+# Columnas (o expresiones) de cada campo de ProductResponse, para los fieldsets dispersos
+PRODUCT_FIELD_COLUMNS = {
+    "id": Product.id,
+    "name": Product.name,
+    "code": Product.code,
+    "current_stock": Product.current_stock,
+    "min_stock": Product.min_stock,
+    "reserved_stock": Product.reserved_stock,
+    "available_stock": (Product.current_stock - Product.reserved_stock).label("available_stock"),
+    "supplier_id": Product.supplier_id,
+    "unit_cost": Product.unit_cost,
+    "lot_size": Product.lot_size,
+    "min_order_qty": Product.min_order_qty,
+    "abc_class": Product.abc_class,
+    "xyz_class": Product.xyz_class,
+    "version": Product.version,
+    "created_at": Product.created_at,
+    "updated_at": Product.updated_at,
+}
+
+# Campos de AlertProduct
+ALERT_FIELD_COLUMNS = {
+    "id": Product.id,
+    "name": Product.name,
+    "code": Product.code,
+    "current_stock": Product.current_stock,
+    "min_stock": Product.min_stock,
+    "difference": (Product.min_stock - Product.current_stock).label("difference"),
+    "abc_class": Product.abc_class,
+    "xyz_class": Product.xyz_class,
+}
+
+
+class VersionConflictError(Exception):
+    """
+    La versión indicada (If-Match) ya no es la actual del producto.
+    """
+
+    def __init__(self, product_id: int, current_version: int):
+        super().__init__(f"El producto {product_id} fue modificado (versión actual {current_version})")
+        self.product_id = product_id
+        self.current_version = current_version
+
+
+_FILTER_OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "lt": lambda column, value: column < value,
+    "le": lambda column, value: column <= value,
+    "gt": lambda column, value: column > value,
+    "ge": lambda column, value: column >= value,
+    "in": lambda column, value: column.in_(value),
+    "prefix": lambda column, value: column.startswith(str(value), autoescape=True),
+    "is_null": lambda column, value: column.is_(None) if value in (True, None) else column.is_not(None),
+}
+
+
+def _selector_condition(selector: ProductSelector):
+    """
+    Condición WHERE para una selección masiva (ids, códigos o filtro).
+    Los campos del filtro son los de la respuesta de productos, incluido available_stock.
+    """
+    if selector.ids is not None:
+        return Product.id.in_(selector.ids)
+    if selector.codes is not None:
+        return Product.code.in_(selector.codes)
+
+    conditions = []
+    for condition in selector.filter:
+        column = PRODUCT_FIELD_COLUMNS.get(condition.field)
+        if column is None:
+            raise ValueError(f"Campo de filtro desconocido: {condition.field}")
+        if condition.op == "in" and not isinstance(condition.value, list):
+            raise ValueError(f"El operador 'in' requiere una lista ({condition.field})")
+        if condition.op not in ("is_null", "in") and (condition.value is None or isinstance(condition.value, (list, dict))):
+            raise ValueError(f"Valor inválido para {condition.field} {condition.op}")
+        if isinstance(column, Label):
+            # En el WHERE va la expresión, no la etiqueta de la proyección
+            column = column.element
+        conditions.append(_FILTER_OPERATORS[condition.op](column, condition.value))
+    return and_(*conditions)
+
+
+def _class_filter(statement, abc_classes: Optional[List[str]], xyz_classes: Optional[List[str]]):
+    """
+    Restringe una sentencia a las clases ABC/XYZ pedidas (sin filtro, la devuelve tal cual).
+    """
+    if abc_classes:
+        statement = statement.where(Product.abc_class.in_(abc_classes))
+    if xyz_classes:
+        statement = statement.where(Product.xyz_class.in_(xyz_classes))
+    return statement
+
+
+def _checkpoint_inventory_state():
+    """
+    Con el estado en memoria activo, aplica sus incrementos pendientes antes de una escritura
+    que asigna valores absolutos (stock, versión esperada), para que no se sumen después.
+    """
+    state = get_inventory_state()
+    if state is not None:
+        state.checkpoint()
+
+
+def _absolute_stock_condition(current_stock: float):
+    """
+    Productos a los que se puede asignar un current_stock absoluto: sin saldos por ubicación
+    (su stock es la suma de los saldos y solo cambia con movimientos) y sin más reservado que el nuevo valor.
+    """
+    return and_(~PRODUCT_HAS_BALANCES, Product.reserved_stock <= current_stock)
+
+
+def _check_absolute_stock(db: Session, condition, current_stock: float) -> None:
+    """
+    Lanza ValueError si algún producto de la condición no admite el current_stock absoluto.
+    """
+    located = db.execute(select(Product.id).where(condition, PRODUCT_HAS_BALANCES).limit(1)).scalar()
+    if located is not None:
+        raise ValueError(
+            f"El producto {located} tiene saldos por ubicación: su stock solo cambia con movimientos"
+        )
+    reserved = db.execute(
+        select(Product.id, Product.reserved_stock).where(condition, Product.reserved_stock > current_stock).limit(1)
+    ).first()
+    if reserved is not None:
+        raise ValueError(
+            f"El producto {reserved.id} tiene {reserved.reserved_stock:g} unidades reservadas, más que el nuevo stock"
+        )
+
+
+def _product_fields(product: Product, fields: List[str]) -> Dict[str, Any]:
+    """Campos pedidos de un producto ya cargado (p. ej. del estado en memoria)."""
+    return {field: getattr(product, field) for field in fields}
+
+
+def _projection(columns: Dict[str, Any], fields: List[str]) -> list:
+    """Selecciona solo las columnas pedidas, etiquetadas con el nombre del campo."""
+    return [columns[field].label(field) for field in fields]
+
+
+# Sentencias de las rutas calientes, construidas una sola vez con parámetros ligados: cada
+# llamada reutiliza el objeto (y su clave de caché ya calculada) y el SQL compilado de la
+# caché del motor (DB_QUERY_CACHE_SIZE), en lugar de construir un Query y compilarlo.
+_PRODUCT_BY_ID = select(Product).where(Product.id == bindparam("product_id"))
+_PRODUCT_BY_ID_REFRESH = _PRODUCT_BY_ID.execution_options(populate_existing=True)
+_PRODUCT_BY_CODE = select(Product).where(Product.code == bindparam("code"))
+_PRODUCTS_PAGE = select(Product).offset(bindparam("skip")).limit(bindparam("limit"))
+_PRODUCT_IDS_PAGE = select(Product.id).offset(bindparam("skip")).limit(bindparam("limit"))
+_PRODUCT_LOCATED = select(PRODUCT_HAS_BALANCES).where(Product.id == bindparam("product_id"))
+_LOW_STOCK_PRODUCTS = select(Product).where(Product.current_stock < Product.min_stock)
+_ADJUST_STOCK = (
+    update(Product)
+    # Un ajuste negativo no puede consumir stock reservado; los productos con saldos por
+    # ubicación solo cambian con movimientos
+    .where(Product.id == bindparam("product_id"), ~PRODUCT_HAS_BALANCES,
+           or_(bindparam("delta") >= 0, Product.current_stock - Product.reserved_stock + bindparam("delta") >= 0))
+    .values(current_stock=Product.current_stock + bindparam("delta"), version=Product.version + 1,
+            updated_at=func.now())
+    .returning(Product.id)
+    .execution_options(synchronize_session=False)
+)
+_AVAILABLE_STOCK = select(Product.current_stock - Product.reserved_stock).where(Product.id == bindparam("product_id"))
+
+
+@lru_cache(maxsize=256)
+def _fields_page_statement(fields: tuple):
+    return select(*_projection(PRODUCT_FIELD_COLUMNS, list(fields))).offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+@lru_cache(maxsize=256)
+def _fields_by_id_statement(fields: tuple):
+    return select(*_projection(PRODUCT_FIELD_COLUMNS, list(fields))).where(Product.id == bindparam("product_id"))
+
+
+@lru_cache(maxsize=256)
+def _low_stock_fields_statement(fields: tuple):
+    return select(*_projection(ALERT_FIELD_COLUMNS, list(fields))).where(Product.current_stock < Product.min_stock)
 
 
 class ProductService:
@@ -12,26 +197,67 @@ class ProductService:
     """
 
     @staticmethod
-    def get_products(db: Session, skip: int = 0, limit: int = 100) -> List[Product]:
+    def get_products(db: Session, skip: int = 0, limit: int = 100, abc_classes: Optional[List[str]] = None,
+                     xyz_classes: Optional[List[str]] = None) -> List[Product]:
         """
-        Obtiene lista de productos paginada.
+        Obtiene lista de productos paginada, opcionalmente filtrada por clase ABC/XYZ.
+        Con el estado en memoria activo, la página de IDs sale de la base de datos y los
+        productos del estado, con el stock vigente.
         """
-        products = db.query(Product).offset(skip).limit(limit).all()
+        state = get_inventory_state()
+        if state is not None:
+            query = _class_filter(_PRODUCT_IDS_PAGE, abc_classes, xyz_classes)
+            return state.get_products(db.execute(query, {"skip": skip, "limit": limit}).scalars().all())
+        query = _class_filter(_PRODUCTS_PAGE, abc_classes, xyz_classes)
+        products = db.execute(query, {"skip": skip, "limit": limit}).scalars().all()
         return cast(List[Product], products)  # Cast para asegurar el tipo correcto
 
+    @staticmethod
+    def get_products_fields(db: Session, fields: List[str], skip: int = 0, limit: int = 100,
+                            abc_classes: Optional[List[str]] = None,
+                            xyz_classes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene la lista paginada solo con los campos pedidos: consulta únicamente esas columnas
+        y devuelve diccionarios, sin crear entidades del ORM (con el estado en memoria activo,
+        los campos salen de sus productos, como en get_product_by_id).
+        """
+        state = get_inventory_state()
+        if state is not None:
+            products = ProductService.get_products(db, skip, limit, abc_classes, xyz_classes)
+            return [_product_fields(product, fields) for product in products]
+        query = _class_filter(_fields_page_statement(tuple(fields)), abc_classes, xyz_classes)
+        return [dict(row) for row in db.execute(query, {"skip": skip, "limit": limit}).mappings()]
+
+    @staticmethod
+    def get_product_fields(db: Session, product_id: int, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene un producto solo con los campos pedidos, o None si no existe.
+        """
+        state = get_inventory_state()
+        if state is not None:
+            product = state.get_product(product_id)
+            return _product_fields(product, fields) if product is not None else None
+        query = _fields_by_id_statement(tuple(fields))
+        row = db.execute(query, {"product_id": product_id}).mappings().first()
+        return dict(row) if row is not None else None
+
     @staticmethod
     def get_product_by_id(db: Session, product_id: int) -> Optional[Product]:
         """
-        Obtiene un producto por su ID.
+        Obtiene un producto por su ID (desde el estado en memoria si está activo:
+        entonces es una instancia sin sesión, solo para lectura).
         """
-        return db.query(Product).filter(Product.id == product_id).first()
+        state = get_inventory_state()
+        if state is not None:
+            return state.get_product(product_id)
+        return db.execute(_PRODUCT_BY_ID, {"product_id": product_id}).scalars().first()
 
     @staticmethod
     def get_product_by_code(db: Session, code: str) -> Optional[Product]:
         """
         Obtiene un producto por su código.
         """
-        return db.query(Product).filter(Product.code == code.upper()).first()
+        return db.execute(_PRODUCT_BY_CODE, {"code": code.upper()}).scalars().first()
 
     @staticmethod
     def create_product(db: Session, product: ProductCreate) -> Product:
@@ -49,61 +275,165 @@ class ProductService:
                 name=product.name,
                 code=product.code,
                 current_stock=product.current_stock,
-                min_stock=product.min_stock
+                min_stock=product.min_stock,
+                supplier_id=product.supplier_id,
+                unit_cost=product.unit_cost,
+                lot_size=product.lot_size,
+                min_order_qty=product.min_order_qty
             )
             db.add(db_product)
             db.commit()
             db.refresh(db_product)
+            notify_products_changed("ProductService", [db_product.id], "created")
             return db_product
         except IntegrityError:
             db.rollback()
             raise ValueError("Error al crear el producto. Verifique los datos.")
 
     @staticmethod
-    def update_product(db: Session, product_id: int, product_data: ProductUpdate) -> Optional[Product]:
+    def update_product(db: Session, product_id: int, product_data: ProductUpdate,
+                       expected_versions: Optional[List[int]] = None) -> Optional[Product]:
         """
         Actualiza un producto existente.
-        """
-        db_product = ProductService.get_product_by_id(db, product_id)
-        if db_product is None:
-            return None
 
-        # Actualizar solo los campos presentes
+        Con expected_versions (de If-Match) la actualización es un compare-and-swap:
+        UPDATE ... WHERE id = :id AND version IN (:versiones), sin bloquear la fila entre
+        la lectura y la escritura. Si otro cliente la modificó antes, lanza VersionConflictError.
+        """
         update_data = product_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_product, key, value)
+        _checkpoint_inventory_state()
+        if not update_data:
+            db_product = ProductService.get_product_by_id(db, product_id)
+            if db_product is not None and expected_versions is not None and db_product.version not in expected_versions:
+                raise VersionConflictError(product_id, db_product.version)
+            return db_product
 
+        condition = Product.id == product_id
+        if "current_stock" in update_data:
+            _check_absolute_stock(db, condition, update_data["current_stock"])
+            # Por si cambian los saldos o las reservas entre la comprobación y el UPDATE
+            condition = and_(condition, _absolute_stock_condition(update_data["current_stock"]))
+        if expected_versions is not None:
+            condition = and_(condition, Product.version.in_(expected_versions))
+        statement = (
+            update(Product)
+            .where(condition)
+            .values(**update_data, version=Product.version + 1, updated_at=func.now())
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
         try:
+            updated = db.execute(statement).first()
+            if updated is None:
+                db.rollback()
+                if "current_stock" in update_data:
+                    _check_absolute_stock(db, Product.id == product_id, update_data["current_stock"])
+                current_version = db.execute(select(Product.version).where(Product.id == product_id)).scalar()
+                if current_version is None:
+                    return None
+                raise VersionConflictError(product_id, current_version)
             db.commit()
-            db.refresh(db_product)
-            return db_product
         except IntegrityError:
             db.rollback()
             raise ValueError("Error al actualizar el producto.")
 
+        notify_products_changed("ProductService", [product_id], "updated", update_data.keys())
+        return db.execute(_PRODUCT_BY_ID_REFRESH, {"product_id": product_id}).scalars().first()
+
     @staticmethod
     def delete_product(db: Session, product_id: int) -> bool:
         """
         Elimina un producto por su ID.
         """
-        db_product = ProductService.get_product_by_id(db, product_id)
+        db_product = db.get(Product, product_id)
         if db_product is None:
             return False
 
         try:
             db.delete(db_product)
             db.commit()
-            return True
         except Exception:
             db.rollback()
             raise ValueError("Error al eliminar el producto.")
+        notify_products_changed("ProductService", [product_id], "deleted")
+        return True
+
+    @staticmethod
+    def bulk_update(db: Session, selector: ProductSelector, changes: ProductUpdate) -> List[int]:
+        """
+        Asigna los mismos campos a todos los productos seleccionados con un único
+        UPDATE ... RETURNING id, en una transacción. Devuelve los IDs afectados.
+        """
+        update_data = changes.model_dump(exclude_unset=True)
+        _checkpoint_inventory_state()
+        condition = _selector_condition(selector)
+        if "current_stock" in update_data:
+            _check_absolute_stock(db, condition, update_data["current_stock"])
+            condition = and_(condition, _absolute_stock_condition(update_data["current_stock"]))
+        statement = (
+            update(Product)
+            .where(condition)
+            .values(**update_data, version=Product.version + 1, updated_at=func.now())
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            ids = list(db.execute(statement).scalars())
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise ValueError("Error al actualizar los productos. Verifique los datos.")
+
+        if ids:
+            notify_products_changed("ProductService", ids, "updated", update_data.keys())
+        return ids
+
+    @staticmethod
+    def bulk_delete(db: Session, selector: ProductSelector) -> List[int]:
+        """
+        Elimina los productos seleccionados con un único DELETE ... RETURNING id.
+        Devuelve los IDs eliminados.
+        """
+        statement = (
+            delete(Product)
+            .where(_selector_condition(selector))
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            ids = list(db.execute(statement).scalars())
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise ValueError("Error al eliminar los productos.")
+
+        if ids:
+            notify_products_changed("ProductService", ids, "deleted")
+        return ids
 
     @staticmethod
-    def get_low_stock_products(db: Session) -> List[AlertProduct]:
+    def get_low_stock_fields(db: Session, fields: List[str], abc_classes: Optional[List[str]] = None,
+                             xyz_classes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
-        Obtiene productos con stock por debajo del mínimo.
+        Obtiene los productos en alerta solo con los campos pedidos (sin entidades del ORM).
         """
-        products = cast(List[Product], db.query(Product).filter(Product.current_stock < Product.min_stock).all())
+        state = get_inventory_state()
+        if state is not None:
+            return state.low_stock_fields(fields, abc_classes, xyz_classes)
+        query = _class_filter(_low_stock_fields_statement(tuple(fields)), abc_classes, xyz_classes)
+        return [dict(row) for row in db.execute(query).mappings()]
+
+    @staticmethod
+    def get_low_stock_products(db: Session, abc_classes: Optional[List[str]] = None,
+                               xyz_classes: Optional[List[str]] = None) -> List[AlertProduct]:
+        """
+        Obtiene productos con stock por debajo del mínimo, opcionalmente filtrados por clase ABC/XYZ.
+        """
+        state = get_inventory_state()
+        if state is not None:
+            return state.low_stock(abc_classes, xyz_classes)
+        query = _class_filter(_LOW_STOCK_PRODUCTS, abc_classes, xyz_classes)
+        products = cast(List[Product], db.execute(query).scalars().all())
 
         # Transformar a modelo de alerta
         alerts = []
@@ -122,8 +452,35 @@ class ProductService:
                 code=code,
                 current_stock=current_stock,
                 min_stock=min_stock,
-                difference=difference
+                difference=difference,
+                abc_class=p.abc_class,
+                xyz_class=p.xyz_class
             )
             alerts.append(alert)
 
-        return alerts
\ No newline at end of file
+        return alerts
+
+    @staticmethod
+    def adjust_stock(db: Session, product_id: int, delta: float) -> Optional[Product]:
+        """
+        Suma delta (positivo o negativo) al stock de un producto sin consumir lo reservado.
+        Devuelve el producto actualizado, o None si no existe; lanza ValueError si no hay
+        stock disponible suficiente o si el producto tiene saldos por ubicación (entonces el
+        stock cambia con movimientos de una ubicación concreta). Con el estado en memoria activo se aplica allí y en su log.
+        """
+        state = get_inventory_state()
+        if state is not None:
+            return state.increment(product_id, delta)
+
+        updated = db.execute(_ADJUST_STOCK, {"product_id": product_id, "delta": delta}).first()
+        if updated is None:
+            db.rollback()
+            available = db.execute(_AVAILABLE_STOCK, {"product_id": product_id}).scalar()
+            if available is None:
+                return None
+            if db.execute(_PRODUCT_LOCATED, {"product_id": product_id}).scalar():
+                raise ValueError(LOCATED_ADJUST_ERROR)
+            raise ValueError(f"Stock insuficiente: disponible {available}, se solicitan {-delta}")
+        db.commit()
+        notify_products_changed("ProductService", [product_id], "stock", ["current_stock"])
+        return db.execute(_PRODUCT_BY_ID_REFRESH, {"product_id": product_id}).scalars().first()
@@ -0,0 +1,146 @@
+# app/services/purchasing_service.py
+from sqlalchemy import select, insert, case, literal
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from app.models.product import Product
+from app.models.purchasing import Supplier, PurchaseSuggestionBatch, PurchaseSuggestion
+from app.schemas.purchasing import SupplierCreate, SupplierSuggestionSummary
+from app.services.job_service import register_job, JobContext
+from app.db.base import SessionLocal
+from typing import List, Optional, cast
+
+
+class PurchasingService:
+    """
+    Servicio para proveedores y sugerencias de compra.
+    """
+
+    @staticmethod
+    def get_suppliers(db: Session, skip: int = 0, limit: int = 100) -> List[Supplier]:
+        """
+        Obtiene lista de proveedores paginada.
+        """
+        suppliers = db.query(Supplier).order_by(Supplier.id).offset(skip).limit(limit).all()
+        return cast(List[Supplier], suppliers)
+
+    @staticmethod
+    def create_supplier(db: Session, supplier: SupplierCreate) -> Supplier:
+        """
+        Crea un nuevo proveedor.
+        """
+        existing = db.query(Supplier.id).filter(Supplier.code == supplier.code).first()
+        if existing:
+            raise ValueError(f"Ya existe un proveedor con el código {supplier.code}")
+
+        try:
+            db_supplier = Supplier(code=supplier.code, name=supplier.name)
+            db.add(db_supplier)
+            db.commit()
+            db.refresh(db_supplier)
+            return db_supplier
+        except IntegrityError:
+            db.rollback()
+            raise ValueError("Error al crear el proveedor. Verifique los datos.")
+
+    @staticmethod
+    def _suggestion_select(batch_id: int, use_available: bool):
+        """
+        Construye el SELECT que calcula todas las líneas sugeridas de una vez.
+
+        cantidad = ceil(max(faltante, pedido mínimo) / múltiplo) * múltiplo,
+        evaluado por la base de datos sobre todos los productos en alerta.
+        """
+        stock = Product.current_stock - Product.reserved_stock if use_available else Product.current_stock
+        shortage = Product.min_stock - stock
+        base_quantity = case((shortage > Product.min_order_qty, shortage), else_=Product.min_order_qty)
+        quantity = func.ceil(base_quantity / Product.lot_size) * Product.lot_size
+
+        return (
+            select(
+                literal(batch_id),
+                Product.supplier_id,
+                Product.id,
+                shortage,
+                quantity,
+                Product.unit_cost,
+                quantity * Product.unit_cost,
+            )
+            .where(stock < Product.min_stock)
+        )
+
+    @staticmethod
+    def generate_suggestions(db: Session, use_available: bool = True) -> PurchaseSuggestionBatch:
+        """
+        Genera y persiste un lote de sugerencias de compra con un único INSERT ... SELECT,
+        sin cargar productos en objetos ORM.
+        """
+        batch = PurchaseSuggestionBatch(use_available=int(use_available))
+        db.add(batch)
+        db.flush()
+
+        db.execute(
+            insert(PurchaseSuggestion).from_select(
+                ["batch_id", "supplier_id", "product_id", "shortage", "quantity", "unit_cost", "amount"],
+                PurchasingService._suggestion_select(batch.id, use_available),
+            )
+        )
+        batch.line_count = db.query(func.count(PurchaseSuggestion.id)).filter(
+            PurchaseSuggestion.batch_id == batch.id
+        ).scalar()
+        db.commit()
+        db.refresh(batch)
+        return batch
+
+    @staticmethod
+    def get_batch(db: Session, batch_id: int) -> Optional[PurchaseSuggestionBatch]:
+        """
+        Obtiene un lote de sugerencias por su ID.
+        """
+        return db.query(PurchaseSuggestionBatch).filter(PurchaseSuggestionBatch.id == batch_id).first()
+
+    @staticmethod
+    def get_batch_summary(db: Session, batch_id: int) -> List[SupplierSuggestionSummary]:
+        """
+        Agrupa las líneas de un lote por proveedor (una orden sugerida por proveedor).
+        """
+        rows = (
+            db.query(
+                PurchaseSuggestion.supplier_id,
+                Supplier.code.label("supplier_code"),
+                func.count(PurchaseSuggestion.id).label("lines"),
+                func.sum(PurchaseSuggestion.quantity).label("total_quantity"),
+                func.sum(PurchaseSuggestion.amount).label("total_amount"),
+            )
+            .outerjoin(Supplier, Supplier.id == PurchaseSuggestion.supplier_id)
+            .filter(PurchaseSuggestion.batch_id == batch_id)
+            .group_by(PurchaseSuggestion.supplier_id, Supplier.code)
+            .order_by(PurchaseSuggestion.supplier_id)
+            .all()
+        )
+        return [SupplierSuggestionSummary.model_validate(dict(row._mapping)) for row in rows]
+
+    @staticmethod
+    def get_batch_lines(db: Session, batch_id: int, supplier_id: Optional[int] = None,
+                        skip: int = 0, limit: int = 100) -> List[PurchaseSuggestion]:
+        """
+        Obtiene las líneas de un lote, opcionalmente de un proveedor.
+        """
+        query = db.query(PurchaseSuggestion).filter(PurchaseSuggestion.batch_id == batch_id)
+        if supplier_id is not None:
+            query = query.filter(PurchaseSuggestion.supplier_id == supplier_id)
+        lines = query.order_by(PurchaseSuggestion.supplier_id, PurchaseSuggestion.product_id).offset(skip).limit(limit).all()
+        return cast(List[PurchaseSuggestion], lines)
+
+
+@register_job("purchase_suggestions")
+def generate_suggestions_job(ctx: JobContext) -> dict:
+    """
+    Trabajo en segundo plano que genera un lote de sugerencias de compra.
+    """
+    db = SessionLocal()
+    try:
+        batch = PurchasingService.generate_suggestions(db, bool(ctx.params.get("use_available", True)))
+        return {"batch_id": batch.id, "line_count": batch.line_count}
+    finally:
+        db.close()
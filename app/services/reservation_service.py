@@ -0,0 +1,325 @@
+# app/services/reservation_service.py
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import exists, select, update, bindparam
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db.base import SessionLocal
+from app.db.tenancy import tenant_scope
+from app.models.product import Product
+from app.models.location import StockBalance, StockMovement
+from app.models.reservation import Reservation
+from app.schemas.location import StockMovementCreate
+from app.schemas.reservation import ReservationCreate
+from app.services.job_service import register_job, JobContext
+from app.services.location_service import LocationService
+from app.services.lot_service import LotService
+from app.services.signals import notify_products_changed
+from app.utils.dates import utcnow
+from typing import Callable, Dict, List, Optional, Tuple, cast
+
+logger = logging.getLogger(__name__)
+
+_products_table = Product.__table__
+
+
+class ReservationService:
+    """
+    Servicio para reservas de stock.
+
+    Product.reserved_stock se mantiene de forma incremental con UPDATE atómicos
+    (reserved_stock = reserved_stock ± cantidad), sin leer y reescribir la fila del producto.
+    """
+
+    @staticmethod
+    def get_reservation(db: Session, reservation_id: int) -> Optional[Reservation]:
+        """
+        Obtiene una reserva por su ID.
+        """
+        return db.query(Reservation).filter(Reservation.id == reservation_id).first()
+
+    @staticmethod
+    def get_reservations(db: Session, product_id: Optional[int] = None, status: Optional[str] = None,
+                         skip: int = 0, limit: int = 100) -> List[Reservation]:
+        """
+        Obtiene las reservas más recientes, filtradas opcionalmente por producto y estado.
+        """
+        query = db.query(Reservation)
+        if product_id is not None:
+            query = query.filter(Reservation.product_id == product_id)
+        if status is not None:
+            query = query.filter(Reservation.status == status)
+        reservations = query.order_by(Reservation.id.desc()).offset(skip).limit(limit).all()
+        return cast(List[Reservation], reservations)
+
+    @staticmethod
+    def reserve(db: Session, reservation: ReservationCreate) -> Reservation:
+        """
+        Reserva stock de un producto si hay disponible suficiente.
+        """
+        # Reserva condicionada: el propio UPDATE comprueba el disponible
+        updated = (
+            db.query(Product)
+            .filter(
+                Product.id == reservation.product_id,
+                Product.current_stock - Product.reserved_stock >= reservation.quantity,
+            )
+            .update(
+                {Product.reserved_stock: Product.reserved_stock + reservation.quantity, Product.version: Product.version + 1},
+                synchronize_session=False,
+            )
+        )
+        if updated == 0:
+            db.rollback()
+            exists = db.query(Product.id).filter(Product.id == reservation.product_id).first()
+            if exists is None:
+                raise ValueError(f"No existe el producto {reservation.product_id}")
+            raise ValueError("Stock disponible insuficiente para la reserva")
+
+        db_reservation = Reservation(
+            product_id=reservation.product_id,
+            quantity=reservation.quantity,
+            status="active",
+            reference=reservation.reference,
+            expires_at=utcnow() + timedelta(seconds=reservation.ttl_seconds),
+        )
+        db.add(db_reservation)
+        db.commit()
+        db.refresh(db_reservation)
+        notify_products_changed("ReservationService", [reservation.product_id], "stock", ["reserved_stock"])
+        return db_reservation
+
+    @staticmethod
+    def _close(db: Session, reservation_id: int, status: str) -> Optional[tuple]:
+        """
+        Cierra una reserva activa y devuelve (product_id, quantity), o None si no estaba activa.
+        Solo se confirman reservas vigentes: una vencida que el barrido aún no expiró ya no retiene stock.
+        """
+        condition = [Reservation.id == reservation_id, Reservation.status == "active"]
+        if status == "committed":
+            condition.append(Reservation.expires_at > utcnow())
+        row = db.execute(
+            update(Reservation)
+            .where(*condition)
+            .values(status=status, closed_at=utcnow())
+            .returning(Reservation.product_id, Reservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).first()
+        return tuple(row) if row is not None else None
+
+    @staticmethod
+    def release(db: Session, reservation_id: int) -> Optional[Reservation]:
+        """
+        Libera una reserva activa devolviendo su cantidad al disponible.
+        """
+        closed = ReservationService._close(db, reservation_id, "released")
+        if closed is None:
+            db.rollback()
+            if ReservationService.get_reservation(db, reservation_id) is None:
+                return None
+            raise ValueError("La reserva no está activa")
+
+        product_id, quantity = closed
+        db.query(Product).filter(Product.id == product_id).update(
+            {Product.reserved_stock: Product.reserved_stock - quantity, Product.version: Product.version + 1},
+            synchronize_session=False,
+        )
+        db.commit()
+        notify_products_changed("ReservationService", [product_id], "stock", ["reserved_stock"])
+        return ReservationService.get_reservation(db, reservation_id)
+
+    @staticmethod
+    def commit(db: Session, reservation_id: int, location_id: Optional[int] = None) -> Optional[Reservation]:
+        """
+        Confirma una reserva: descuenta su cantidad del stock actual y de lo reservado,
+        y registra la salida en el ledger de movimientos. Si el producto tiene saldos por
+        ubicación hay que indicar de cuál sale, para que el stock actual siga siendo su suma
+        (y, si se gestiona por lotes, se consumen los lotes de esa ubicación en orden FEFO).
+        """
+        closed = ReservationService._close(db, reservation_id, "committed")
+        if closed is None:
+            db.rollback()
+            reservation = ReservationService.get_reservation(db, reservation_id)
+            if reservation is None:
+                return None
+            if reservation.status == "active":
+                raise ValueError("La reserva expiró")
+            raise ValueError("La reserva no está activa")
+
+        product_id, quantity = closed
+        # Lo reservado deja de retener el stock: la salida de abajo lo descuenta del disponible
+        db.query(Product).filter(Product.id == product_id).update(
+            {Product.reserved_stock: Product.reserved_stock - quantity, Product.version: Product.version + 1},
+            synchronize_session=False,
+        )
+        reference = f"reservation:{reservation_id}"
+        if location_id is None:
+            located = db.query(exists().where(StockBalance.product_id == product_id)).scalar()
+            if located or LotService.is_lot_tracked(db, product_id):
+                db.rollback()
+                raise ValueError("El producto tiene stock por ubicación: indique location_id")
+            db.query(Product).filter(Product.id == product_id).update(
+                {Product.current_stock: Product.current_stock - quantity, Product.updated_at: func.now()},
+                synchronize_session=False,
+            )
+            db.add(StockMovement(product_id=product_id, kind="issue", quantity=quantity, reference=reference))
+        else:
+            # Mismo camino que una salida por ubicación: saldo, lotes FEFO y ledger
+            try:
+                LocationService.apply_movement(db, StockMovementCreate(
+                    product_id=product_id, quantity=quantity, from_location_id=location_id, reference=reference,
+                ))
+            except ValueError:
+                db.rollback()
+                raise
+        db.commit()
+        notify_products_changed("ReservationService", [product_id], "stock", ["current_stock", "reserved_stock"])
+        return ReservationService.get_reservation(db, reservation_id)
+
+    @staticmethod
+    def expire_due(db: Session, now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        """
+        Expira un lote de reservas vencidas y devuelve cuántas expiraron.
+
+        Las vencidas se toman del índice parcial por expires_at (solo activas), y la
+        cantidad liberada se agrupa por producto para hacer un UPDATE por producto.
+        """
+        now = now or utcnow()
+        due = (
+            select(Reservation.id)
+            .where(Reservation.status == "active", Reservation.expires_at <= now)
+            .order_by(Reservation.expires_at)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        rows = db.execute(
+            update(Reservation)
+            .where(Reservation.id.in_(due), Reservation.status == "active")
+            .values(status="expired", closed_at=now)
+            .returning(Reservation.product_id, Reservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not rows:
+            db.rollback()
+            return 0
+
+        released: Dict[int, float] = defaultdict(float)
+        for product_id, quantity in rows:
+            released[product_id] += quantity
+
+        db.execute(
+            update(_products_table)
+            .where(_products_table.c.id == bindparam("b_product_id"))
+            .values(
+                reserved_stock=_products_table.c.reserved_stock - bindparam("b_quantity"),
+                version=_products_table.c.version + 1,
+            ),
+            [{"b_product_id": pid, "b_quantity": qty} for pid, qty in released.items()],
+        )
+        db.commit()
+        notify_products_changed("ReservationService", list(released), "stock", ["reserved_stock"])
+        return len(rows)
+
+    @staticmethod
+    def next_expiry(db: Session) -> Optional[datetime]:
+        """
+        Obtiene la próxima fecha de expiración entre las reservas activas.
+        """
+        return db.query(func.min(Reservation.expires_at)).filter(Reservation.status == "active").scalar()
+
+
+@register_job("reservations_expire")
+def expire_reservations_job(ctx: JobContext) -> dict:
+    """
+    Trabajo en segundo plano que expira todas las reservas vencidas.
+    """
+    batch_size = int(ctx.params.get("batch_size", 1000))
+    total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            ctx.check_cancelled()
+            expired = ReservationService.expire_due(db, batch_size=batch_size)
+            total += expired
+            if expired < batch_size:
+                break
+    finally:
+        db.close()
+    return {"expired": total}
+
+
+class ReservationSweeper(threading.Thread):
+    """
+    Hilo que expira las reservas vencidas en lotes.
+
+    Entre barridos duerme hasta la próxima expiración (consultada en el índice),
+    con un máximo de max_interval segundos, en lugar de recorrer periódicamente todas las reservas.
+    Con `tenants`, barre además las bases de datos de los tenants que devuelva.
+    """
+
+    def __init__(self, batch_size: int = 1000, max_interval: float = 5.0,
+                 tenants: Optional[Callable[[], List[str]]] = None):
+        super().__init__(name="reservation-sweeper", daemon=True)
+        self.batch_size = batch_size
+        self.max_interval = max_interval
+        self.tenants = tenants
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def sweep(self) -> Tuple[int, float]:
+        """Expira todas las reservas vencidas, lote a lote, y devuelve (expiradas, segundos hasta el próximo barrido)."""
+        total = 0
+        db = SessionLocal()
+        try:
+            while True:
+                expired = ReservationService.expire_due(db, batch_size=self.batch_size)
+                total += expired
+                if expired < self.batch_size:
+                    break
+            next_expiry = ReservationService.next_expiry(db)
+            db.commit()
+        finally:
+            db.close()
+
+        if total:
+            logger.info("Reservas expiradas: %d", total)
+
+        if next_expiry is None:
+            return total, self.max_interval
+        return total, max(0.0, min(self.max_interval, (next_expiry - utcnow()).total_seconds()))
+
+    def sweep_all(self) -> float:
+        """Barre la base de datos por defecto y la de cada tenant; devuelve la espera hasta el próximo barrido."""
+        wait = self.max_interval
+        for tenant_id in [None] + (self.tenants() if self.tenants else []):
+            try:
+                with tenant_scope(tenant_id):
+                    _, tenant_wait = self.sweep()
+                wait = min(wait, tenant_wait)
+            except Exception:
+                logger.exception("Error al expirar reservas%s", f" del tenant {tenant_id}" if tenant_id else "")
+        return wait
+
+    def run(self):
+        while not self._stop_event.is_set():
+            wait = self.sweep_all()
+            self._stop_event.wait(max(wait, 0.05))
+
+
+_sweeper: Optional[ReservationSweeper] = None
+
+
+def start_reservation_sweeper(batch_size: int = 1000, max_interval: float = 5.0,
+                              tenants: Optional[Callable[[], List[str]]] = None) -> ReservationSweeper:
+    """
+    Inicia (una sola vez por proceso) el hilo de expiración de reservas.
+    """
+    global _sweeper
+    if _sweeper is None or not _sweeper.is_alive():
+        _sweeper = ReservationSweeper(batch_size=batch_size, max_interval=max_interval, tenants=tenants)
+        _sweeper.start()
+    return _sweeper
@@ -0,0 +1,39 @@
+# app/services/signals.py
+"""
+Señales de dominio (blinker) para enganchar cachés, alertas o un feed de cambios
+sin acoplarlos a los servicios que escriben.
+
+Se emiten después de confirmar la transacción. Un receptor que falla se registra
+en el log y no afecta a la operación ni al resto de receptores.
+"""
+import logging
+from blinker import Namespace
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_signals = Namespace()
+
+# Kwargs: ids (lista de IDs afectados, o None si no se conocen: los receptores deben
+# refrescarlo todo), action (created, updated, deleted, imported, stock) y fields
+# (campos modificados, o None si pueden ser todos)
+products_changed = _signals.signal("products-changed")
+
+
+def notify_products_changed(sender: str, ids: Optional[Iterable[int]], action: str,
+                            fields: Optional[Iterable[str]] = None):
+    """
+    Emite products_changed aislando los errores de cada receptor.
+    """
+    if not products_changed.receivers:
+        return
+    kwargs = {
+        "ids": list(ids) if ids is not None else None,
+        "action": action,
+        "fields": list(fields) if fields is not None else None,
+    }
+    for receiver in products_changed.receivers_for(sender):
+        try:
+            receiver(sender, **kwargs)
+        except Exception:
+            logger.exception(f"Error en un receptor de products_changed ({action})")
@@ -0,0 +1,280 @@
+# app/services/write_queue.py
+"""
+Cola de escritura con un único hilo escritor y group commit.
+
+SQLite admite un solo escritor: con muchas peticiones confirmando a la vez, cada una paga
+su propio fsync y compite por el bloqueo ("database is locked"). Con la cola, las operaciones
+se envían a un hilo escritor que las agrupa en una transacción cada pocos milisegundos
+(como mucho max_batch_size operaciones) y responde a cada llamante cuando el lote se confirma.
+
+Cada operación corre en su propio SAVEPOINT: si falla, solo se deshace esa operación y
+su llamante recibe la excepción; el resto del lote se confirma igualmente.
+
+Si el llamante deja de esperar, la operación se cancela mientras siga en cola; si el escritor
+ya la tomó, puede confirmarse todavía: el llamante recibe WriteOutcomeUnknown con un
+identificador para consultar el resultado, no un error que invite a repetirla.
+"""
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.db.base import SQLALCHEMY_DATABASE_URL
+from app.db.tenancy import current_tenant
+from app.utils.metrics import REGISTRY, instrument_engine
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = REGISTRY.histogram(
+    "write_queue_batch_size", "Operaciones por transacción del hilo escritor",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+WRITE_BATCH_SECONDS = REGISTRY.histogram(
+    "write_queue_batch_seconds", "Duración de cada lote del hilo escritor, incluido el commit")
+WRITE_QUEUE_WAIT = REGISTRY.histogram(
+    "write_queue_wait_seconds", "Espera en cola hasta que el escritor toma la operación")
+WRITE_QUEUE_OPERATIONS = REGISTRY.counter(
+    "write_queue_operations_total", "Operaciones de la cola de escritura por resultado", ("outcome",))
+
+# Operación en cola: (función, argumentos, futuro del llamante, instante de envío)
+Operation = Tuple[Callable[..., Any], tuple, Future, float]
+
+# Operaciones con resultado desconocido que se pueden consultar (las más recientes)
+MAX_TRACKED = 1000
+
+
+class WriteQueueFull(Exception):
+    """
+    La cola de escritura alcanzó su máximo de operaciones pendientes.
+    """
+    pass
+
+
+class WriteOutcomeUnknown(Exception):
+    """
+    La operación no terminó en el plazo y el escritor ya la había tomado: puede confirmarse
+    o no. `operation_id` permite consultar el resultado con WriteQueue.lookup().
+    """
+
+    def __init__(self, operation_id: str, future: Future):
+        super().__init__("La operación sigue en curso; consulte su resultado antes de repetirla")
+        self.operation_id = operation_id
+        self.future = future
+
+
+def writer_engine(database_url: str = SQLALCHEMY_DATABASE_URL) -> Engine:
+    """
+    Motor del hilo escritor: una única conexión. En SQLite cada transacción empieza con
+    BEGIN IMMEDIATE, que toma el bloqueo de escritura al inicio (sin fallar a mitad del lote
+    al pasar de lectura a escritura), y pysqlite deja de gestionar las transacciones para
+    que los SAVEPOINT de cada operación queden dentro de la transacción del lote.
+    """
+    if not database_url.startswith("sqlite"):
+        return create_engine(database_url, pool_size=1, max_overflow=0)
+
+    engine = create_engine(
+        database_url, pool_size=1, max_overflow=0,
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+class WriteQueue(threading.Thread):
+    """
+    Hilo escritor que ejecuta las operaciones enviadas con submit() en lotes (group commit).
+
+    Tras tomar la primera operación, el escritor recoge las que ya esperan y aguarda como
+    mucho max_latency segundos a que lleguen más, hasta max_batch_size por lote.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch_size: int = 64,
+                 max_latency: float = 0.002, max_pending: int = 10000):
+        super().__init__(name="write-queue", daemon=True)
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size debe ser al menos 1")
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_pending = max_pending
+        self._queue: "queue.Queue[Optional[Operation]]" = queue.Queue(maxsize=max_pending)
+        self._stopping = False
+        self._tracked: "OrderedDict[str, Future]" = OrderedDict()
+        self._tracked_lock = threading.Lock()
+
+    def submit(self, operation: Callable[..., Any], *args) -> Future:
+        """
+        Encola operation(db, *args) y devuelve un Future que se resuelve con su resultado
+        cuando el lote se confirma. El resultado no debe depender de la sesión del escritor
+        (se cierra tras el lote): devuelva datos planos o esquemas.
+        """
+        if self._stopping:
+            raise RuntimeError("La cola de escritura está detenida")
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((operation, args, future, time.perf_counter()))
+        except queue.Full:
+            WRITE_QUEUE_OPERATIONS.inc(outcome="rejected")
+            raise WriteQueueFull("Demasiadas escrituras pendientes, reintente más tarde")
+        return future
+
+    def execute(self, operation: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """
+        Envía la operación y espera su resultado (o su excepción).
+        Si vence el plazo, la operación se cancela y se lanza TimeoutError cuando aún no se había
+        empezado (repetirla es seguro); si ya estaba en marcha se lanza WriteOutcomeUnknown.
+        """
+        future = self.submit(operation, *args)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            if future.cancel():
+                WRITE_QUEUE_OPERATIONS.inc(outcome="cancelled")
+                raise
+            raise WriteOutcomeUnknown(self._track(future), future)
+
+    def _track(self, future: Future) -> str:
+        """Guarda el futuro para consultarlo después; se olvidan los más antiguos."""
+        operation_id = uuid.uuid4().hex
+        with self._tracked_lock:
+            self._tracked[operation_id] = future
+            while len(self._tracked) > MAX_TRACKED:
+                self._tracked.popitem(last=False)
+        return operation_id
+
+    def lookup(self, operation_id: str) -> Optional[Future]:
+        """
+        Futuro de una operación que terminó en WriteOutcomeUnknown, o None si no se conoce
+        (otro proceso, ya olvidada o un identificador inválido).
+        """
+        with self._tracked_lock:
+            return self._tracked.get(operation_id)
+
+    def pending(self) -> int:
+        """Operaciones en cola sin tomar por el escritor."""
+        return self._queue.qsize()
+
+    def stop(self):
+        """Deja de aceptar operaciones; el escritor termina tras vaciar la cola."""
+        self._stopping = True
+        self._queue.put(None)
+
+    def _collect(self, first: Operation) -> Tuple[List[Operation], bool]:
+        """Forma un lote a partir de la primera operación. Devuelve (lote, se pidió parar)."""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run_batch(self, batch: List[Operation]):
+        """Ejecuta un lote en una transacción, con un SAVEPOINT por operación."""
+        started = time.perf_counter()
+        done: List[Tuple[Future, Any]] = []
+        db = self.session_factory()
+        try:
+            for operation, args, future, submitted in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                WRITE_QUEUE_WAIT.observe(started - submitted)
+                savepoint = db.begin_nested()
+                try:
+                    result = operation(db, *args)
+                    savepoint.commit()
+                except Exception as e:
+                    savepoint.rollback()
+                    WRITE_QUEUE_OPERATIONS.inc(outcome="failed")
+                    future.set_exception(e)
+                    continue
+                done.append((future, result))
+            db.commit()
+        except Exception as e:
+            # Falló el lote (BEGIN o commit): ninguna de sus operaciones quedó escrita
+            logger.exception("Error al confirmar un lote de la cola de escritura")
+            db.rollback()
+            failed = [future for _, _, future, _ in batch if not future.done()]
+            WRITE_QUEUE_OPERATIONS.inc(len(failed), outcome="failed")
+            for future in failed:
+                future.set_exception(e)
+            return
+        finally:
+            db.close()
+            WRITE_BATCH_SECONDS.observe(time.perf_counter() - started)
+
+        WRITE_BATCH_SIZE.observe(len(batch))
+        WRITE_QUEUE_OPERATIONS.inc(len(done), outcome="committed")
+        for future, result in done:
+            future.set_result(result)
+
+    def run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                logger.exception("Error en el hilo de la cola de escritura")
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+_write_queue: Optional[WriteQueue] = None
+
+
+def start_write_queue(max_batch_size: int = 64, max_latency: float = 0.002,
+                      max_pending: int = 10000) -> WriteQueue:
+    """
+    Inicia (una sola vez por proceso) el hilo escritor con su propio motor de una conexión.
+    """
+    global _write_queue
+    if _write_queue is None or not _write_queue.is_alive():
+        engine = writer_engine()
+        instrument_engine(engine, "writer")
+        _write_queue = WriteQueue(
+            sessionmaker(autocommit=False, autoflush=False, bind=engine),
+            max_batch_size=max_batch_size,
+            max_latency=max_latency,
+            max_pending=max_pending,
+        )
+        _write_queue.start()
+    return _write_queue
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    """
+    Cola de escritura en marcha, o None si está desactivada (WRITE_QUEUE_ENABLED) o si hay
+    un tenant activo: el hilo escritor solo escribe en la base de datos por defecto.
+    """
+    if _write_queue is not None and _write_queue.is_alive() and current_tenant() is None:
+        return _write_queue
+    return None
@@ -0,0 +1,243 @@
+# app/utils/admission.py
+"""
+Control de admisión y descarte de carga.
+
+Cada petición de los endpoints limitados pertenece a una clase (consultas puntuales, lecturas,
+escrituras, exportaciones) con su máximo de peticiones en curso y de peticiones en espera,
+y además hay un máximo global. Si no hay hueco, la petición espera en una cola acotada; al
+liberarse un hueco entra primero la de mayor prioridad (las consultas puntuales, baratas,
+antes que listados, alertas o exportaciones). Con la cola llena, o tras esperar max_wait,
+se responde 503 con Retry-After al momento en lugar de acumular hilos esperando.
+"""
+import heapq
+import itertools
+import threading
+import time
+from flask import g, jsonify, request
+from app.utils.metrics import REGISTRY
+from typing import Callable, Dict, List, Optional
+
+# Prioridad de cada clase: menor número, antes entra
+ROUTE_CLASS_PRIORITY = {"lookup": 0, "write": 1, "read": 2, "export": 3}
+
+DEFAULT_LIMITS = {"lookup": 32, "write": 8, "read": 8, "export": 2}
+DEFAULT_QUEUE_SIZES = {"lookup": 64, "write": 32, "read": 16, "export": 2}
+
+ADMISSION_REQUESTS = REGISTRY.counter(
+    "admission_requests_total", "Peticiones por clase y resultado del control de admisión",
+    ("route_class", "outcome"))
+ADMISSION_WAIT = REGISTRY.histogram(
+    "admission_wait_seconds", "Espera en cola de las peticiones admitidas", ("route_class",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+# Endpoints de productos y exportaciones por clase; el resto de peticiones no se limitan
+_LOOKUP_ENDPOINTS = {
+    "api_v1.products.get_product",
+    "api_v1.products.get_product_stock",
+    "api_v1.products.get_product_lots",
+}
+_EXPORT_ENDPOINTS = {
+    "api_v1.products.import_products",
+    "api_v1.analytics.classify_products",
+}
+
+
+def classify_request() -> Optional[str]:
+    """
+    Clase de la petición en curso (lookup, read, write o export), o None si no se limita.
+    """
+    endpoint = request.endpoint or ""
+    if endpoint.startswith("api_v1.exports.") or endpoint in _EXPORT_ENDPOINTS:
+        return "export"
+    if not endpoint.startswith("api_v1.products."):
+        return None
+    if request.method in ("GET", "HEAD"):
+        return "lookup" if endpoint in _LOOKUP_ENDPOINTS else "read"
+    return "write"
+
+
+def parse_class_values(raw: Optional[str], defaults: Dict[str, int]) -> Dict[str, int]:
+    """
+    Lee valores por clase con el formato "lookup=32,read=8"; las clases omitidas
+    conservan su valor por defecto.
+    """
+    values = dict(defaults)
+    if not raw:
+        return values
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in ROUTE_CLASS_PRIORITY or not value.strip().isdigit():
+            raise ValueError(f"Valor de admisión inválido: {item!r}")
+        values[name] = int(value)
+    return values
+
+
+class AdmissionRejected(Exception):
+    """
+    No se admitió la petición: cola llena (queue_full) o espera agotada (timeout).
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "route_class", "event", "admitted", "abandoned")
+
+    def __init__(self, priority: int, seq: int, route_class: str):
+        self.priority = priority
+        self.seq = seq
+        self.route_class = route_class
+        self.event = threading.Event()
+        self.admitted = False
+        self.abandoned = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """
+    Limitador de concurrencia por clase de ruta con cola de espera acotada y prioridades.
+    """
+
+    def __init__(self, max_concurrency: int, limits: Dict[str, int], queue_sizes: Dict[str, int],
+                 max_wait: float = 2.0):
+        self.max_concurrency = max_concurrency
+        self.limits = limits
+        self.queue_sizes = queue_sizes
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._in_flight_by_class: Dict[str, int] = {name: 0 for name in ROUTE_CLASS_PRIORITY}
+        self._queued_by_class: Dict[str, int] = {name: 0 for name in ROUTE_CLASS_PRIORITY}
+
+    def _has_room(self, route_class: str) -> bool:
+        return (self._in_flight < self.max_concurrency
+                and self._in_flight_by_class[route_class] < self.limits[route_class])
+
+    def _admit(self, route_class: str):
+        self._in_flight += 1
+        self._in_flight_by_class[route_class] += 1
+
+    def acquire(self, route_class: str):
+        """
+        Reserva un hueco para la clase, esperando en cola si hace falta.
+        Lanza AdmissionRejected si la cola de la clase está llena o se agota la espera.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            # Sin adelantar a las peticiones de la misma clase que ya esperan
+            if self._queued_by_class[route_class] == 0 and self._has_room(route_class):
+                self._admit(route_class)
+                ADMISSION_REQUESTS.inc(route_class=route_class, outcome="admitted")
+                return
+            if self._queued_by_class[route_class] >= self.queue_sizes[route_class]:
+                ADMISSION_REQUESTS.inc(route_class=route_class, outcome="rejected")
+                raise AdmissionRejected("queue_full")
+            waiter = _Waiter(ROUTE_CLASS_PRIORITY[route_class], next(self._seq), route_class)
+            heapq.heappush(self._waiters, waiter)
+            self._queued_by_class[route_class] += 1
+            ADMISSION_REQUESTS.inc(route_class=route_class, outcome="queued")
+
+        waiter.event.wait(self.max_wait)
+
+        with self._lock:
+            if not waiter.admitted:
+                waiter.abandoned = True
+                self._queued_by_class[route_class] -= 1
+                ADMISSION_REQUESTS.inc(route_class=route_class, outcome="timeout")
+                raise AdmissionRejected("timeout")
+        ADMISSION_WAIT.observe(time.perf_counter() - started, route_class=route_class)
+        ADMISSION_REQUESTS.inc(route_class=route_class, outcome="admitted")
+
+    def release(self, route_class: str):
+        """Libera el hueco de una petición terminada y da paso a las que esperan."""
+        with self._lock:
+            self._in_flight -= 1
+            self._in_flight_by_class[route_class] -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        """Admite, por orden de prioridad, a las que esperan y ya caben (con el lock tomado)."""
+        if not self._waiters:
+            return
+        remaining = []
+        while self._waiters and self._in_flight < self.max_concurrency:
+            waiter = heapq.heappop(self._waiters)
+            if waiter.abandoned:
+                continue
+            if not self._has_room(waiter.route_class):
+                # Su clase está llena: se deja en cola sin bloquear a las demás clases
+                remaining.append(waiter)
+                continue
+            self._admit(waiter.route_class)
+            self._queued_by_class[waiter.route_class] -= 1
+            waiter.admitted = True
+            waiter.event.set()
+        for waiter in remaining:
+            heapq.heappush(self._waiters, waiter)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Peticiones en curso y en espera por clase."""
+        with self._lock:
+            return {
+                name: {"in_flight": self._in_flight_by_class[name], "queued": self._queued_by_class[name]}
+                for name in ROUTE_CLASS_PRIORITY
+            }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def _controller_stats() -> Dict[tuple, float]:
+    if _controller is None:
+        return {}
+    return {
+        (name, state): value
+        for name, counts in _controller.stats().items()
+        for state, value in counts.items()
+    }
+
+
+REGISTRY.gauge("admission_requests_current", "Peticiones en curso y en espera por clase",
+               ("route_class", "state"), callback=_controller_stats)
+
+
+def setup_admission(app, controller: AdmissionController, retry_after: int = 1,
+                    classify: Callable[[], Optional[str]] = classify_request):
+    """
+    Aplica el control de admisión a las peticiones que `classify` asigna a una clase.
+    Registrar después de setup_metrics para que las esperas y los 503 cuenten en la latencia.
+    """
+    global _controller
+    _controller = controller
+
+    @app.before_request
+    def _admit_request():
+        route_class = classify()
+        if route_class is None:
+            return None
+        try:
+            controller.acquire(route_class)
+        except AdmissionRejected as e:
+            response = jsonify({
+                'error': 'Servidor saturado, reintente más tarde',
+                'reason': e.reason,
+            })
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 503
+        g.admission_class = route_class
+        return None
+
+    @app.teardown_request
+    def _release_request(exc):
+        route_class = g.pop("admission_class", None)
+        if route_class is not None:
+            controller.release(route_class)
+
+    return app
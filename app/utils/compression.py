@@ -0,0 +1,188 @@
+# app/utils/compression.py
+"""
+Compresión de respuestas negociada por Accept-Encoding (zstd, br, gzip).
+
+zstd y brotli son opcionales: si su módulo no está instalado solo se ofrece gzip.
+Las respuestas pequeñas no se comprimen (el coste de CPU no compensa) y las respuestas
+en streaming se comprimen bloque a bloque, sin acumularlas en memoria.
+"""
+import zlib
+from flask import request
+from app.utils.metrics import REGISTRY
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_RESPONSES = REGISTRY.counter(
+    "http_compressed_responses_total", "Respuestas comprimidas por codificación", ("encoding",))
+COMPRESSION_BYTES = REGISTRY.counter(
+    "http_compression_bytes_total", "Bytes de respuesta antes y después de comprimir", ("encoding", "stage"))
+
+# Tipos que merece la pena comprimir (Parquet/Arrow ya van comprimidos)
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/javascript", "application/xml",
+    "application/x-ndjson", "image/svg+xml",
+}
+
+# Bytes sin comprimir tras los que se vacía el compresor en respuestas en streaming
+STREAM_FLUSH_BYTES = 16 * 1024
+
+# Niveles moderados: buena reducción en JSON sin disparar la CPU
+_LEVELS = {"zstd": 3, "br": 4, "gzip": 5}
+
+
+def available_encodings():
+    """Codificaciones soportadas, por orden de preferencia del servidor."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings) -> str:
+    """
+    Elige la codificación según Accept-Encoding (con valores q). Ante empate manda la
+    preferencia del servidor. Devuelve None si no hay ninguna aceptable.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[token] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """Interfaz común compress/flush/finish sobre gzip, zstd y brotli."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._gzip = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "zstd":
+            self._zstd = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._brotli = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "gzip":
+            out = self._gzip.compress(data)
+            return out + self._gzip.flush(zlib.Z_SYNC_FLUSH) if flush else out
+        if self.encoding == "zstd":
+            out = self._zstd.compress(data)
+            return out + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+        out = self._brotli.process(data)
+        return out + self._brotli.flush() if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._gzip.flush(zlib.Z_FINISH)
+        if self.encoding == "zstd":
+            return self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        return self._brotli.finish()
+
+
+def _compressible(response) -> bool:
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES or mimetype.endswith("+json")
+
+
+def setup_compression(app, min_size: int = 1024, levels=None):
+    """
+    Comprime las respuestas comprimibles de al menos `min_size` bytes con la mejor
+    codificación que acepte el cliente. Añade Vary: Accept-Encoding.
+    """
+    encodings = available_encodings()
+    levels = {**_LEVELS, **(levels or {})}
+
+    @app.after_request
+    def _compress_response(response):
+        if not _compressible(response) or response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        response.vary.add("Accept-Encoding")
+
+        if (request.method == "HEAD"
+                or "Content-Encoding" in response.headers
+                or "no-transform" in (response.headers.get("Cache-Control") or "")):
+            return response
+
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""), encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            compressor = _Compressor(encoding, levels[encoding])
+            body = response.response
+
+            def stream():
+                pending = 0
+                try:
+                    for chunk in body:
+                        if isinstance(chunk, str):
+                            chunk = chunk.encode("utf-8")
+                        COMPRESSION_BYTES.inc(len(chunk), encoding=encoding, stage="original")
+                        # Vaciar el compresor cada STREAM_FLUSH_BYTES mantiene el streaming progresivo
+                        # sin perder ratio con generadores que producen bloques muy pequeños
+                        pending += len(chunk)
+                        flush = pending >= STREAM_FLUSH_BYTES
+                        if flush:
+                            pending = 0
+                        out = compressor.compress(chunk, flush=flush)
+                        COMPRESSION_BYTES.inc(len(out), encoding=encoding, stage="compressed")
+                        if out:
+                            yield out
+                    tail = compressor.finish()
+                    COMPRESSION_BYTES.inc(len(tail), encoding=encoding, stage="compressed")
+                    yield tail
+                finally:
+                    if hasattr(body, "close"):
+                        body.close()
+
+            response.response = stream()
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            compressor = _Compressor(encoding, levels[encoding])
+            compressed = compressor.compress(data) + compressor.finish()
+            response.set_data(compressed)
+            COMPRESSION_BYTES.inc(len(data), encoding=encoding, stage="original")
+            COMPRESSION_BYTES.inc(len(compressed), encoding=encoding, stage="compressed")
+
+        response.headers["Content-Encoding"] = encoding
+        COMPRESSED_RESPONSES.inc(encoding=encoding)
+
+        # La representación comprimida no es idéntica byte a byte: el ETag pasa a ser débil
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return app
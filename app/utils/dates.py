@@ -0,0 +1,9 @@
+# app/utils/dates.py
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """
+    Fecha actual en UTC sin zona horaria, tal como se almacenan las columnas DateTime simples.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,164 @@
+# app/utils/diagnostics.py
+"""
+Diagnóstico opcional de la base de datos: registro de consultas lentas con su plan
+de ejecución y detección de sentencias repetidas dentro de una petición (N+1).
+
+Todo se emite como una línea JSON por evento en el logger "app.diagnostics".
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger("app.diagnostics")
+
+_WHITESPACE = re.compile(r"\s+")
+# Listas IN (?, ?, ?) de longitud variable se consideran la misma sentencia
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+# Alias de columnas y paginación no cambian qué se consulta
+_ALIAS = re.compile(r"\s+AS\s+\w+", re.IGNORECASE)
+_PAGINATION = re.compile(r"\s+LIMIT\s+\S+(\s+OFFSET\s+\S+)?$", re.IGNORECASE)
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una sola línea."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if isinstance(record.msg, dict):
+            payload.update(record.msg)
+        else:
+            payload["message"] = record.getMessage()
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def normalize_statement(statement: str) -> str:
+    """Normaliza una sentencia para agrupar las que solo difieren en parámetros o espacios."""
+    return _IN_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def statement_fingerprint(statement: str) -> str:
+    """
+    Huella para detectar sentencias casi idénticas: además de normalizar, descarta
+    alias y LIMIT/OFFSET (p. ej. query(...).first() frente a refresh() del mismo id).
+    """
+    return _PAGINATION.sub("", _ALIAS.sub("", normalize_statement(statement)))
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Describe los parámetros por su tipo, sin exponer sus valores."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "shape": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _request_info() -> dict:
+    if not has_request_context():
+        return {}
+    return {
+        "method": request.method,
+        "route": request.url_rule.rule if request.url_rule is not None else request.path,
+    }
+
+
+def _explain(cursor, dialect_name: str, statement: str, parameters):
+    """Obtiene el plan de ejecución con un cursor DBAPI aparte (no dispara eventos del motor)."""
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters or ())
+        rows = explain_cursor.fetchall()
+    finally:
+        explain_cursor.close()
+    if dialect_name == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [" ".join(str(col) for col in row) for row in rows]
+
+
+def setup_diagnostics(app, engines, slow_query_ms: float = 100, explain: bool = True, repeat_threshold: int = 2):
+    """
+    Activa el registro de consultas lentas y la detección de sentencias repetidas
+    en los motores indicados (escritura y lectura).
+    """
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    threshold = slow_query_ms / 1000.0
+
+    # El inicio va en el contexto de la ejecución (uno por sentencia): si la sentencia falla,
+    # after_cursor_execute no llega, pero no queda nada pendiente en la conexión
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._diagnostics_start = time.perf_counter()
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_diagnostics_start", None)
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+
+        if has_request_context():
+            statements = g.get("diagnostics_statements")
+            if statements is None:
+                statements = g.diagnostics_statements = Counter()
+            statements[statement_fingerprint(statement)] += 1
+
+        if elapsed < threshold:
+            return
+
+        payload = {
+            "event": "slow_query",
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": normalize_statement(statement),
+            "params": parameter_shape(parameters, executemany),
+            "executemany": executemany,
+            **_request_info(),
+        }
+        if explain and not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            try:
+                payload["plan"] = _explain(cursor, conn.dialect.name, statement, parameters)
+            except Exception as e:
+                payload["plan_error"] = str(e)
+        logger.warning(payload)
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+    @app.after_request
+    def _report_repeated_statements(response):
+        statements = g.pop("diagnostics_statements", None)
+        if statements:
+            repeated = [
+                {"statement": statement, "count": count}
+                for statement, count in statements.most_common()
+                if count >= repeat_threshold
+            ]
+            if repeated:
+                logger.warning({
+                    "event": "repeated_statements",
+                    "total_statements": sum(statements.values()),
+                    "repeated": repeated,
+                    "status": response.status_code,
+                    **_request_info(),
+                })
+        return response
+
+    return app
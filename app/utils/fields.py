@@ -0,0 +1,46 @@
+# app/utils/fields.py
+from typing import Iterable, List, Optional
+
+
+class InvalidFields(ValueError):
+    """El parámetro fields pide campos que no existen en el recurso."""
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Interpreta el parámetro `fields` (lista separada por comas) de los fieldsets dispersos.
+    Devuelve None si no se indicó, o los campos pedidos en orden y sin duplicados.
+    """
+    if raw is None or not raw.strip():
+        return None
+
+    allowed = set(allowed)
+    fields = list(dict.fromkeys(field.strip() for field in raw.split(",") if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise InvalidFields(
+            f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(sorted(allowed))}"
+        )
+    return fields
+
+
+class InvalidFilter(ValueError):
+    """Un filtro de la consulta tiene valores que no admite."""
+
+
+def parse_choices(name: str, raw: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Interpreta un filtro de valores separados por comas (p. ej. ?abc=A,B).
+    Devuelve None si no se indicó, o los valores en mayúsculas y sin duplicados.
+    """
+    if raw is None or not raw.strip():
+        return None
+
+    allowed = list(allowed)
+    values = list(dict.fromkeys(value.strip().upper() for value in raw.split(",") if value.strip()))
+    unknown = [value for value in values if value not in allowed]
+    if unknown:
+        raise InvalidFilter(
+            f"Valores desconocidos para {name}: {', '.join(unknown)}. Disponibles: {', '.join(allowed)}"
+        )
+    return values
@@ -0,0 +1,232 @@
+# app/utils/health.py
+"""
+Comprobaciones de salud para los probes del balanceador y del orquestador.
+
+- Liveness (/health/live): el proceso atiende peticiones; no toca la base de datos.
+- Readiness (/health/ready): la base de datos responde dentro de un plazo, los pools no
+  están saturados, las colas de escritura y de trabajos tienen hueco y el esquema está en
+  la última migración. El resultado se guarda HEALTH_CACHE_TTL segundos: los probes
+  frecuentes (y los de varios balanceadores) no hacen consultas ni compiten por conexiones.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from sqlalchemy import inspect, text
+from app.utils.dates import utcnow
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "migrations")
+
+
+def _expected_heads() -> Optional[List[str]]:
+    """Revisiones head de las migraciones del código desplegado, o None si no se encuentran."""
+    from alembic.script import ScriptDirectory
+
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return None
+    return sorted(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+
+
+def _pool_usage(engine) -> Optional[Tuple[int, int]]:
+    """(conexiones en uso, capacidad) del pool, o None si el pool no tiene un límite."""
+    pool = engine.pool
+    size = getattr(pool, "size", None)
+    checkedout = getattr(pool, "checkedout", None)
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    if size is None or checkedout is None or max_overflow < 0:
+        return None
+    return checkedout(), size() + max_overflow
+
+
+class HealthChecker:
+    """
+    Ejecuta y guarda en caché las comprobaciones de readiness.
+
+    La consulta a la base de datos corre en un hilo propio con un plazo: un servidor caído o
+    una conexión bloqueada marcan la comprobación como fallida en `timeout` segundos, y
+    mientras esa consulta siga colgada las siguientes fallan sin lanzar otra. No se consulta
+    por los pools de una sola conexión (el escritor de SQLite): una transacción larga la
+    tiene ocupada sin que la base de datos falle, y solo se informa de que está en uso.
+    """
+
+    def __init__(self, engines: Iterable[Tuple[str, Any]], ttl: float = 2.0, timeout: float = 2.0,
+                 pool_max_utilization: float = 1.0, backlog_max_utilization: float = 0.9,
+                 check_migrations: bool = True):
+        # Motores por nombre, sin repetir (escritura y lectura pueden ser el mismo)
+        self.engines: Dict[str, Any] = {}
+        for name, engine in engines:
+            if all(engine is not known for known in self.engines.values()):
+                self.engines[name] = engine
+        self.ttl = ttl
+        self.timeout = timeout
+        self.pool_max_utilization = pool_max_utilization
+        self.backlog_max_utilization = backlog_max_utilization
+        self.check_migrations = check_migrations
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-check")
+        self._probe = None
+        self._lock = threading.Lock()
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._heads: Optional[List[str]] = None
+        self._heads_loaded = False
+        self._failed: List[str] = []
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """(listo, informe); el informe se reutiliza durante `ttl` segundos."""
+        with self._lock:
+            now = time.monotonic()
+            if self._cached is None or now - self._cached_at >= self.ttl:
+                self._cached = self._run_checks()
+                self._cached_at = now
+                cached = False
+            else:
+                cached = True
+        return self._cached["status"] == "ok", {**self._cached, "cached": cached}
+
+    def _run_checks(self) -> Dict[str, Any]:
+        checks = {
+            "database": self._check_database(),
+            "pools": self._check_pools(),
+            "write_queue": self._check_write_queue(),
+            "jobs": self._check_jobs(),
+        }
+        if self.check_migrations:
+            checks["migrations"] = self._check_migrations(checks["database"].pop("revisions", None))
+        failed = [name for name, check in checks.items() if check["status"] == "fail"]
+        # Solo se registran los cambios, no cada comprobación mientras dure el fallo
+        if failed != self._failed:
+            if failed:
+                logger.warning("Readiness fallida: %s", ", ".join(failed))
+            else:
+                logger.info("Readiness recuperada")
+            self._failed = failed
+        return {
+            "status": "fail" if failed else "ok",
+            "checked_at": utcnow().isoformat(),
+            "checks": checks,
+        }
+
+    # --- Base de datos ---
+
+    def _probe_engines(self) -> List[Any]:
+        """Motores que se consultan: todos salvo los de una sola conexión (si queda alguno)."""
+        engines = list(self.engines.values())
+        probed = [engine for engine in engines if (_pool_usage(engine) or (0, 0))[1] != 1]
+        return probed or engines
+
+    def _query_database(self) -> Dict[str, Any]:
+        """SELECT 1 en cada motor consultado y revisiones aplicadas en el primero."""
+        revisions = None
+        for index, engine in enumerate(self._probe_engines()):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                if index == 0 and self.check_migrations:
+                    revisions = []
+                    if inspect(connection).has_table("alembic_version"):
+                        revisions = sorted(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+        return {"revisions": revisions}
+
+    def _check_database(self) -> Dict[str, Any]:
+        if self._probe is not None and not self._probe.done():
+            return {"status": "fail", "error": "La comprobación anterior sigue sin responder"}
+        started = time.perf_counter()
+        self._probe = self._executor.submit(self._query_database)
+        try:
+            result = self._probe.result(self.timeout)
+        except FutureTimeout:
+            return {"status": "fail", "error": f"Sin respuesta en {self.timeout:g}s"}
+        except Exception as e:
+            return {"status": "fail", "error": f"{type(e).__name__}: {e}"}
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - started) * 1000, 2), **result}
+
+    def _check_pools(self) -> Dict[str, Any]:
+        """Falla si algún pool con más de una conexión las tiene todas (o casi) en uso."""
+        status = "ok"
+        engines = {}
+        for name, engine in self.engines.items():
+            usage = _pool_usage(engine)
+            if usage is None:
+                continue
+            in_use, capacity = usage
+            utilization = in_use / capacity if capacity else 0.0
+            engines[name] = {"in_use": in_use, "capacity": capacity, "utilization": round(utilization, 3)}
+            # El pool de escritura de SQLite tiene una sola conexión: que esté en uso (una
+            # importación, una clasificación) es lo normal; se informa sin fallar
+            if capacity == 1:
+                engines[name]["busy"] = in_use >= capacity
+            elif utilization >= self.pool_max_utilization:
+                status = "fail"
+        return {"status": status, "engines": engines}
+
+    # --- Colas ---
+
+    def _backlog(self, depth: int, capacity: int) -> Dict[str, Any]:
+        utilization = depth / capacity if capacity else 0.0
+        return {
+            "status": "fail" if utilization >= self.backlog_max_utilization else "ok",
+            "depth": depth,
+            "capacity": capacity,
+            "utilization": round(utilization, 3),
+        }
+
+    def _check_write_queue(self) -> Dict[str, Any]:
+        from app.services.write_queue import get_write_queue
+
+        write_queue = get_write_queue()
+        if write_queue is None:
+            return {"status": "disabled"}
+        return self._backlog(write_queue.pending(), write_queue.max_pending)
+
+    def _check_jobs(self) -> Dict[str, Any]:
+        from app.services.job_service import get_job_runner
+
+        runner = get_job_runner()
+        if runner is None:
+            return {"status": "disabled"}
+        return self._backlog(runner.pending, runner.max_workers + runner.max_pending)
+
+    # --- Migraciones ---
+
+    def _check_migrations(self, revisions: Optional[List[str]]) -> Dict[str, Any]:
+        if not self._heads_loaded:
+            try:
+                self._heads = _expected_heads()
+            except Exception:
+                logger.exception("No se pudieron leer las migraciones")
+            self._heads_loaded = True
+        if self._heads is None:
+            return {"status": "disabled"}
+        if revisions is None:
+            return {"status": "unknown", "head": self._heads}
+        if not revisions:
+            # Base de datos creada con create_all, sin tabla alembic_version: no se puede comparar
+            return {"status": "unversioned", "head": self._heads}
+        return {
+            "status": "ok" if revisions == self._heads else "fail",
+            "current": revisions,
+            "head": self._heads,
+        }
+
+
+_checker: Optional[HealthChecker] = None
+
+
+def configure_health(**options) -> HealthChecker:
+    """
+    Crea el comprobador de salud del proceso con los motores por defecto.
+    """
+    from app.db.base import engine, read_engine
+
+    global _checker
+    _checker = HealthChecker([("default", engine), ("reader", read_engine)], **options)
+    return _checker
+
+
+def get_health_checker() -> HealthChecker:
+    """Comprobador de salud del proceso (con la configuración por defecto si no se configuró)."""
+    return _checker if _checker is not None else configure_health()
@@ -0,0 +1,327 @@
+# app/utils/metrics.py
+"""
+Métricas de la aplicación en formato de texto de Prometheus.
+
+Implementación mínima sin dependencias: contadores, gauges e histogramas con
+etiquetas, protegidos por un lock que solo se toma durante la actualización.
+"""
+import bisect
+import logging
+import threading
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        # Copia bajo el lock: otro hilo puede añadir etiquetas mientras se recorre
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Valor que sube y baja; opcionalmente calculado en el momento de la lectura."""
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        if self._callback is not None:
+            try:
+                values = self._callback()
+            except Exception:
+                logger.exception("Error al calcular la métrica %s", self.name)
+                values = {}
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con cubetas fijas."""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                # [cuenta por cubeta..., +Inf, suma]
+                data = self._values[key] = [0] * (len(self.buckets) + 2)
+            data[index] += 1
+            data[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(data)) for key, data in self._values.items())
+        for key, data in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(data[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    """Conjunto de métricas expuestas en /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in list(self._metrics.values())) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP", ("method", "route"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso")
+REQUEST_DB_STATEMENTS = REGISTRY.histogram(
+    "http_request_db_statements", "Sentencias SQL ejecutadas por petición", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100))
+REQUEST_DB_TIME = REGISTRY.histogram(
+    "http_request_db_seconds", "Tiempo en la base de datos por petición", ("route",))
+DB_STATEMENTS = REGISTRY.counter(
+    "db_statements_total", "Sentencias SQL ejecutadas", ("engine",))
+DB_ERRORS = REGISTRY.counter(
+    "db_errors_total", "Errores devueltos por la base de datos", ("engine", "error"))
+DB_COMPILED_CACHE = REGISTRY.counter(
+    "db_compiled_cache_total", "Sentencias ejecutadas según la caché de SQL compilado", ("engine", "result"))
+DB_POOL_CHECKOUTS = REGISTRY.counter(
+    "db_pool_checkouts_total", "Conexiones tomadas del pool", ("engine",))
+DB_POOL_CONNECTS = REGISTRY.counter(
+    "db_pool_connections_created_total", "Conexiones nuevas abiertas por el pool", ("engine",))
+
+# Motores instrumentados, por nombre, para las métricas del pool
+_engines: Dict[str, object] = {}
+
+
+def _pool_stats() -> Dict[Tuple[str, ...], float]:
+    stats = {}
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        for stat in ("size", "checkedout", "checkedin", "overflow"):
+            getter = getattr(pool, stat, None)
+            if getter is not None:
+                stats[(name, stat)] = getter()
+    return stats
+
+
+REGISTRY.gauge("db_pool_connections", "Estado del pool de conexiones", ("engine", "state"), callback=_pool_stats)
+
+# Resultado de la caché de SQL compilado de cada ejecución (context.cache_hit)
+_CACHE_RESULTS = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+    CacheStats.CACHING_DISABLED: "disabled",
+    CacheStats.NO_CACHE_KEY: "uncacheable",
+    CacheStats.NO_DIALECT_SUPPORT: "uncacheable",
+}
+
+
+def _compiled_cache_stats() -> Dict[Tuple[str, ...], float]:
+    stats = {}
+    for name, engine in list(_engines.items()):
+        cache = getattr(engine, "_compiled_cache", None)
+        if cache is not None:
+            stats[(name, "entries")] = len(cache)
+            stats[(name, "capacity")] = cache.capacity
+    return stats
+
+
+REGISTRY.gauge("db_compiled_cache_entries", "Ocupación de la caché de SQL compilado", ("engine", "state"),
+               callback=_compiled_cache_stats)
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def instrument_engine(engine, name: str = "default"):
+    """
+    Registra los eventos del motor que alimentan las métricas de SQL y del pool.
+    """
+    if name in _engines:
+        return
+    _engines[name] = engine
+
+    # El inicio se guarda en el contexto de la sentencia: si falla, se descarta con él
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_start", None)
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        DB_STATEMENTS.inc(engine=name)
+        if context is not None and not executemany:
+            DB_COMPILED_CACHE.inc(engine=name, result=_CACHE_RESULTS.get(context.cache_hit, "uncacheable"))
+        if has_request_context():
+            g.metrics_sql_count = g.get("metrics_sql_count", 0) + 1
+            g.metrics_sql_time = g.get("metrics_sql_time", 0.0) + elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        error = type(exception_context.original_exception).__name__
+        DB_ERRORS.inc(engine=name, error=error)
+        # Los endpoints convierten los SQLAlchemyError en un 500 genérico: dejar rastro aquí
+        logger.error(
+            "Error de base de datos (%s) en %s: %s",
+            error,
+            _route() if has_request_context() else "-",
+            exception_context.original_exception,
+        )
+
+    @event.listens_for(engine.pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc(engine=name)
+
+    @event.listens_for(engine.pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.inc(engine=name)
+
+
+def setup_metrics(app, engine):
+    """
+    Configura la instrumentación por petición y el endpoint /metrics.
+    """
+    instrument_engine(engine)
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_sql_count = 0
+        g.metrics_sql_time = 0.0
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        start = g.get("metrics_start")
+        if start is not None:
+            route = _route()
+            HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
+            HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+            REQUEST_DB_STATEMENTS.observe(g.get("metrics_sql_count", 0), route=route)
+            REQUEST_DB_TIME.observe(g.get("metrics_sql_time", 0.0), route=route)
+        return response
+
+    @app.teardown_request
+    def _end_request_metrics(exc):
+        if g.pop("metrics_start", None) is not None:
+            HTTP_IN_FLIGHT.dec()
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(REGISTRY.render(), mimetype=None, content_type=CONTENT_TYPE)
+
+    return app
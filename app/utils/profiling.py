@@ -0,0 +1,156 @@
+# app/utils/profiling.py
+"""
+Perfilado en caliente de la aplicación.
+
+- Muestreo: un hilo toma las pilas de todos los hilos cada `interval` segundos con
+  sys._current_frames(); el coste no depende del número de peticiones en curso.
+  Las sesiones largas corren como trabajo en segundo plano (profile_sample).
+- Por petición: con la cabecera X-Profile y un token de administración, la petición
+  se ejecuta bajo cProfile y el resultado queda disponible por su ID.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from flask import g, request
+from app.services.job_service import register_job, JobContext
+from app.utils.security import is_admin_request
+from typing import Callable, Dict, Optional
+
+# Solo una sesión de muestreo a la vez por proceso
+_sampling_lock = threading.Lock()
+
+# Perfiles de peticiones individuales, los más recientes
+MAX_STORED_PROFILES = 20
+_request_profiles: "OrderedDict[str, str]" = OrderedDict()
+_request_profiles_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Ya hay una sesión de muestreo en curso."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float, interval: float = 0.005,
+                  check: Optional[Callable[[], None]] = None) -> Dict[str, int]:
+    """
+    Muestrea las pilas de todos los hilos durante `seconds` segundos.
+    Devuelve las pilas colapsadas (raíz;...;hoja) con su número de muestras.
+    `check` se llama en cada muestra y puede lanzar una excepción para interrumpir el muestreo.
+    """
+    if not _sampling_lock.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if check is not None:
+                check()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                stacks[";".join(reversed(labels))] += 1
+            time.sleep(interval)
+        return dict(stacks)
+    finally:
+        _sampling_lock.release()
+
+
+def collapsed_text(stacks: Dict[str, int]) -> str:
+    """Formato de pilas colapsadas compatible con flamegraph.pl y speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def top_functions(stacks: Dict[str, int], limit: int = 50) -> list:
+    """Funciones con más muestras propias (en la hoja) y totales (en cualquier nivel)."""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for label in set(frames):
+            total[label] += count
+    return [
+        {"function": label, "self_samples": own.get(label, 0), "total_samples": count}
+        for label, count in total.most_common(limit)
+    ]
+
+
+@register_job("profile_sample")
+def profile_sample_job(ctx: JobContext) -> dict:
+    """
+    Trabajo en segundo plano que muestrea las pilas del proceso que lo ejecuta (pid en el
+    resultado) y guarda las pilas colapsadas o las funciones más costosas según `format`.
+    """
+    seconds = float(ctx.params["seconds"])
+    interval_ms = float(ctx.params.get("interval_ms", 5))
+    stacks = sample_stacks(seconds, interval_ms / 1000.0, check=ctx.check_cancelled)
+    result = {"seconds": seconds, "pid": os.getpid(), "samples": sum(stacks.values())}
+    if ctx.params.get("format") == "json":
+        result["functions"] = top_functions(stacks)
+    else:
+        result["collapsed"] = collapsed_text(stacks)
+    return result
+
+
+def get_request_profile(profile_id: str) -> Optional[str]:
+    """Obtiene el informe de una petición perfilada."""
+    with _request_profiles_lock:
+        return _request_profiles.get(profile_id)
+
+
+def setup_profiling(app):
+    """
+    Permite perfilar una petición completa enviando X-Profile: 1 con un token de administración.
+    El informe se consulta en /api/v1/admin/profile/<id> (cabecera de respuesta X-Profile-Id).
+    """
+
+    @app.before_request
+    def _start_request_profile():
+        if request.headers.get("X-Profile") and is_admin_request():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Otro perfilador ya está activo en este hilo
+                return
+            g.request_profiler = profiler
+
+    @app.after_request
+    def _finish_request_profile(response):
+        profiler = g.pop("request_profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+
+        output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=output)
+        stats.sort_stats("cumulative").print_stats(50)
+
+        profile_id = uuid.uuid4().hex
+        with _request_profiles_lock:
+            _request_profiles[profile_id] = f"{request.method} {request.full_path}\n{output.getvalue()}"
+            while len(_request_profiles) > MAX_STORED_PROFILES:
+                _request_profiles.popitem(last=False)
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    return app
@@ -0,0 +1,40 @@
+# app/utils/security.py
+import hmac
+import os
+from functools import wraps
+from flask import jsonify, request
+
+
+def is_admin_request() -> bool:
+    """
+    Comprueba el token de administración (cabecera X-Admin-Token o Authorization: Bearer).
+    Sin ADMIN_TOKEN configurado, ninguna petición es de administración.
+    """
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        return False
+
+    token = request.headers.get("X-Admin-Token")
+    if token is None:
+        authorization = request.headers.get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            token = authorization[len("Bearer "):]
+    return token is not None and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def admin_required(view):
+    """
+    Decorador para endpoints que solo pueden usar los administradores.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not os.getenv("ADMIN_TOKEN"):
+            return jsonify({
+                'error': 'Endpoints de administración deshabilitados (ADMIN_TOKEN no configurado)'
+            }), 403
+        if not is_admin_request():
+            return jsonify({
+                'error': 'No autorizado'
+            }), 401
+        return view(*args, **kwargs)
+    return wrapper
@@ -17,7 +17,7 @@ def create_swagger_spec():
         "openapi": "3.0.0",
         "info": {
             "title": "Inventory Management API",
-            "description": "API para la gestión de inventario de productos",
+            "description": "API para la gestión de inventario de productos. Con TENANCY_ENABLED, cada petición indica su tenant en la cabecera X-Tenant-ID (o con el subdominio)",
             "version": "1.0.0",
             "contact": {
                 "email": "contact@example.com"
@@ -33,7 +33,47 @@ def create_swagger_spec():
             {
                 "name": "products",
                 "description": "Operaciones con productos"
-            }
+            },
+            {
+                "name": "locations",
+                "description": "Ubicaciones (almacenes) y saldos por ubicación"
+            },
+            {
+                "name": "stock",
+                "description": "Movimientos de stock"
+            },
+        {
+            "name": "reservations",
+            "description": "Reservas de stock con expiración"
+        },
+        {
+            "name": "lots",
+            "description": "Lotes con caducidad y consumo FEFO"
+        },
+        {
+            "name": "purchasing",
+            "description": "Proveedores y sugerencias de compra"
+        },
+        {
+            "name": "jobs",
+            "description": "Trabajos en segundo plano"
+        },
+        {
+            "name": "admin",
+            "description": "Administración y diagnóstico (requiere X-Admin-Token)"
+        },
+        {
+            "name": "exports",
+            "description": "Instantáneas columnares (Parquet/Arrow) para analítica"
+        },
+        {
+            "name": "analytics",
+            "description": "Analítica de inventario (clasificación ABC/XYZ)"
+        },
+        {
+            "name": "health",
+            "description": "Probes de liveness y readiness"
+        }
         ],
         "paths": {
             "/products": {
@@ -59,6 +99,30 @@ def create_swagger_spec():
                                 "default": 100
                             },
                             "description": "Número máximo de registros a retornar"
+                        },
+                        {
+                            "name": "fields",
+                            "in": "query",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "Campos a devolver separados por comas (p. ej. id,code,current_stock); solo se consultan esas columnas"
+                        },
+                        {
+                            "name": "abc",
+                            "in": "query",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "Clases ABC a incluir separadas por comas (p. ej. A,B)"
+                        },
+                        {
+                            "name": "xyz",
+                            "in": "query",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "Clases XYZ a incluir separadas por comas (p. ej. X)"
                         }
                     ],
                     "responses": {
@@ -131,6 +195,14 @@ def create_swagger_spec():
                                 "type": "integer"
                             },
                             "description": "ID del producto"
+                        },
+                        {
+                            "name": "fields",
+                            "in": "query",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "Campos a devolver separados por comas (p. ej. id,code,current_stock); solo se consultan esas columnas"
                         }
                     ],
                     "responses": {
@@ -165,6 +237,14 @@ def create_swagger_spec():
                                 "type": "integer"
                             },
                             "description": "ID del producto a actualizar"
+                        },
+                        {
+                            "name": "If-Match",
+                            "in": "header",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "ETag obtenido al leer el producto; si ya no es la versión actual se responde 412"
                         }
                     ],
                     "requestBody": {
@@ -194,6 +274,9 @@ def create_swagger_spec():
                         "404": {
                             "description": "Producto no encontrado"
                         },
+                        "412": {
+                            "description": "El producto cambió desde que se leyó (If-Match no coincide); el ETag indica la versión actual"
+                        },
                         "500": {
                             "description": "Error interno del servidor"
                         }
@@ -212,6 +295,14 @@ def create_swagger_spec():
                                 "type": "integer"
                             },
                             "description": "ID del producto a actualizar parcialmente"
+                        },
+                        {
+                            "name": "If-Match",
+                            "in": "header",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "ETag obtenido al leer el producto; si ya no es la versión actual se responde 412"
                         }
                     ],
                     "requestBody": {
@@ -261,6 +352,9 @@ def create_swagger_spec():
                         "404": {
                             "description": "Producto no encontrado"
                         },
+                        "412": {
+                            "description": "El producto cambió desde que se leyó (If-Match no coincide); el ETag indica la versión actual"
+                        },
                         "500": {
                             "description": "Error interno del servidor"
                         }
@@ -299,6 +393,32 @@ def create_swagger_spec():
                     "tags": ["products"],
                     "summary": "Obtiene productos con alerta de stock",
                     "description": "Retorna productos con stock por debajo del mínimo",
+                    "parameters": [
+                        {
+                            "name": "fields",
+                            "in": "query",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "Campos a devolver separados por comas (id, name, code, current_stock, min_stock, difference, abc_class, xyz_class)"
+                        },
+                        {
+                            "name": "abc",
+                            "in": "query",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "Clases ABC a incluir separadas por comas (p. ej. A,B)"
+                        },
+                        {
+                            "name": "xyz",
+                            "in": "query",
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "Clases XYZ a incluir separadas por comas (p. ej. X)"
+                        }
+                    ],
                     "responses": {
                         "200": {
                             "description": "Operación exitosa",
@@ -313,127 +433,2053 @@ def create_swagger_spec():
                                 }
                             }
                         },
+                        "400": {
+                            "description": "Parámetros de consulta inválidos"
+                        },
                         "500": {
                             "description": "Error interno del servidor"
                         }
                     }
                 }
-            }
-        },
-        "components": {
-            "schemas": {
-                "ProductBase": {
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "Nombre del producto",
-                            "maxLength": 100
-                        },
-                        "code": {
-                            "type": "string",
-                            "description": "Código único del producto",
-                            "maxLength": 50
-                        },
-                        "current_stock": {
-                            "type": "number",
-                            "format": "float",
-                            "description": "Stock actual del producto",
-                            "minimum": 0
+            },
+            "/products/{product_id}/stock": {
+                "get": {
+                    "tags": ["stock"],
+                    "summary": "Obtiene el stock de un producto por ubicación",
+                    "description": "Retorna el stock agregado del producto y su saldo en cada ubicación",
+                    "parameters": [
+                        {
+                            "name": "product_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID del producto"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
                         },
-                        "min_stock": {
-                            "type": "number",
-                            "format": "float",
-                            "description": "Stock mínimo del producto",
-                            "minimum": 0
+                        "404": {
+                            "description": "Producto no encontrado"
                         }
-                    },
-                    "required": ["name", "code", "current_stock", "min_stock"]
-                },
-                "ProductCreate": {
-                    "$ref": "#/components/schemas/ProductBase"
+                    }
+                }
+            },
+            "/locations": {
+                "get": {
+                    "tags": ["locations"],
+                    "summary": "Obtiene lista de ubicaciones",
+                    "description": "Retorna una lista paginada de ubicaciones (almacenes)",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
                 },
-                "ProductUpdate": {
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "Nombre del producto",
-                            "maxLength": 100
-                        },
-                        "current_stock": {
-                            "type": "number",
-                            "format": "float",
-                            "description": "Stock actual del producto",
-                            "minimum": 0
+                "post": {
+                    "tags": ["locations"],
+                    "summary": "Crea una nueva ubicación",
+                    "description": "Crea una nueva ubicación de stock",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/LocationCreate"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Ubicación creada exitosamente"
                         },
-                        "min_stock": {
-                            "type": "number",
-                            "format": "float",
-                            "description": "Stock mínimo del producto",
-                            "minimum": 0
+                        "400": {
+                            "description": "Datos inválidos"
                         }
                     }
-                },
-                "Product": {
-                    "allOf": [
+                }
+            },
+            "/locations/{location_id}/stock": {
+                "get": {
+                    "tags": ["locations"],
+                    "summary": "Obtiene los saldos de una ubicación",
+                    "description": "Retorna una lista paginada de saldos de productos en la ubicación",
+                    "parameters": [
                         {
-                            "$ref": "#/components/schemas/ProductBase"
+                            "name": "location_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID de la ubicación"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
                         },
+                        "404": {
+                            "description": "Ubicación no encontrada"
+                        }
+                    }
+                }
+            },
+            "/locations/alerts": {
+                "get": {
+                    "tags": ["locations"],
+                    "summary": "Obtiene alertas de stock de todas las ubicaciones",
+                    "description": "Retorna los saldos por debajo del mínimo de su ubicación",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
+                }
+            },
+            "/locations/{location_id}/alerts": {
+                "get": {
+                    "tags": ["locations"],
+                    "summary": "Obtiene alertas de stock de una ubicación",
+                    "description": "Retorna los saldos de la ubicación por debajo del mínimo",
+                    "parameters": [
                         {
-                            "type": "object",
-                            "properties": {
-                                "id": {
-                                    "type": "integer",
-                                    "description": "ID único del producto"
-                                },
-                                "created_at": {
-                                    "type": "string",
-                                    "format": "date-time",
-                                    "description": "Fecha de creación"
-                                },
-                                "updated_at": {
-                                    "type": "string",
-                                    "format": "date-time",
-                                    "description": "Fecha de última actualización",
-                                    "nullable": True
+                            "name": "location_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID de la ubicación"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        },
+                        "404": {
+                            "description": "Ubicación no encontrada"
+                        }
+                    }
+                }
+            },
+            "/stock/movements": {
+                "get": {
+                    "tags": ["stock"],
+                    "summary": "Obtiene movimientos de stock",
+                    "description": "Retorna los movimientos más recientes, filtrables por product_id y location_id",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
+                },
+                "post": {
+                    "tags": ["stock"],
+                    "summary": "Registra un movimiento de stock",
+                    "description": "Entrada (solo destino), salida (solo origen) o transferencia (origen y destino). En productos con lotes, una salida consume los lotes de la ubicación en orden FEFO y las entradas y transferencias se rechazan. Con WRITE_QUEUE_ENABLED se confirma en lote (group commit) con otras escrituras concurrentes",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/StockMovementCreate"
                                 }
                             }
                         }
-                    ]
-                },
-                "AlertProduct": {
-                    "type": "object",
-                    "properties": {
-                        "id": {
-                            "type": "integer",
-                            "description": "ID único del producto"
-                        },
-                        "name": {
-                            "type": "string",
-                            "description": "Nombre del producto"
-                        },
-                        "code": {
-                            "type": "string",
-                            "description": "Código del producto"
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Movimiento registrado"
                         },
-                        "current_stock": {
-                            "type": "number",
-                            "format": "float",
-                            "description": "Stock actual del producto"
+                        "400": {
+                            "description": "Datos inválidos o stock insuficiente"
                         },
-                        "min_stock": {
-                            "type": "number",
-                            "format": "float",
-                            "description": "Stock mínimo del producto"
+                        "202": {
+                            "description": "Sin confirmar en WRITE_QUEUE_TIMEOUT y ya en ejecución: puede confirmarse todavía; consultar la URL de Location antes de repetirlo"
                         },
-                        "difference": {
+                        "503": {
+                            "description": "Cola de escritura llena o cancelado sin aplicarse al vencer el plazo; reintentar tras Retry-After"
+                        }
+                    }
+                }
+            },
+            "/reservations": {
+                "get": {
+                    "tags": [
+                        "reservations"
+                    ],
+                    "summary": "Obtiene lista de reservas",
+                    "description": "Retorna las reservas más recientes, filtrables por product_id y status",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
+                },
+                "post": {
+                    "tags": [
+                        "reservations"
+                    ],
+                    "summary": "Crea una reserva",
+                    "description": "Reserva stock disponible de un producto durante ttl_seconds",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/ReservationCreate"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Reserva creada"
+                        },
+                        "400": {
+                            "description": "Datos inválidos o stock disponible insuficiente"
+                        }
+                    }
+                }
+            },
+            "/reservations/{reservation_id}": {
+                "get": {
+                    "tags": [
+                        "reservations"
+                    ],
+                    "summary": "Obtiene una reserva por su ID",
+                    "parameters": [
+                        {
+                            "name": "reservation_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID de la reserva"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        },
+                        "404": {
+                            "description": "Reserva no encontrada"
+                        }
+                    }
+                }
+            },
+            "/reservations/{reservation_id}/release": {
+                "post": {
+                    "tags": [
+                        "reservations"
+                    ],
+                    "summary": "Libera una reserva",
+                    "description": "Devuelve la cantidad reservada al stock disponible",
+                    "parameters": [
+                        {
+                            "name": "reservation_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID de la reserva"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Reserva liberada"
+                        },
+                        "404": {
+                            "description": "Reserva no encontrada"
+                        },
+                        "409": {
+                            "description": "La reserva no está activa"
+                        }
+                    }
+                }
+            },
+            "/reservations/{reservation_id}/commit": {
+                "post": {
+                    "tags": [
+                        "reservations"
+                    ],
+                    "summary": "Confirma una reserva",
+                    "description": "Descuenta la cantidad reservada del stock actual y del saldo de la ubicación indicada (location_id, obligatoria si el producto tiene saldos por ubicación)",
+                    "parameters": [
+                        {
+                            "name": "reservation_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID de la reserva"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Reserva confirmada"
+                        },
+                        "404": {
+                            "description": "Reserva no encontrada"
+                        },
+                        "409": {
+                            "description": "La reserva no está activa, falta location_id o no hay stock en la ubicación"
+                        }
+                    }
+                }
+            },
+            "/products/{product_id}/lots": {
+                "get": {
+                    "tags": [
+                        "lots"
+                    ],
+                    "summary": "Obtiene los lotes de un producto",
+                    "description": "Retorna los lotes con existencias en orden FEFO",
+                    "parameters": [
+                        {
+                            "name": "product_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID del producto"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        },
+                        "404": {
+                            "description": "Producto no encontrado"
+                        }
+                    }
+                },
+                "post": {
+                    "tags": [
+                        "lots"
+                    ],
+                    "summary": "Registra un lote",
+                    "description": "Recibe un lote en una ubicación y suma su cantidad al saldo de la ubicación y al stock del producto",
+                    "parameters": [
+                        {
+                            "name": "product_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID del producto"
+                        }
+                    ],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/LotCreate"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Lote registrado"
+                        },
+                        "400": {
+                            "description": "Datos inválidos"
+                        }
+                    }
+                }
+            },
+            "/products/{product_id}/lots/consume": {
+                "post": {
+                    "tags": [
+                        "lots"
+                    ],
+                    "summary": "Consume stock en orden FEFO",
+                    "description": "Descuenta la cantidad de los lotes vigentes de la ubicación que caducan antes, del saldo de la ubicación y del stock del producto (sin tocar lo reservado) y retorna las asignaciones por lote",
+                    "parameters": [
+                        {
+                            "name": "product_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID del producto"
+                        }
+                    ],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "quantity": {
+                                            "type": "number",
+                                            "format": "float",
+                                            "minimum": 0
+                                        },
+                                        "location_id": {
+                                            "type": "integer"
+                                        },
+                                        "reference": {
+                                            "type": "string",
+                                            "nullable": True
+                                        }
+                                    },
+                                    "required": [
+                                        "quantity",
+                                        "location_id"
+                                    ]
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Consumo aplicado"
+                        },
+                        "400": {
+                            "description": "Datos inválidos o stock insuficiente en lotes"
+                        },
+                        "404": {
+                            "description": "Producto no encontrado"
+                        }
+                    }
+                }
+            },
+            "/lots/expiring": {
+                "get": {
+                    "tags": [
+                        "lots"
+                    ],
+                    "summary": "Obtiene lotes por caducar",
+                    "description": "Retorna los lotes con existencias de todo el catálogo que caducan en los próximos días",
+                    "parameters": [
+                        {
+                            "name": "days",
+                            "in": "query",
+                            "schema": {
+                                "type": "integer",
+                                "default": 30
+                            },
+                            "description": "Horizonte en días"
+                        },
+                        {
+                            "name": "include_expired",
+                            "in": "query",
+                            "schema": {
+                                "type": "boolean",
+                                "default": False
+                            },
+                            "description": "Incluir lotes ya caducados"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
+                }
+            },
+            "/suppliers": {
+                "get": {
+                    "tags": [
+                        "purchasing"
+                    ],
+                    "summary": "Obtiene lista de proveedores",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
+                },
+                "post": {
+                    "tags": [
+                        "purchasing"
+                    ],
+                    "summary": "Crea un proveedor",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "code": {
+                                            "type": "string",
+                                            "maxLength": 50
+                                        },
+                                        "name": {
+                                            "type": "string",
+                                            "maxLength": 100
+                                        }
+                                    },
+                                    "required": [
+                                        "code",
+                                        "name"
+                                    ]
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Proveedor creado"
+                        },
+                        "400": {
+                            "description": "Datos inválidos"
+                        }
+                    }
+                }
+            },
+            "/purchase-suggestions": {
+                "post": {
+                    "tags": [
+                        "purchasing"
+                    ],
+                    "summary": "Genera órdenes de compra sugeridas",
+                    "description": "Calcula en un solo INSERT ... SELECT las cantidades a pedir de todos los productos en alerta, aplicando pedido mínimo y múltiplo, y las agrupa por proveedor",
+                    "parameters": [
+                        {
+                            "name": "async",
+                            "in": "query",
+                            "schema": {
+                                "type": "boolean",
+                                "default": False
+                            },
+                            "description": "Encolar como trabajo en segundo plano y responder 202"
+                        }
+                    ],
+                    "requestBody": {
+                        "required": False,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "use_available": {
+                                            "type": "boolean",
+                                            "default": True,
+                                            "description": "Usar el disponible (actual menos reservado) como stock proyectado"
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Lote de sugerencias generado"
+                        },
+                        "500": {
+                            "description": "Error interno del servidor"
+                        }
+                    }
+                }
+            },
+            "/purchase-suggestions/{batch_id}": {
+                "get": {
+                    "tags": [
+                        "purchasing"
+                    ],
+                    "summary": "Obtiene un lote de sugerencias",
+                    "description": "Retorna el resumen por proveedor del lote",
+                    "parameters": [
+                        {
+                            "name": "batch_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID del lote de sugerencias"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        },
+                        "404": {
+                            "description": "Lote no encontrado"
+                        }
+                    }
+                }
+            },
+            "/purchase-suggestions/{batch_id}/lines": {
+                "get": {
+                    "tags": [
+                        "purchasing"
+                    ],
+                    "summary": "Obtiene las líneas de un lote",
+                    "parameters": [
+                        {
+                            "name": "batch_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID del lote de sugerencias"
+                        },
+                        {
+                            "name": "supplier_id",
+                            "in": "query",
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "Filtrar por proveedor"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        },
+                        "404": {
+                            "description": "Lote no encontrado"
+                        }
+                    }
+                }
+            },
+            "/jobs": {
+                "get": {
+                    "tags": [
+                        "jobs"
+                    ],
+                    "summary": "Obtiene lista de trabajos",
+                    "description": "Retorna los trabajos más recientes, filtrables por status",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
+                },
+                "post": {
+                    "tags": [
+                        "jobs"
+                    ],
+                    "summary": "Encola un trabajo",
+                    "description": "Encola un trabajo registrado (ver /jobs/types) y retorna 202 con la URL para consultar su progreso",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "type": {
+                                            "type": "string"
+                                        },
+                                        "params": {
+                                            "type": "object"
+                                        }
+                                    },
+                                    "required": [
+                                        "type"
+                                    ]
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "202": {
+                            "description": "Trabajo encolado"
+                        },
+                        "400": {
+                            "description": "Datos inválidos o tipo desconocido"
+                        },
+                        "503": {
+                            "description": "Cola de trabajos llena"
+                        }
+                    }
+                }
+            },
+            "/jobs/types": {
+                "get": {
+                    "tags": [
+                        "jobs"
+                    ],
+                    "summary": "Obtiene los tipos de trabajo registrados",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        }
+                    }
+                }
+            },
+            "/jobs/{job_id}": {
+                "get": {
+                    "tags": [
+                        "jobs"
+                    ],
+                    "summary": "Obtiene el estado de un trabajo",
+                    "description": "Retorna estado, progreso (0 a 1) y resultado del trabajo",
+                    "parameters": [
+                        {
+                            "name": "job_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "ID del trabajo"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa"
+                        },
+                        "404": {
+                            "description": "Trabajo no encontrado"
+                        }
+                    }
+                }
+            },
+            "/jobs/{job_id}/cancel": {
+                "post": {
+                    "tags": [
+                        "jobs"
+                    ],
+                    "summary": "Cancela un trabajo",
+                    "parameters": [
+                        {
+                            "name": "job_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "ID del trabajo"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Cancelación solicitada"
+                        },
+                        "404": {
+                            "description": "Trabajo no encontrado"
+                        }
+                    }
+                }
+            },
+            "/admin/profile": {
+                "get": {
+                    "tags": [
+                        "admin"
+                    ],
+                    "summary": "Muestrear las pilas del proceso (perfilado en caliente)",
+                    "description": "Hasta 10 s responde en la propia petición. Con async=true (hasta 300 s) se encola como trabajo profile_sample y responde 202; el resultado del trabajo trae las pilas colapsadas (collapsed) o las funciones (functions) y el pid del proceso muestreado",
+                    "parameters": [
+                        {
+                            "name": "X-Admin-Token",
+                            "in": "header",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            }
+                        },
+                        {
+                            "name": "seconds",
+                            "in": "query",
+                            "schema": {
+                                "type": "number",
+                                "default": 10,
+                                "maximum": 300
+                            },
+                            "description": "Segundos de muestreo (más de 10 requiere async=true)"
+                        },
+                        {
+                            "name": "async",
+                            "in": "query",
+                            "schema": {
+                                "type": "boolean",
+                                "default": False
+                            },
+                            "description": "Muestrear en un trabajo en segundo plano"
+                        },
+                        {
+                            "name": "interval_ms",
+                            "in": "query",
+                            "schema": {
+                                "type": "number",
+                                "default": 5
+                            }
+                        },
+                        {
+                            "name": "format",
+                            "in": "query",
+                            "schema": {
+                                "type": "string",
+                                "enum": [
+                                    "collapsed",
+                                    "json"
+                                ],
+                                "default": "collapsed"
+                            }
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Pilas colapsadas (text/plain) o funciones más costosas (JSON)"
+                        },
+                        "202": {
+                            "description": "Perfilado encolado como trabajo (cabecera Location)"
+                        },
+                        "400": {
+                            "description": "Parámetros inválidos"
+                        },
+                        "401": {
+                            "description": "No autorizado"
+                        },
+                        "403": {
+                            "description": "Administración deshabilitada"
+                        },
+                        "409": {
+                            "description": "Ya hay un perfilado en curso"
+                        }
+                    }
+                }
+            },
+            "/admin/profile/{profile_id}": {
+                "get": {
+                    "tags": [
+                        "admin"
+                    ],
+                    "summary": "Obtener el informe cProfile de una petición enviada con X-Profile",
+                    "parameters": [
+                        {
+                            "name": "X-Admin-Token",
+                            "in": "header",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            }
+                        },
+                        {
+                            "name": "profile_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            }
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Informe pstats (text/plain)"
+                        },
+                        "404": {
+                            "description": "Perfil no encontrado"
+                        }
+                    }
+                }
+            },
+            "/products/import": {
+                "post": {
+                    "tags": [
+                        "products"
+                    ],
+                    "summary": "Importar productos desde CSV o Excel (alta o actualización por código)",
+                    "description": "Un código existente solo se actualiza en las columnas que trae el fichero (basta el código y, p. ej., el precio); las celdas vacías conservan el valor actual. Las filas de un mismo código se unen y gana la última. Con async=true, o si el fichero supera IMPORT_ASYNC_MIN_BYTES, se importa como trabajo product_import",
+                    "parameters": [
+                        {
+                            "name": "format",
+                            "in": "query",
+                            "schema": {
+                                "type": "string",
+                                "enum": [
+                                    "csv",
+                                    "xlsx"
+                                ]
+                            },
+                            "description": "Por defecto, según la extensión o el Content-Type"
+                        },
+                        {
+                            "name": "dry_run",
+                            "in": "query",
+                            "schema": {
+                                "type": "boolean",
+                                "default": False
+                            },
+                            "description": "Solo validar, sin escribir"
+                        },
+                        {
+                            "name": "async",
+                            "in": "query",
+                            "schema": {
+                                "type": "boolean"
+                            },
+                            "description": "Importar como trabajo en segundo plano (por defecto, según IMPORT_ASYNC_MIN_BYTES)"
+                        }
+                    ],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "multipart/form-data": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "file": {
+                                            "type": "string",
+                                            "format": "binary"
+                                        }
+                                    }
+                                }
+                            },
+                            "text/csv": {
+                                "schema": {
+                                    "type": "string"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Informe de importación con los errores por fila",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/ImportReport"
+                                    }
+                                }
+                            }
+                        },
+                        "202": {
+                            "description": "Importación encolada; el informe queda en el resultado del trabajo (cabecera Location)"
+                        },
+                        "400": {
+                            "description": "Fichero inválido o formato no soportado"
+                        },
+                        "500": {
+                            "description": "Error al importar productos"
+                        }
+                    }
+                }
+            },
+            "/exports": {
+                "post": {
+                    "tags": [
+                        "exports"
+                    ],
+                    "summary": "Generar una instantánea de productos y movimientos de stock",
+                    "parameters": [
+                        {
+                            "name": "format",
+                            "in": "query",
+                            "schema": {
+                                "type": "string",
+                                "enum": [
+                                    "parquet",
+                                    "arrow"
+                                ],
+                                "default": "parquet"
+                            }
+                        },
+                        {
+                            "name": "async",
+                            "in": "query",
+                            "schema": {
+                                "type": "boolean",
+                                "default": False
+                            }
+                        }
+                    ],
+                    "responses": {
+                        "201": {
+                            "description": "Manifiesto de la instantánea",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/ExportManifest"
+                                    }
+                                }
+                            }
+                        },
+                        "202": {
+                            "description": "Trabajo encolado"
+                        },
+                        "400": {
+                            "description": "Formato no soportado"
+                        },
+                        "503": {
+                            "description": "pyarrow no disponible"
+                        }
+                    }
+                },
+                "get": {
+                    "tags": [
+                        "exports"
+                    ],
+                    "summary": "Listar instantáneas",
+                    "responses": {
+                        "200": {
+                            "description": "Manifiestos, del más reciente al más antiguo",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "array",
+                                        "items": {
+                                            "$ref": "#/components/schemas/ExportManifest"
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+            "/exports/{snapshot_id}": {
+                "get": {
+                    "tags": [
+                        "exports"
+                    ],
+                    "summary": "Obtener el manifiesto de una instantánea",
+                    "parameters": [
+                        {
+                            "name": "snapshot_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "ID de la instantánea o 'latest'"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Manifiesto",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/ExportManifest"
+                                    }
+                                }
+                            }
+                        },
+                        "404": {
+                            "description": "Exportación no encontrada"
+                        }
+                    }
+                }
+            },
+            "/exports/{snapshot_id}/{table_name}": {
+                "get": {
+                    "tags": [
+                        "exports"
+                    ],
+                    "summary": "Descargar el fichero de una tabla",
+                    "parameters": [
+                        {
+                            "name": "snapshot_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            },
+                            "description": "ID de la instantánea o 'latest'"
+                        },
+                        {
+                            "name": "table_name",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "string",
+                                "enum": [
+                                    "products",
+                                    "stock_movements"
+                                ]
+                            }
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Fichero Parquet o Arrow IPC"
+                        },
+                        "404": {
+                            "description": "Exportación no encontrada"
+                        }
+                    }
+                }
+            },
+            "/products/bulk": {
+                "patch": {
+                    "tags": [
+                        "products"
+                    ],
+                    "summary": "Actualizar en bloque productos seleccionados por ids, codes o filter",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/ProductBulkUpdate"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Productos afectados",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/ProductBulkResult"
+                                    }
+                                }
+                            }
+                        },
+                        "400": {
+                            "description": "Selección o datos inválidos"
+                        },
+                        "500": {
+                            "description": "Error al actualizar los productos"
+                        }
+                    }
+                },
+                "delete": {
+                    "tags": [
+                        "products"
+                    ],
+                    "summary": "Eliminar en bloque productos seleccionados por ids, codes o filter",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/ProductBulkDelete"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Productos afectados",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/ProductBulkResult"
+                                    }
+                                }
+                            }
+                        },
+                        "400": {
+                            "description": "Selección o datos inválidos"
+                        },
+                        "500": {
+                            "description": "Error al eliminar los productos"
+                        }
+                    }
+                }
+            },
+            "/products/{product_id}/stock/adjust": {
+                "post": {
+                    "tags": [
+                        "stock"
+                    ],
+                    "summary": "Ajusta el stock de un producto",
+                    "description": "Suma (o resta, con delta negativo) stock al producto sin consumir el stock reservado. Los productos con saldos por ubicación se rechazan (su stock cambia con POST /stock/movements). Con INVENTORY_STATE_ENABLED se aplica en el estado en memoria y su log",
+                    "parameters": [
+                        {
+                            "name": "product_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID del producto"
+                        }
+                    ],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/StockAdjustment"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Stock ajustado",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/Product"
+                                    }
+                                }
+                            }
+                        },
+                        "400": {
+                            "description": "Datos inválidos o stock insuficiente"
+                        },
+                        "404": {
+                            "description": "Producto no encontrado"
+                        }
+                    }
+                }
+            },
+            "/analytics/classification": {
+                "post": {
+                    "tags": [
+                        "analytics"
+                    ],
+                    "summary": "Clasifica el catálogo (ABC/XYZ)",
+                    "description": "Calcula en un solo UPDATE ... FROM la clase ABC (valor de consumo acumulado) y XYZ (coeficiente de variación de la demanda por periodo) de todos los productos a partir de las salidas de stock",
+                    "parameters": [
+                        {
+                            "name": "async",
+                            "in": "query",
+                            "schema": {
+                                "type": "boolean",
+                                "default": False
+                            },
+                            "description": "Encolar como trabajo en segundo plano y responder 202"
+                        }
+                    ],
+                    "requestBody": {
+                        "required": False,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/ClassificationRequest"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Clasificación aplicada",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/ClassificationResult"
+                                    }
+                                }
+                            }
+                        },
+                        "202": {
+                            "description": "Trabajo encolado"
+                        },
+                        "400": {
+                            "description": "Parámetros inválidos"
+                        },
+                        "500": {
+                            "description": "Error interno del servidor"
+                        }
+                    }
+                },
+                "get": {
+                    "tags": [
+                        "analytics"
+                    ],
+                    "summary": "Resumen de la clasificación",
+                    "description": "Retorna cuántos productos hay en cada combinación de clases (\"-\" sin clasificar)",
+                    "responses": {
+                        "200": {
+                            "description": "Operación exitosa",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/ClassificationResult"
+                                    }
+                                }
+                            }
+                        },
+                        "500": {
+                            "description": "Error interno del servidor"
+                        }
+                    }
+                }
+            },
+            "/admin/alerts/digest": {
+                "post": {
+                    "tags": [
+                        "admin"
+                    ],
+                    "summary": "Adelantar el próximo resumen de alertas de stock",
+                    "description": "Con ALERT_DISPATCHER_ENABLED, el despachador envía cada ALERT_DIGEST_INTERVAL un resumen de los productos que entraron o salieron de la alerta a cada destinatario de ALERT_RECIPIENTS (mailto: por SMTP, http(s): por webhook con el resumen en JSON). Este endpoint adelanta el envío",
+                    "parameters": [
+                        {
+                            "name": "X-Admin-Token",
+                            "in": "header",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            }
+                        }
+                    ],
+                    "responses": {
+                        "202": {
+                            "description": "Resumen solicitado"
+                        },
+                        "503": {
+                            "description": "El despachador de alertas no está activo"
+                        }
+                    }
+                }
+            },
+            "/health/live": {
+                "get": {
+                    "tags": [
+                        "health"
+                    ],
+                    "summary": "Liveness",
+                    "description": "El proceso atiende peticiones; no consulta la base de datos",
+                    "responses": {
+                        "200": {
+                            "description": "Proceso vivo"
+                        }
+                    }
+                }
+            },
+            "/health/ready": {
+                "get": {
+                    "tags": [
+                        "health"
+                    ],
+                    "summary": "Readiness",
+                    "description": "Comprueba la base de datos (SELECT 1 con plazo HEALTH_DB_TIMEOUT, sin ocupar la conexión única del escritor de SQLite), la ocupación de los pools (el escritor ocupado se informa con busy, sin fallar), las colas de escritura y de trabajos y que el esquema esté en la última migración. El resultado se reutiliza HEALTH_CACHE_TTL segundos (campo cached)",
+                    "responses": {
+                        "200": {
+                            "description": "Listo para recibir tráfico"
+                        },
+                        "503": {
+                            "description": "Alguna comprobación falló (detalle en checks)"
+                        }
+                    }
+                }
+            },
+            "/stock/movements/queued/{operation_id}": {
+                "get": {
+                    "tags": [
+                        "stock"
+                    ],
+                    "summary": "Consulta un movimiento sin confirmar a tiempo",
+                    "description": "Resultado de un movimiento que respondió 202 (la cola de escritura ya lo había tomado al vencer el plazo). Solo lo conoce el proceso que recibió el movimiento",
+                    "parameters": [
+                        {
+                            "name": "operation_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "string"
+                            }
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Terminado: status committed (con el movimiento) o failed (con el error)"
+                        },
+                        "202": {
+                            "description": "Sigue en curso"
+                        },
+                        "404": {
+                            "description": "Operación no encontrada"
+                        }
+                    }
+                }
+            },
+            "/locations/{location_id}/opening-balances": {
+                "post": {
+                    "tags": [
+                        "locations"
+                    ],
+                    "summary": "Registra saldos iniciales en una ubicación",
+                    "description": "Pasa a la ubicación el stock de los productos que aún no tienen saldos por ubicación (movimiento 'opening'). Desde entonces su current_stock es la suma de los saldos y solo cambia con movimientos. Sin product_ids se abren todos los productos sin saldos.",
+                    "parameters": [
+                        {
+                            "name": "location_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {
+                                "type": "integer"
+                            },
+                            "description": "ID de la ubicación"
+                        }
+                    ],
+                    "requestBody": {
+                        "required": False,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/OpeningBalanceCreate"
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Saldos registrados",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/OpeningBalanceResult"
+                                    }
+                                }
+                            }
+                        },
+                        "400": {
+                            "description": "Datos inválidos o producto que ya tiene saldos"
+                        },
+                        "404": {
+                            "description": "Ubicación no encontrada"
+                        }
+                    }
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "ProductBase": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Nombre del producto",
+                            "maxLength": 100
+                        },
+                        "code": {
+                            "type": "string",
+                            "description": "Código único del producto",
+                            "maxLength": 50
+                        },
+                        "current_stock": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Stock actual del producto",
+                            "minimum": 0
+                        },
+                        "min_stock": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Stock mínimo del producto",
+                            "minimum": 0
+                        },
+                        "supplier_id": {
+                            "type": "integer",
+                            "description": "Proveedor habitual del producto",
+                            "nullable": True
+                        },
+                        "unit_cost": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Costo unitario de compra",
+                            "minimum": 0
+                        },
+                        "lot_size": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Múltiplo de pedido al proveedor",
+                            "minimum": 0
+                        },
+                        "min_order_qty": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Cantidad mínima de pedido",
+                            "minimum": 0
+                        }
+                    },
+                    "required": ["name", "code", "current_stock", "min_stock"]
+                },
+                "ProductCreate": {
+                    "$ref": "#/components/schemas/ProductBase"
+                },
+                "ProductUpdate": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Nombre del producto",
+                            "maxLength": 100
+                        },
+                        "current_stock": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Stock actual del producto",
+                            "minimum": 0
+                        },
+                        "min_stock": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Stock mínimo del producto",
+                            "minimum": 0
+                        },
+                        "supplier_id": {
+                            "type": "integer",
+                            "description": "Proveedor habitual del producto",
+                            "nullable": True
+                        },
+                        "unit_cost": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Costo unitario de compra",
+                            "minimum": 0
+                        },
+                        "lot_size": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Múltiplo de pedido al proveedor",
+                            "minimum": 0
+                        },
+                        "min_order_qty": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Cantidad mínima de pedido",
+                            "minimum": 0
+                        }
+                    }
+                },
+                "Product": {
+                    "allOf": [
+                        {
+                            "$ref": "#/components/schemas/ProductBase"
+                        },
+                        {
+                            "type": "object",
+                            "properties": {
+                                "id": {
+                                    "type": "integer",
+                                    "description": "ID único del producto"
+                                },
+                                "reserved_stock": {
+                                    "type": "number",
+                                    "format": "float",
+                                    "description": "Stock reservado por reservas activas"
+                                },
+                                "available_stock": {
+                                    "type": "number",
+                                    "format": "float",
+                                    "description": "Stock disponible (actual menos reservado)"
+                                },
+                                "abc_class": {
+                                    "type": "string",
+                                    "enum": ["A", "B", "C"],
+                                    "description": "Clase ABC por valor de consumo",
+                                    "nullable": True
+                                },
+                                "xyz_class": {
+                                    "type": "string",
+                                    "enum": ["X", "Y", "Z"],
+                                    "description": "Clase XYZ por variabilidad de la demanda",
+                                    "nullable": True
+                                },
+                                "version": {
+                                    "type": "integer",
+                                    "description": "Versión de la fila; se devuelve también como ETag"
+                                },
+                                "created_at": {
+                                    "type": "string",
+                                    "format": "date-time",
+                                    "description": "Fecha de creación"
+                                },
+                                "updated_at": {
+                                    "type": "string",
+                                    "format": "date-time",
+                                    "description": "Fecha de última actualización",
+                                    "nullable": True
+                                }
+                            }
+                        }
+                    ]
+                },
+                "AlertProduct": {
+                    "type": "object",
+                    "properties": {
+                        "id": {
+                            "type": "integer",
+                            "description": "ID único del producto"
+                        },
+                        "name": {
+                            "type": "string",
+                            "description": "Nombre del producto"
+                        },
+                        "code": {
+                            "type": "string",
+                            "description": "Código del producto"
+                        },
+                        "current_stock": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Stock actual del producto"
+                        },
+                        "min_stock": {
+                            "type": "number",
+                            "format": "float",
+                            "description": "Stock mínimo del producto"
+                        },
+                        "difference": {
                             "type": "number",
                             "format": "float",
                             "description": "Diferencia entre stock mínimo y actual"
+                        },
+                        "abc_class": {
+                            "type": "string",
+                            "enum": ["A", "B", "C"],
+                            "description": "Clase ABC por valor de consumo",
+                            "nullable": True
+                        },
+                        "xyz_class": {
+                            "type": "string",
+                            "enum": ["X", "Y", "Z"],
+                            "description": "Clase XYZ por variabilidad de la demanda",
+                            "nullable": True
                         }
                     },
                     "required": ["id", "name", "code", "current_stock", "min_stock", "difference"]
+                },
+                "LocationCreate": {
+                    "type": "object",
+                    "properties": {
+                        "code": {
+                            "type": "string",
+                            "description": "Código único de la ubicación",
+                            "maxLength": 50
+                        },
+                        "name": {
+                            "type": "string",
+                            "description": "Nombre de la ubicación",
+                            "maxLength": 100
+                        }
+                    },
+                    "required": ["code", "name"]
+                },
+                "StockMovementCreate": {
+                    "type": "object",
+                    "properties": {
+                        "product_id": {
+                            "type": "integer"
+                        },
+                        "quantity": {
+                            "type": "number",
+                            "format": "float",
+                            "minimum": 0
+                        },
+                        "from_location_id": {
+                            "type": "integer",
+                            "nullable": True
+                        },
+                        "to_location_id": {
+                            "type": "integer",
+                            "nullable": True
+                        },
+                        "reference": {
+                            "type": "string",
+                            "nullable": True
+                        }
+                    },
+                    "required": ["product_id", "quantity"]
+                },
+                "ReservationCreate": {
+                    "type": "object",
+                    "properties": {
+                        "product_id": {
+                            "type": "integer"
+                        },
+                        "quantity": {
+                            "type": "number",
+                            "format": "float",
+                            "minimum": 0
+                        },
+                        "ttl_seconds": {
+                            "type": "integer",
+                            "default": 900,
+                            "description": "Segundos hasta que la reserva expire"
+                        },
+                        "reference": {
+                            "type": "string",
+                            "nullable": True
+                        }
+                    },
+                    "required": [
+                        "product_id",
+                        "quantity"
+                    ]
+                },
+                "LotCreate": {
+                    "type": "object",
+                    "properties": {
+                        "lot_number": {
+                            "type": "string",
+                            "maxLength": 50
+                        },
+                        "quantity": {
+                            "type": "number",
+                            "format": "float",
+                            "minimum": 0
+                        },
+                        "expiry_date": {
+                            "type": "string",
+                            "format": "date"
+                        },
+                        "location_id": {
+                            "type": "integer"
+                        }
+                    },
+                    "required": [
+                        "lot_number",
+                        "quantity",
+                        "expiry_date",
+                        "location_id"
+                    ]
+                },
+                "ImportReport": {
+                    "type": "object",
+                    "properties": {
+                        "rows": {
+                            "type": "integer"
+                        },
+                        "imported": {
+                            "type": "integer"
+                        },
+                        "failed": {
+                            "type": "integer"
+                        },
+                        "dry_run": {
+                            "type": "boolean"
+                        },
+                        "errors": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "row": {
+                                        "type": "integer"
+                                    },
+                                    "code": {
+                                        "type": "string"
+                                    },
+                                    "errors": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "field": {
+                                                    "type": "string"
+                                                },
+                                                "message": {
+                                                    "type": "string"
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        },
+                        "errors_truncated": {
+                            "type": "boolean"
+                        }
+                    }
+                },
+                "ExportManifest": {
+                    "type": "object",
+                    "properties": {
+                        "id": {
+                            "type": "string"
+                        },
+                        "format": {
+                            "type": "string",
+                            "enum": [
+                                "parquet",
+                                "arrow"
+                            ]
+                        },
+                        "created_at": {
+                            "type": "string",
+                            "format": "date-time"
+                        },
+                        "seconds": {
+                            "type": "number"
+                        },
+                        "tables": {
+                            "type": "object",
+                            "additionalProperties": {
+                                "type": "object",
+                                "properties": {
+                                    "file": {
+                                        "type": "string"
+                                    },
+                                    "rows": {
+                                        "type": "integer"
+                                    },
+                                    "bytes": {
+                                        "type": "integer"
+                                    }
+                                }
+                            }
+                        }
+                    }
+                },
+                "ProductFilterCondition": {
+                    "type": "object",
+                    "required": [
+                        "field"
+                    ],
+                    "properties": {
+                        "field": {
+                            "type": "string",
+                            "description": "Campo del producto (p. ej. supplier_id, available_stock, code)"
+                        },
+                        "op": {
+                            "type": "string",
+                            "enum": [
+                                "eq",
+                                "ne",
+                                "lt",
+                                "le",
+                                "gt",
+                                "ge",
+                                "in",
+                                "prefix",
+                                "is_null"
+                            ],
+                            "default": "eq"
+                        },
+                        "value": {
+                            "description": "Valor a comparar (lista para 'in', booleano para 'is_null')"
+                        }
+                    }
+                },
+                "ProductBulkUpdate": {
+                    "type": "object",
+                    "required": [
+                        "changes"
+                    ],
+                    "description": "Indique exactamente uno de: ids, codes o filter",
+                    "properties": {
+                        "ids": {
+                            "type": "array",
+                            "items": {
+                                "type": "integer"
+                            }
+                        },
+                        "codes": {
+                            "type": "array",
+                            "items": {
+                                "type": "string"
+                            }
+                        },
+                        "filter": {
+                            "type": "array",
+                            "items": {
+                                "$ref": "#/components/schemas/ProductFilterCondition"
+                            },
+                            "description": "Condiciones combinadas con AND"
+                        },
+                        "changes": {
+                            "$ref": "#/components/schemas/ProductUpdate"
+                        }
+                    }
+                },
+                "ProductBulkDelete": {
+                    "type": "object",
+                    "description": "Indique exactamente uno de: ids, codes o filter",
+                    "properties": {
+                        "ids": {
+                            "type": "array",
+                            "items": {
+                                "type": "integer"
+                            }
+                        },
+                        "codes": {
+                            "type": "array",
+                            "items": {
+                                "type": "string"
+                            }
+                        },
+                        "filter": {
+                            "type": "array",
+                            "items": {
+                                "$ref": "#/components/schemas/ProductFilterCondition"
+                            },
+                            "description": "Condiciones combinadas con AND"
+                        }
+                    }
+                },
+                "ProductBulkResult": {
+                    "type": "object",
+                    "properties": {
+                        "affected": {
+                            "type": "integer"
+                        },
+                        "ids": {
+                            "type": "array",
+                            "items": {
+                                "type": "integer"
+                            }
+                        }
+                    }
+                },
+                "StockAdjustment": {
+                    "type": "object",
+                    "required": [
+                        "delta"
+                    ],
+                    "properties": {
+                        "delta": {
+                            "type": "number",
+                            "description": "Cantidad a sumar al stock actual (negativa para restar); distinta de 0"
+                        }
+                    }
+                },
+                "ClassificationRequest": {
+                    "type": "object",
+                    "properties": {
+                        "period_days": {
+                            "type": "integer",
+                            "default": 7,
+                            "minimum": 1,
+                            "maximum": 366,
+                            "description": "Días de cada periodo de demanda"
+                        },
+                        "periods": {
+                            "type": "integer",
+                            "default": 26,
+                            "minimum": 2,
+                            "maximum": 520,
+                            "description": "Periodos de historia analizados"
+                        },
+                        "a_share": {
+                            "type": "number",
+                            "default": 0.8,
+                            "description": "Parte acumulada del valor de consumo que forma la clase A"
+                        },
+                        "b_share": {
+                            "type": "number",
+                            "default": 0.95,
+                            "description": "Parte acumulada del valor de consumo que cubren A y B"
+                        },
+                        "x_max_cv": {
+                            "type": "number",
+                            "default": 0.5,
+                            "description": "Coeficiente de variación máximo de la clase X"
+                        },
+                        "y_max_cv": {
+                            "type": "number",
+                            "default": 1.0,
+                            "description": "Coeficiente de variación máximo de la clase Y"
+                        }
+                    }
+                },
+                "ClassificationResult": {
+                    "type": "object",
+                    "properties": {
+                        "products": {
+                            "type": "integer",
+                            "description": "Productos del catálogo"
+                        },
+                        "changed": {
+                            "type": "integer",
+                            "description": "Productos cuya clase cambió"
+                        },
+                        "seconds": {
+                            "type": "number",
+                            "description": "Duración de la clasificación",
+                            "nullable": True
+                        },
+                        "classes": {
+                            "type": "object",
+                            "additionalProperties": {
+                                "type": "integer"
+                            },
+                            "description": "Productos por clase (p. ej. AX)"
+                        },
+                        "parameters": {
+                            "$ref": "#/components/schemas/ClassificationRequest"
+                        }
+                    },
+                    "required": [
+                        "products",
+                        "changed",
+                        "classes"
+                    ]
+                },
+                "AlertDigest": {
+                    "type": "object",
+                    "description": "Cuerpo de los webhooks de alertas (cabeceras X-Digest-Id y, con ALERT_WEBHOOK_SECRET, X-Signature: sha256=<HMAC del cuerpo>)",
+                    "properties": {
+                        "id": {
+                            "type": "string",
+                            "description": "Identificador del resumen; se repite en los reintentos"
+                        },
+                        "generated_at": {
+                            "type": "string",
+                            "format": "date-time"
+                        },
+                        "tenant": {
+                            "type": "string",
+                            "nullable": True
+                        },
+                        "alerts": {
+                            "type": "array",
+                            "items": {
+                                "$ref": "#/components/schemas/AlertProduct"
+                            },
+                            "description": "Productos que entraron en alerta"
+                        },
+                        "resolved": {
+                            "type": "array",
+                            "items": {
+                                "type": "object"
+                            },
+                            "description": "Productos recuperados (id, name, code, current_stock, min_stock)"
+                        },
+                        "total_alerts": {
+                            "type": "integer"
+                        },
+                        "total_resolved": {
+                            "type": "integer"
+                        }
+                    },
+                    "required": [
+                        "id",
+                        "generated_at",
+                        "alerts",
+                        "resolved",
+                        "total_alerts",
+                        "total_resolved"
+                    ]
+                },
+                "OpeningBalanceCreate": {
+                    "type": "object",
+                    "properties": {
+                        "product_ids": {
+                            "type": "array",
+                            "items": {
+                                "type": "integer"
+                            },
+                            "minItems": 1,
+                            "description": "Productos a abrir (todos los que no tienen saldos si se omite)"
+                        }
+                    }
+                },
+                "OpeningBalanceResult": {
+                    "type": "object",
+                    "properties": {
+                        "location_id": {
+                            "type": "integer"
+                        },
+                        "opened": {
+                            "type": "integer"
+                        },
+                        "product_ids": {
+                            "type": "array",
+                            "items": {
+                                "type": "integer"
+                            }
+                        }
+                    }
                 }
             }
         }
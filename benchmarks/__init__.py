@@ -0,0 +1,9 @@
+# benchmarks/__init__.py
+"""
+Suite de benchmarks de la API.
+
+Uso:
+    python -m benchmarks.run --products 100000 --concurrency 8 --duration 10 --output bench.json
+    python -m benchmarks.run --baseline bench.json --max-regression 0.15   # falla (exit 1) si hay regresiones
+    python -m benchmarks.run --url http://staging:5000/api/v1 --skip-seed   # contra un servidor ya levantado
+"""
@@ -0,0 +1,111 @@
+# benchmarks/loadgen.py
+"""
+Generador de carga HTTP: hilos con conexiones keep-alive (http.client) que ejecutan un escenario
+durante un tiempo fijo y registran la latencia de cada petición.
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Un escenario recibe el generador aleatorio del hilo y devuelve (método, ruta, cuerpo, estados esperados),
+# o None cuando ya no quedan peticiones que hacer
+Request = Tuple[str, str, Optional[dict], Tuple[int, ...]]
+Scenario = Callable[[random.Random], Optional[Request]]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """Resume las latencias (en segundos) de una ejecución."""
+    values = sorted(latencies)
+    total = len(values)
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(values, 0.50) * 1000, 3),
+            "p95": round(percentile(values, 0.95) * 1000, 3),
+            "p99": round(percentile(values, 0.99) * 1000, 3),
+            "mean": round(sum(values) / total * 1000, 3) if total else 0.0,
+            "max": round(values[-1] * 1000, 3) if total else 0.0,
+        },
+    }
+
+
+def run_scenario(base_url: str, scenario: Scenario, concurrency: int, duration: float,
+                 seed: int = 0, warmup: float = 0.0) -> Dict:
+    """
+    Ejecuta `scenario` con `concurrency` hilos durante `duration` segundos.
+    Las peticiones del periodo de calentamiento no se contabilizan.
+    """
+    parts = urlsplit(base_url)
+    prefix = parts.path.rstrip("/")
+    lock = threading.Lock()
+    latencies: List[float] = []
+    error_count = [0]
+    finished_at = [0.0]
+    start = time.perf_counter() + warmup
+    deadline = start + duration
+
+    def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        local_latencies = []
+        local_errors = 0
+        last_end = start
+        try:
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                request = scenario(rng)
+                if request is None:
+                    break
+                method, path, body, expected = request
+                payload = json.dumps(body).encode() if body is not None else None
+                headers = {"Content-Type": "application/json"} if payload is not None else {}
+
+                began = time.perf_counter()
+                try:
+                    connection.request(method, prefix + path, body=payload, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status in expected
+                except (OSError, http.client.HTTPException):
+                    # Conexión cerrada por el servidor: se reabre en la siguiente petición
+                    connection.close()
+                    ok = False
+                ended = time.perf_counter()
+
+                if began >= start:
+                    last_end = ended
+                    local_latencies.append(ended - began)
+                    if not ok:
+                        local_errors += 1
+        finally:
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                error_count[0] += local_errors
+                finished_at[0] = max(finished_at[0], last_end)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Un escenario que se queda sin peticiones (p. ej. borrados) termina antes del plazo
+    elapsed = finished_at[0] - start
+    return summarize(latencies, error_count[0], elapsed)
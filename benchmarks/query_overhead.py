@@ -0,0 +1,170 @@
+# benchmarks/query_overhead.py
+"""
+Micro-benchmark del coste por llamada de las consultas puntuales de productos.
+
+Mide, en un bucle sin HTTP, cuánto tarda cada forma de buscar un producto por ID:
+
+- legacy_query: db.query(Product).filter(...).first(), construido en cada llamada.
+- select_per_call: select(Product).where(...) construido en cada llamada.
+- prebuilt: ProductService.get_product_by_id, sentencia construida una vez con bindparam.
+- legacy_no_cache: como legacy_query con la caché de SQL compilado desactivada
+  (query_cache_size=0): lo que costaría compilar el SQL en cada petición.
+- driver_sql: el mismo SELECT directamente en el driver, como suelo de referencia.
+
+Cada variante informa de µs por llamada, llamadas por segundo en un núcleo y aciertos y fallos
+de la caché de SQL compilado. Uso: python -m benchmarks.query_overhead --iterations 20000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+VARIANTS = ["legacy_query", "select_per_call", "prebuilt", "legacy_no_cache", "driver_sql"]
+
+
+def _cache_counter(counts: Dict[str, int]) -> Callable:
+    """Listener after_cursor_execute que cuenta aciertos y fallos de la caché de SQL compilado."""
+    from sqlalchemy.engine.interfaces import CacheStats
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context.cache_hit == CacheStats.CACHE_HIT:
+            key = "hit"
+        elif context.cache_hit == CacheStats.CACHE_MISS:
+            key = "miss"
+        else:
+            key = "uncached"
+        counts[key] = counts.get(key, 0) + 1
+    return _after_cursor_execute
+
+
+def build_variants(database_url: str) -> Dict[str, tuple]:
+    """Devuelve, por variante, (motor, función lookup(db, product_id))."""
+    from sqlalchemy import create_engine, select
+    from app.models.product import Product
+    from app.services.product_service import ProductService
+
+    cached = create_engine(database_url, query_cache_size=1000)
+    uncached = create_engine(database_url, query_cache_size=0)
+
+    def legacy_query(db, product_id):
+        return db.query(Product).filter(Product.id == product_id).first()
+
+    def select_per_call(db, product_id):
+        return db.execute(select(Product).where(Product.id == product_id)).scalars().first()
+
+    def prebuilt(db, product_id):
+        return ProductService.get_product_by_id(db, product_id)
+
+    def driver_sql(db, product_id):
+        return db.connection().exec_driver_sql("SELECT * FROM products WHERE id = ?", (product_id,)).first()
+
+    return {
+        "legacy_query": (cached, legacy_query),
+        "select_per_call": (cached, select_per_call),
+        "prebuilt": (cached, prebuilt),
+        "legacy_no_cache": (uncached, legacy_query),
+        "driver_sql": (cached, driver_sql),
+    }
+
+
+def run_variant(engine, lookup: Callable, products: int, iterations: int, seed: int) -> Dict:
+    """Ejecuta `iterations` búsquedas aleatorias en una sesión (vaciada en cada llamada)."""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    counts: Dict[str, int] = {}
+    listener = _cache_counter(counts)
+    rng = random.Random(seed)
+    ids = [rng.randint(1, products) for _ in range(iterations)]
+    with Session(engine) as db:
+        # Calentamiento: conexión abierta y caché de compilación poblada
+        for product_id in ids[:min(200, iterations)]:
+            lookup(db, product_id)
+            db.expunge_all()
+        event.listen(engine, "after_cursor_execute", listener)
+        try:
+            started = time.perf_counter()
+            for product_id in ids:
+                lookup(db, product_id)
+                db.expunge_all()
+            elapsed = time.perf_counter() - started
+        finally:
+            event.remove(engine, "after_cursor_execute", listener)
+    return {
+        "iterations": iterations,
+        "seconds": round(elapsed, 4),
+        "us_per_call": round(elapsed / iterations * 1e6, 2),
+        "calls_per_second": round(iterations / elapsed, 1),
+        "compiled_cache": counts,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Coste por llamada de las consultas puntuales de productos")
+    parser.add_argument("--products", type=int, default=10_000, help="Tamaño del catálogo sintético")
+    parser.add_argument("--iterations", type=int, default=20_000, help="Búsquedas por variante")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del generador")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="Variantes separadas por comas")
+    parser.add_argument("--database-url", help="Base de datos (por defecto, una temporal con catálogo sintético)")
+    parser.add_argument("--skip-seed", action="store_true", help="No generar el catálogo (usa el existente)")
+    parser.add_argument("--output", help="Fichero donde escribir el informe JSON (por defecto, stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    selected = [name.strip() for name in args.variants.split(",") if name.strip()]
+    unknown = set(selected) - set(VARIANTS)
+    if unknown:
+        print(f"Variantes desconocidas: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    # La aplicación lee DATABASE_URL al importarse: hay que fijarla antes de importar app
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = database_url
+    if not args.skip_seed:
+        from benchmarks.run import seed_database
+        seed_database(database_url, args.products, 0.1, args.seed)
+
+    variants = build_variants(database_url)
+    results = {
+        "meta": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "products": args.products,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "variants": {},
+    }
+    for name in VARIANTS:
+        if name not in selected:
+            continue
+        engine, lookup = variants[name]
+        results["variants"][name] = run_variant(engine, lookup, args.products, args.iterations, args.seed)
+        print(f"{name}: {results['variants'][name]['us_per_call']} µs/llamada, "
+              f"{results['variants'][name]['calls_per_second']} llamadas/s", file=sys.stderr)
+
+    legacy = results["variants"].get("legacy_query")
+    if legacy:
+        for name, result in results["variants"].items():
+            result["speedup_vs_legacy"] = round(legacy["us_per_call"] / result["us_per_call"], 2)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+# benchmarks/run.py
+"""
+Benchmark de los endpoints de /api/v1/products.
+
+Genera un catálogo sintético con inserción masiva, levanta la aplicación en un servidor local
+(o usa --url), ejecuta cada escenario con la concurrencia indicada y escribe un informe JSON con
+p50/p95/p99 y throughput. Con --baseline compara contra un informe anterior y termina con código 1
+si algún escenario empeora más de --max-regression.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.loadgen import run_scenario
+
+SCENARIOS = [
+    "list_products", "get_product", "get_product_stock", "get_product_lots", "get_alerts",
+    "create_product", "update_product", "patch_product", "delete_product",
+]
+
+
+def build_scenarios(product_ids: List[int]) -> Dict:
+    """
+    Construye los escenarios sobre los IDs reales del catálogo (con AUTOINCREMENT, una base
+    de datos ya usada no empieza en 1). Los productos que crea create_product son los que
+    borra delete_product.
+    """
+    product_count = len(product_ids)
+    sequence = itertools.count()
+    created_ids: List[int] = []
+    created_lock = threading.Lock()
+
+    def random_id(rng):
+        return rng.choice(product_ids)
+
+    def create(rng):
+        number = next(sequence)
+        body = {
+            "name": f"Producto benchmark {number}",
+            "code": f"BENCH-{os.getpid()}-{number}",
+            "current_stock": rng.randint(0, 500),
+            "min_stock": rng.randint(1, 100),
+        }
+        return "POST", "/products", body, (201,)
+
+    def delete(rng):
+        with created_lock:
+            if not created_ids:
+                return None
+            product_id = created_ids.pop()
+        return "DELETE", f"/products/{product_id}", None, (200,)
+
+    scenarios = {
+        "list_products": lambda rng: ("GET", f"/products?skip={rng.randint(0, max(product_count - 100, 0))}&limit=100", None, (200,)),
+        "get_product": lambda rng: ("GET", f"/products/{random_id(rng)}", None, (200,)),
+        "get_product_stock": lambda rng: ("GET", f"/products/{random_id(rng)}/stock", None, (200,)),
+        "get_product_lots": lambda rng: ("GET", f"/products/{random_id(rng)}/lots", None, (200,)),
+        "get_alerts": lambda rng: ("GET", "/products/alerts", None, (200,)),
+        "create_product": create,
+        "update_product": lambda rng: ("PUT", f"/products/{random_id(rng)}", {
+            "name": f"Producto actualizado {rng.randint(0, 10 ** 6)}",
+            "current_stock": rng.randint(0, 500),
+        }, (200,)),
+        "patch_product": lambda rng: ("PATCH", f"/products/{random_id(rng)}", {
+            "current_stock": rng.randint(0, 500),
+        }, (200,)),
+        "delete_product": delete,
+    }
+    return scenarios, created_ids
+
+
+def collect_created_ids(base_url: str, product_count: int, created_ids: List[int]):
+    """Recupera los IDs creados por create_product (los posteriores al catálogo sintético)."""
+    import http.client
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+    skip = product_count
+    try:
+        while True:
+            connection.request("GET", f"{parts.path.rstrip('/')}/products?skip={skip}&limit=100")
+            page = json.loads(connection.getresponse().read())
+            if not page:
+                break
+            created_ids.extend(p["id"] for p in page if p["code"].startswith("BENCH-"))
+            skip += len(page)
+    finally:
+        connection.close()
+
+
+def load_product_ids(database_url: str) -> List[int]:
+    """IDs de los productos de la base de datos local (después de sembrarla)."""
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            return list(connection.execute(text("SELECT id FROM products ORDER BY id")).scalars())
+    finally:
+        engine.dispose()
+
+
+def fetch_product_ids(base_url: str) -> List[int]:
+    """IDs de los productos de un servidor remoto (--url), página a página con fields=id."""
+    import http.client
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+    product_ids: List[int] = []
+    try:
+        while True:
+            connection.request("GET", f"{parts.path.rstrip('/')}/products?fields=id&skip={len(product_ids)}&limit=100")
+            page = json.loads(connection.getresponse().read())
+            if not page:
+                break
+            product_ids.extend(p["id"] for p in page)
+    finally:
+        connection.close()
+    return product_ids
+
+
+def seed_database(database_url: str, products: int, low_stock_ratio: float, seed: int) -> Dict:
+    """Crea el esquema y carga el catálogo sintético. Devuelve el tiempo y la velocidad de carga."""
+    from app.db.seed import load_products
+    from app.db.synthetic import generate_products
+
+    return load_products(generate_products(products, low_stock_ratio, seed), database_url, truncate=True)
+
+
+def start_local_server():
+    """Levanta la aplicación en un servidor WSGI multihilo con keep-alive en un puerto libre."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app.main import create_app
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/api/v1"
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, max_regression: float) -> List[Dict]:
+    """
+    Compara p95 y throughput de cada escenario con el informe de referencia.
+    Devuelve la lista de regresiones que superan la tolerancia.
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        previous_p95 = previous["latency_ms"]["p95"]
+        current_p95 = current["latency_ms"]["p95"]
+        if previous_p95 > 0 and current_p95 > previous_p95 * (1 + max_regression):
+            regressions.append({
+                "scenario": name, "metric": "p95_ms", "baseline": previous_p95, "current": current_p95,
+            })
+        previous_rps = previous["throughput_rps"]
+        current_rps = current["throughput_rps"]
+        if previous_rps > 0 and current_rps < previous_rps * (1 - max_regression):
+            regressions.append({
+                "scenario": name, "metric": "throughput_rps", "baseline": previous_rps, "current": current_rps,
+            })
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los endpoints de productos")
+    parser.add_argument("--products", type=int, default=10_000, help="Tamaño del catálogo sintético")
+    parser.add_argument("--low-stock-ratio", type=float, default=0.1, help="Proporción de productos en alerta")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del generador")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por escenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Segundos de calentamiento por escenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Escenarios separados por comas")
+    parser.add_argument("--url", help="URL base de un servidor ya levantado (p. ej. http://host:5000/api/v1)")
+    parser.add_argument("--database-url", help="Base de datos para el servidor local (por defecto, una temporal)")
+    parser.add_argument("--skip-seed", action="store_true", help="No generar el catálogo (usa el existente)")
+    parser.add_argument("--output", help="Fichero donde escribir el informe JSON (por defecto, stdout)")
+    parser.add_argument("--baseline", help="Informe JSON de referencia para detectar regresiones")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Empeoramiento tolerado respecto a la referencia (0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        print(f"Escenarios desconocidos: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    seeding = None
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        # La aplicación lee DATABASE_URL al importarse: hay que fijarla antes de importar app
+        database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.setdefault("RESERVATION_SWEEPER_ENABLED", "false")
+        if not args.skip_seed:
+            seeding = seed_database(database_url, args.products, args.low_stock_ratio, args.seed)
+        server, base_url = start_local_server()
+
+    product_ids = fetch_product_ids(base_url) if args.url else load_product_ids(database_url)
+    if not product_ids:
+        print("El catálogo está vacío: no hay productos sobre los que medir", file=sys.stderr)
+        if server is not None:
+            server.shutdown()
+        return 2
+    scenarios, created_ids = build_scenarios(product_ids)
+    results = {
+        "meta": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "target": args.url or "local",
+            "products": args.products,
+            "low_stock_ratio": args.low_stock_ratio,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seeding": seeding,
+        },
+        "scenarios": {},
+    }
+
+    try:
+        for name in SCENARIOS:
+            if name not in selected:
+                continue
+            if name == "delete_product" and not created_ids:
+                collect_created_ids(base_url, len(product_ids), created_ids)
+            results["scenarios"][name] = run_scenario(
+                base_url, scenarios[name], args.concurrency, args.duration, seed=args.seed, warmup=args.warmup
+            )
+            print(f"{name}: {results['scenarios'][name]['throughput_rps']} req/s, "
+                  f"p95 {results['scenarios'][name]['latency_ms']['p95']} ms", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        results["regressions"] = compare_with_baseline(results, baseline, args.max_regression)
+        if results["regressions"]:
+            exit_code = 1
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(report + "\n")
+    else:
+        print(report)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
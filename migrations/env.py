@@ -6,6 +6,13 @@ from alembic import context
 import sys
 import os
 from app.models.product import Product
+from app.models.location import StockLocation, StockBalance, StockMovement
+from app.models.reservation import Reservation
+from app.models.lot import Lot
+from app.models.purchasing import Supplier, PurchaseSuggestionBatch, PurchaseSuggestion
+from app.models.job import Job
+from app.models.inventory_state import InventoryCheckpoint
+from app.models.alert import StockAlertState
 config = context.config
 
 if config.config_file_name is not None:
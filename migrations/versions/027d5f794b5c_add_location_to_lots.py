@@ -0,0 +1,45 @@
+"""Add location to lots
+
+Revision ID: 027d5f794b5c
+Revises: e60306298f57
+Create Date: 2026-10-19 00:53:59.903107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '027d5f794b5c'
+down_revision: Union[str, None] = 'e60306298f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite no admite ALTER TABLE ADD CONSTRAINT: usar modo batch
+    with op.batch_alter_table('lots') as batch_op:
+        batch_op.add_column(sa.Column('location_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_lots_location_id_stock_locations', 'stock_locations', ['location_id'], ['id'], ondelete='CASCADE'
+        )
+    op.drop_index('ix_lots_product_expiry', table_name='lots', sqlite_where=sa.text('quantity > 0'), postgresql_where=sa.text('quantity > 0'))
+    op.create_index('ix_lots_product_location_expiry', 'lots', ['product_id', 'location_id', 'expiry_date', 'id'], unique=False, sqlite_where=sa.text('quantity > 0'), postgresql_where=sa.text('quantity > 0'))
+    # Los lotes existentes no registraban su ubicación: si solo hay una, es la suya.
+    # Con varias quedan sin ubicación y no participan en el consumo FEFO hasta asignarlos.
+    op.execute(
+        "UPDATE lots SET location_id = (SELECT MIN(id) FROM stock_locations) "
+        "WHERE location_id IS NULL AND (SELECT COUNT(*) FROM stock_locations) = 1"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lots_product_location_expiry', table_name='lots', sqlite_where=sa.text('quantity > 0'), postgresql_where=sa.text('quantity > 0'))
+    op.create_index('ix_lots_product_expiry', 'lots', ['product_id', 'expiry_date', 'id'], unique=False, sqlite_where=sa.text('quantity > 0'), postgresql_where=sa.text('quantity > 0'))
+    with op.batch_alter_table('lots') as batch_op:
+        batch_op.drop_constraint('fk_lots_location_id_stock_locations', type_='foreignkey')
+        batch_op.drop_column('location_id')
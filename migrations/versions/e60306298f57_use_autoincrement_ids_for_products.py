@@ -0,0 +1,39 @@
+"""Use AUTOINCREMENT ids for products on SQLite
+
+Revision ID: e60306298f57
+Revises: c402d2c24df2
+Create Date: 2026-10-19 00:32:33.538977
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e60306298f57'
+down_revision: Union[str, None] = 'c402d2c24df2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_products(autoincrement: bool) -> None:
+    # Solo SQLite reutiliza IDs; en el resto de bases de datos la secuencia ya no retrocede.
+    # La tabla se recrea copiando las filas: alembic se conecta sin PRAGMA foreign_keys,
+    # así que borrar la tabla original no dispara los ON DELETE CASCADE de las tablas hijas.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('products', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}) as batch_op:
+        pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate_products(True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_products(False)
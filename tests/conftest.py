@@ -0,0 +1,55 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# La aplicación crea sus motores al importarse: las pruebas no deben tocar inventory.db
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="inventory-tests-"), "app.db")
+os.environ["RESERVATION_SWEEPER_ENABLED"] = "false"
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401,E402  (registra todos los modelos en Base.metadata)
+from app.db.base import Base, _sqlite_connect_listener  # noqa: E402
+from app.models.product import Product  # noqa: E402
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Base de datos SQLite vacía, con todas las tablas, propia de cada prueba."""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def session_factory(database_url):
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", _sqlite_connect_listener(writer=True, wal=False))
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_product(db):
+    """Crea un producto con valores por defecto razonables y lo devuelve."""
+    def make(code: str, **values) -> Product:
+        values.setdefault("name", f"Producto {code}")
+        values.setdefault("current_stock", 10.0)
+        values.setdefault("min_stock", 5.0)
+        product = Product(code=code, **values)
+        db.add(product)
+        db.commit()
+        db.refresh(product)
+        return product
+    return make
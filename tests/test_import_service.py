@@ -0,0 +1,123 @@
+# tests/test_import_service.py
+import io
+
+from app.models.location import StockBalance, StockLocation
+from app.models.product import Product
+from app.models.purchasing import Supplier
+from app.services.import_service import ImportService
+
+
+def _import_csv(db, content: str, **options):
+    rows = ImportService.iter_csv_rows(io.BytesIO(content.encode("utf-8")))
+    return ImportService.import_products(db, rows, **options)
+
+
+def _product(db, code):
+    db.expire_all()
+    return db.query(Product).filter(Product.code == code).one()
+
+
+def test_upsert_only_updates_columns_in_the_sheet(db, make_product):
+    supplier = Supplier(code="S1", name="Proveedor")
+    db.add(supplier)
+    db.commit()
+    make_product("A1", name="Viejo", current_stock=5, supplier_id=supplier.id,
+                 unit_cost=9.5, lot_size=6, min_order_qty=12)
+
+    report = _import_csv(db, "code,name,current_stock,min_stock\nA1,Nuevo,7,2\n")
+
+    assert report["imported"] == 1
+    product = _product(db, "A1")
+    assert (product.name, product.current_stock, product.min_stock) == ("Nuevo", 7, 2)
+    assert product.supplier_id == supplier.id
+    assert (product.unit_cost, product.lot_size, product.min_order_qty) == (9.5, 6, 12)
+    assert product.version == 2
+
+
+def test_blank_cells_keep_existing_values(db, make_product):
+    make_product("A1", unit_cost=9.5, lot_size=6)
+    make_product("B1", unit_cost=1.0, lot_size=2)
+
+    report = _import_csv(db, "code,name,current_stock,min_stock,unit_cost,lot_size\n"
+                             "A1,A,1,1,,\n"
+                             "B1,B,1,1,3,4\n")
+
+    assert report["imported"] == 2
+    assert (_product(db, "A1").unit_cost, _product(db, "A1").lot_size) == (9.5, 6)
+    assert (_product(db, "B1").unit_cost, _product(db, "B1").lot_size) == (3, 4)
+
+
+def test_new_products_get_schema_defaults(db):
+    report = _import_csv(db, "code,name,current_stock,min_stock\nn-1,Nuevo,3,1\n")
+
+    assert report == {"rows": 1, "imported": 1, "failed": 0, "dry_run": False,
+                      "errors": [], "errors_truncated": False}
+    product = _product(db, "N-1")
+    assert (product.unit_cost, product.lot_size, product.min_order_qty, product.supplier_id) == (0, 1, 0, None)
+    assert product.version == 1
+
+
+def test_invalid_rows_are_reported_and_skipped(db, make_product):
+    make_product("A1", current_stock=5)
+
+    report = _import_csv(db, "code,name,current_stock,min_stock\n"
+                             "A1,A,-1,1\n"
+                             "B 1,B,1,1\n"
+                             "C1,C,2,1\n", chunk_size=2)
+
+    assert (report["rows"], report["imported"], report["failed"]) == (3, 1, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    assert _product(db, "A1").current_stock == 5
+    assert _product(db, "C1").current_stock == 2
+
+
+def test_dry_run_does_not_write(db):
+    report = _import_csv(db, "code,name,current_stock,min_stock\nA1,A,1,1\n", dry_run=True)
+
+    assert (report["rows"], report["imported"]) == (1, 0)
+    assert db.query(Product).count() == 0
+
+
+def test_stock_of_located_products_is_not_overwritten(db, make_product):
+    located = make_product("A1", current_stock=5)
+    make_product("B1", current_stock=5)
+    location = StockLocation(code="W1", name="Almacén")
+    db.add(location)
+    db.flush()
+    db.add(StockBalance(product_id=located.id, location_id=location.id, quantity=5))
+    db.commit()
+
+    report = _import_csv(db, "code,name,current_stock,min_stock\nA1,A,9,1\nB1,B,9,1\n")
+
+    assert (report["imported"], report["failed"]) == (1, 1)
+    assert report["errors"][0]["row"] == 2
+    assert _product(db, "A1").current_stock == 5
+    assert _product(db, "B1").current_stock == 9
+
+
+def test_partial_rows_update_existing_codes_only(db, make_product):
+    make_product("A1", name="A", current_stock=5, unit_cost=1.0)
+
+    report = _import_csv(db, "code,unit_cost\nA1,2.5\nN1,3\n")
+
+    assert (report["rows"], report["imported"], report["failed"]) == (2, 1, 1)
+    assert report["errors"][0]["row"] == 3
+    assert {error["field"] for error in report["errors"][0]["errors"]} == {"name", "current_stock", "min_stock"}
+    product = _product(db, "A1")
+    assert (product.name, product.current_stock, product.unit_cost, product.version) == ("A", 5, 2.5, 2)
+    assert db.query(Product).filter(Product.code == "N1").count() == 0
+
+
+def test_duplicate_codes_in_a_chunk_are_merged(db, make_product):
+    make_product("A1", unit_cost=1.0)
+
+    report = _import_csv(db, "code,name,current_stock,min_stock,unit_cost\n"
+                             "A1,Primero,1,1,5\n"
+                             "N1,Nuevo,2,1,\n"
+                             "a1,Segundo,3,,\n"
+                             "N1,,4,,7\n")
+
+    assert (report["rows"], report["imported"], report["failed"]) == (4, 4, 0)
+    first, new = _product(db, "A1"), _product(db, "N1")
+    assert (first.name, first.current_stock, first.min_stock, first.unit_cost) == ("Segundo", 3, 1, 5)
+    assert (new.name, new.current_stock, new.unit_cost) == ("Nuevo", 4, 7)
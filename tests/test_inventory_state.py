@@ -0,0 +1,234 @@
+# tests/test_inventory_state.py
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.models.inventory_state import InventoryCheckpoint  # noqa: E402
+from app.models.location import StockBalance, StockLocation  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.services import inventory_state  # noqa: E402
+from app.services.inventory_state import RECORD_SIZE, CHECKPOINT_NAME, InventoryState  # noqa: E402
+from app.services.product_service import ProductService  # noqa: E402
+from app.services.signals import products_changed  # noqa: E402
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return str(tmp_path / "log")
+
+
+@pytest.fixture
+def open_state(session_factory, log_dir):
+    """Abre estados sobre el mismo log (cada llamada simula un arranque) y los cierra al final."""
+    states = []
+
+    def open_():
+        state = InventoryState(log_dir, session_factory=session_factory, fsync=False)
+        state.load()
+        states.append(state)
+        return state
+
+    yield open_
+    for state in states:
+        state.log.close()
+
+
+def _stock_in_db(session_factory, product_id):
+    db = session_factory()
+    try:
+        return db.get(Product, product_id).current_stock
+    finally:
+        db.close()
+
+
+def _only_segment(state):
+    segments = [path for path in state.log.segments() if os.path.getsize(path) > 0]
+    assert len(segments) == 1
+    return segments[0]
+
+
+def test_replay_ignores_torn_trailing_record(make_product, open_state):
+    product = make_product("A1", current_stock=10)
+    state = open_state()
+    state.increment(product.id, 3)
+    state.increment(product.id, 4)
+    segment = _only_segment(state)
+    state.log.close()
+
+    # Caída a mitad de escribir el tercer registro
+    with open(segment, "ab") as log_file:
+        log_file.write(b"\x01" * (RECORD_SIZE // 2))
+
+    restarted = open_state()
+    assert restarted.get_product(product.id).current_stock == 17
+    assert restarted.pending() == 2
+    assert os.path.getsize(segment) == 2 * RECORD_SIZE
+
+
+def test_replay_stops_at_corrupt_record(make_product, open_state):
+    product = make_product("A1", current_stock=10)
+    state = open_state()
+    for delta in (1, 2, 4):
+        state.increment(product.id, delta)
+    segment = _only_segment(state)
+    state.log.close()
+
+    # Un byte alterado en el segundo registro: su CRC ya no coincide
+    with open(segment, "r+b") as log_file:
+        log_file.seek(RECORD_SIZE + 3)
+        byte = log_file.read(1)
+        log_file.seek(RECORD_SIZE + 3)
+        log_file.write(bytes([byte[0] ^ 0xFF]))
+
+    restarted = open_state()
+    assert restarted.get_product(product.id).current_stock == 11
+    assert restarted.pending() == 1
+    assert os.path.getsize(segment) == RECORD_SIZE
+
+    # Los incrementos siguientes continúan la secuencia y sobreviven a otro arranque
+    restarted.increment(product.id, 5)
+    restarted.log.close()
+    assert open_state().get_product(product.id).current_stock == 16
+
+
+def test_checkpoint_is_not_reapplied_on_restart(make_product, open_state, session_factory, log_dir, tmp_path):
+    product = make_product("A1", current_stock=10)
+    state = open_state()
+    state.increment(product.id, 3)
+    state.increment(product.id, -2)
+    # Copia del segmento tal como estaba antes del checkpoint
+    segment = _only_segment(state)
+    saved = str(tmp_path / "saved.log")
+    shutil.copy(segment, saved)
+
+    assert state.checkpoint() == 1
+    assert state.pending() == 0
+    assert _stock_in_db(session_factory, product.id) == 11
+    state.log.close()
+
+    # Caída entre el commit del checkpoint y el borrado del segmento que cubre
+    shutil.copy(saved, segment)
+    restarted = open_state()
+    assert restarted.pending() == 0
+    assert restarted.get_product(product.id).current_stock == 11
+    assert restarted.checkpoint() == 0
+    assert _stock_in_db(session_factory, product.id) == 11
+
+    db = session_factory()
+    try:
+        assert db.get(InventoryCheckpoint, CHECKPOINT_NAME).last_sequence == 2
+    finally:
+        db.close()
+
+
+def test_refresh_keeps_pending_deltas(make_product, open_state, session_factory):
+    product = make_product("A1", current_stock=10, min_stock=5)
+    state = open_state()
+    state.increment(product.id, 4)
+
+    # Cambio por SQL (p. ej. un movimiento) mientras el incremento sigue sin checkpoint
+    db = session_factory()
+    try:
+        row = db.get(Product, product.id)
+        row.current_stock += 20
+        row.min_stock = 50
+        db.commit()
+    finally:
+        db.close()
+    state.refresh([product.id])
+
+    refreshed = state.get_product(product.id)
+    assert refreshed.current_stock == 34
+    assert refreshed.min_stock == 50
+    assert state.pending() == 1
+
+    state.checkpoint()
+    assert _stock_in_db(session_factory, product.id) == 34
+    assert state.get_product(product.id).current_stock == 34
+
+
+def test_refresh_drops_deleted_products(make_product, open_state, session_factory):
+    kept = make_product("A1", current_stock=10)
+    deleted = make_product("B1", current_stock=10)
+    state = open_state()
+    state.increment(kept.id, 1)
+    state.increment(deleted.id, 1)
+
+    db = session_factory()
+    try:
+        db.delete(db.get(Product, deleted.id))
+        db.commit()
+    finally:
+        db.close()
+    state.refresh()
+
+    assert state.get_product(deleted.id) is None
+    assert state.pending() == 1
+    assert state.checkpoint() == 1
+    assert _stock_in_db(session_factory, kept.id) == 11
+
+
+def test_increment_does_not_consume_reserved_stock(make_product, open_state):
+    product = make_product("A1", current_stock=100, reserved_stock=90)
+    state = open_state()
+
+    with pytest.raises(ValueError, match="disponible 10"):
+        state.increment(product.id, -11)
+    assert state.increment(product.id, -10).current_stock == 90
+    assert state.increment(product.id, 5).current_stock == 95
+    assert state.pending() == 2
+
+
+def test_located_products_reject_increments(db, make_product, open_state):
+    product = make_product("A1", current_stock=5)
+    location = StockLocation(code="W1", name="Almacén")
+    db.add(location)
+    db.flush()
+    db.add(StockBalance(product_id=product.id, location_id=location.id, quantity=5))
+    db.commit()
+    state = open_state()
+
+    with pytest.raises(ValueError, match="saldos por ubicación"):
+        state.increment(product.id, 1)
+    assert state.pending() == 0
+    # Sin el estado, el UPDATE condicionado aplica la misma regla
+    with pytest.raises(ValueError, match="saldos por ubicación"):
+        ProductService.adjust_stock(db, product.id, 1)
+
+
+def test_field_reads_use_the_state(db, make_product, open_state, monkeypatch):
+    first = make_product("A1", current_stock=10, reserved_stock=2)
+    second = make_product("B1", current_stock=1)
+    state = open_state()
+    monkeypatch.setattr(inventory_state, "_state", state)
+    state.increment(first.id, 5)
+
+    fields = ["id", "current_stock", "available_stock"]
+    assert ProductService.get_product_fields(db, first.id, fields) == {"id": first.id, "current_stock": 15,
+                                                                        "available_stock": 13}
+    assert ProductService.get_product_fields(db, 999, fields) is None
+    assert ProductService.get_products_fields(db, ["id", "current_stock"]) == [
+        {"id": first.id, "current_stock": 15}, {"id": second.id, "current_stock": 1}]
+    assert [product.current_stock for product in ProductService.get_products(db)] == [15, 1]
+
+
+def test_checkpoint_notifies_products_changed(make_product, open_state):
+    changed = make_product("A1", current_stock=10)
+    make_product("B1", current_stock=10)
+    state = open_state()
+    state.increment(changed.id, -7)
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append((sender, kwargs["ids"], kwargs["fields"]))
+
+    products_changed.connect(receiver)
+    try:
+        assert state.checkpoint() == 1
+    finally:
+        products_changed.disconnect(receiver)
+    # Las alertas revisan el producto con el stock ya en la base de datos
+    assert received == [("InventoryState", [changed.id], ["current_stock"])]
@@ -0,0 +1,78 @@
+# tests/test_location_service.py
+import pytest
+
+from app.models.location import StockBalance, StockLocation, StockMovement
+from app.models.product import Product
+from app.schemas.location import StockMovementCreate
+from app.schemas.product import ProductSelector, ProductUpdate
+from app.services.location_service import LocationService
+from app.services.product_service import ProductService
+
+
+@pytest.fixture
+def make_location(db):
+    def make(code: str) -> StockLocation:
+        location = StockLocation(code=code, name=f"Ubicación {code}")
+        db.add(location)
+        db.commit()
+        db.refresh(location)
+        return location
+    return make
+
+
+def _move(db, product, quantity, from_location=None, to_location=None):
+    return LocationService.move_stock(db, StockMovementCreate(
+        product_id=product.id, quantity=quantity,
+        from_location_id=from_location.id if from_location else None,
+        to_location_id=to_location.id if to_location else None,
+    ))
+
+
+def _balances(db, product):
+    db.expire_all()
+    return sum(balance.quantity for balance in db.query(StockBalance).filter(StockBalance.product_id == product.id))
+
+
+def test_receipt_requires_opening_balance_for_unlocated_stock(db, make_product, make_location):
+    product = make_product("A1", current_stock=100)
+    location = make_location("W1")
+
+    with pytest.raises(ValueError, match="saldo inicial"):
+        _move(db, product, 10, to_location=location)
+
+    assert LocationService.open_balances(db, location.id) == [product.id]
+    _move(db, product, 10, to_location=location)
+
+    assert db.get(Product, product.id).current_stock == 110
+    assert _balances(db, product) == 110
+    kinds = [movement.kind for movement in db.query(StockMovement).order_by(StockMovement.id)]
+    assert kinds == ["opening", "receipt"]
+
+
+def test_opening_balances_skip_located_products(db, make_product, make_location):
+    located = make_product("A1", current_stock=0)
+    unlocated = make_product("B1", current_stock=7)
+    first, second = make_location("W1"), make_location("W2")
+    _move(db, located, 5, to_location=first)
+
+    assert LocationService.open_balances(db, second.id) == [unlocated.id]
+    with pytest.raises(ValueError, match="ya tiene saldos"):
+        LocationService.open_balances(db, first.id, [located.id])
+    assert _balances(db, located) == 5
+    assert _balances(db, unlocated) == 7
+
+
+def test_absolute_stock_writes_are_rejected_for_located_products(db, make_product, make_location):
+    located = make_product("A1", current_stock=0)
+    unlocated = make_product("B1", current_stock=3)
+    _move(db, located, 5, to_location=make_location("W1"))
+
+    with pytest.raises(ValueError, match="saldos por ubicación"):
+        ProductService.update_product(db, located.id, ProductUpdate(current_stock=50))
+    with pytest.raises(ValueError, match="saldos por ubicación"):
+        ProductService.bulk_update(db, ProductSelector(ids=[located.id, unlocated.id]), ProductUpdate(current_stock=1))
+
+    # Los demás campos siguen pudiéndose asignar
+    assert ProductService.update_product(db, located.id, ProductUpdate(min_stock=2)).min_stock == 2
+    assert ProductService.update_product(db, unlocated.id, ProductUpdate(current_stock=4)).current_stock == 4
+    assert db.get(Product, located.id).current_stock == 5
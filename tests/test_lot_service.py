@@ -0,0 +1,83 @@
+# tests/test_lot_service.py
+from datetime import date
+
+import pytest
+
+from app.models.location import StockBalance, StockLocation
+from app.models.lot import Lot
+from app.models.product import Product
+from app.schemas.location import StockMovementCreate
+from app.schemas.lot import LotCreate
+from app.schemas.reservation import ReservationCreate
+from app.services.location_service import LocationService
+from app.services.lot_service import LotService
+from app.services.reservation_service import ReservationService
+
+TODAY = date(2026, 1, 1)
+
+
+@pytest.fixture
+def lot_product(db, make_product):
+    """Producto sin stock con un lote que caduca antes en W1 y otro posterior en W2."""
+    product = make_product("A1", current_stock=0)
+    first, second = StockLocation(code="W1", name="W1"), StockLocation(code="W2", name="W2")
+    db.add_all([first, second])
+    db.commit()
+    LotService.receive_lot(db, product.id, LotCreate(lot_number="L1", quantity=5, expiry_date=date(2030, 1, 1),
+                                                      location_id=first.id))
+    LotService.receive_lot(db, product.id, LotCreate(lot_number="L2", quantity=5, expiry_date=date(2031, 1, 1),
+                                                      location_id=second.id))
+    return product, first, second
+
+
+def _lots(db, product):
+    db.expire_all()
+    return {lot.lot_number: lot.quantity for lot in db.query(Lot).filter(Lot.product_id == product.id)}
+
+
+def _balance(db, product, location):
+    db.expire_all()
+    return db.query(StockBalance.quantity).filter(
+        StockBalance.product_id == product.id, StockBalance.location_id == location.id).scalar()
+
+
+def test_fefo_consume_only_uses_lots_of_the_location(db, lot_product):
+    product, first, second = lot_product
+
+    allocations = LotService.consume(db, product.id, 3, second.id, today=TODAY)
+
+    assert [(allocation.lot_number, allocation.quantity) for allocation in allocations] == [("L2", 3)]
+    assert _lots(db, product) == {"L1": 5, "L2": 2}
+    assert (_balance(db, product, first), _balance(db, product, second)) == (5, 2)
+    with pytest.raises(ValueError, match="lotes vigentes"):
+        LotService.consume(db, product.id, 3, second.id, today=TODAY)
+    assert _lots(db, product) == {"L1": 5, "L2": 2}
+
+
+def test_movements_consume_lots_or_are_refused(db, lot_product):
+    product, first, second = lot_product
+
+    LocationService.move_stock(db, StockMovementCreate(product_id=product.id, quantity=2, from_location_id=first.id))
+    assert _lots(db, product) == {"L1": 3, "L2": 5}
+    assert db.get(Product, product.id).current_stock == 8
+
+    with pytest.raises(ValueError, match="transferencias"):
+        LocationService.move_stock(db, StockMovementCreate(
+            product_id=product.id, quantity=1, from_location_id=first.id, to_location_id=second.id))
+    with pytest.raises(ValueError, match="como lote"):
+        LocationService.move_stock(db, StockMovementCreate(product_id=product.id, quantity=1, to_location_id=first.id))
+    assert _lots(db, product) == {"L1": 3, "L2": 5}
+
+
+def test_reservation_commit_consumes_lots(db, lot_product):
+    product, first, second = lot_product
+    reservation = ReservationService.reserve(db, ReservationCreate(product_id=product.id, quantity=4))
+
+    with pytest.raises(ValueError, match="location_id"):
+        ReservationService.commit(db, reservation.id)
+    assert ReservationService.commit(db, reservation.id, second.id).status == "committed"
+
+    assert _lots(db, product) == {"L1": 5, "L2": 1}
+    db.expire_all()
+    product = db.get(Product, product.id)
+    assert (product.current_stock, product.reserved_stock) == (6, 0)
@@ -0,0 +1,69 @@
+# tests/test_reservation_service.py
+from datetime import timedelta
+
+import pytest
+
+from app.models.location import StockLocation
+from app.models.product import Product
+from app.models.reservation import Reservation
+from app.schemas.location import StockMovementCreate
+from app.schemas.product import ProductUpdate
+from app.schemas.reservation import ReservationCreate
+from app.services.location_service import LocationService
+from app.services.product_service import ProductService
+from app.services.reservation_service import ReservationService
+from app.utils.dates import utcnow
+
+
+@pytest.fixture
+def location(db):
+    location = StockLocation(code="W1", name="Almacén")
+    db.add(location)
+    db.commit()
+    return location
+
+
+def _reserve(db, product, quantity):
+    return ReservationService.reserve(db, ReservationCreate(product_id=product.id, quantity=quantity))
+
+
+def test_issue_cannot_consume_reserved_stock(db, make_product, location):
+    product = make_product("A1", current_stock=0)
+    LocationService.move_stock(db, StockMovementCreate(product_id=product.id, quantity=10, to_location_id=location.id))
+    reservation = _reserve(db, product, 10)
+
+    with pytest.raises(ValueError, match="reservas"):
+        LocationService.move_stock(db, StockMovementCreate(
+            product_id=product.id, quantity=10, from_location_id=location.id))
+
+    committed = ReservationService.commit(db, reservation.id, location.id)
+    assert committed.status == "committed"
+    db.expire_all()
+    product = db.get(Product, product.id)
+    assert (product.current_stock, product.reserved_stock) == (0, 0)
+
+
+def test_adjust_and_absolute_writes_respect_reservations(db, make_product):
+    product = make_product("A1", current_stock=100)
+    _reserve(db, product, 90)
+
+    with pytest.raises(ValueError, match="disponible 10"):
+        ProductService.adjust_stock(db, product.id, -11)
+    assert ProductService.adjust_stock(db, product.id, -10).available_stock == 0
+    with pytest.raises(ValueError, match="reservadas"):
+        ProductService.update_product(db, product.id, ProductUpdate(current_stock=50))
+    assert ProductService.update_product(db, product.id, ProductUpdate(current_stock=95)).available_stock == 5
+
+
+def test_expired_reservation_cannot_be_committed(db, make_product):
+    product = make_product("A1", current_stock=10)
+    reservation = _reserve(db, product, 4)
+    db.query(Reservation).filter(Reservation.id == reservation.id).update(
+        {Reservation.expires_at: utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    with pytest.raises(ValueError, match="expiró"):
+        ReservationService.commit(db, reservation.id)
+    db.expire_all()
+    assert db.get(Product, product.id).current_stock == 10
+    assert ReservationService.expire_due(db) == 1
@@ -0,0 +1,86 @@
+# tests/test_write_queue.py
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.product import Product
+from app.services.write_queue import WriteOutcomeUnknown, WriteQueue, writer_engine
+
+
+@pytest.fixture
+def write_queue(database_url):
+    engine = writer_engine(database_url)
+    queue = WriteQueue(sessionmaker(autocommit=False, autoflush=False, bind=engine), max_latency=0.01)
+    queue.start()
+    yield queue
+    queue.stop()
+    queue.join(5)
+    engine.dispose()
+
+
+def _add_product(code):
+    def operation(db):
+        product = Product(code=code, name=code, current_stock=1, min_stock=0)
+        db.add(product)
+        db.flush()
+        return product.id
+    return operation
+
+
+def _fail(db):
+    db.add(Product(code="BAD", name="BAD", current_stock=1, min_stock=0))
+    db.flush()
+    raise ValueError("falla la operación")
+
+
+def _codes(session_factory):
+    db = session_factory()
+    try:
+        return sorted(code for (code,) in db.query(Product.code))
+    finally:
+        db.close()
+
+
+def test_failed_operation_only_rolls_back_itself(write_queue, session_factory):
+    futures = [
+        write_queue.submit(_add_product("A1")),
+        write_queue.submit(_fail),
+        write_queue.submit(_add_product("B1")),
+    ]
+
+    assert isinstance(futures[0].result(5), int)
+    with pytest.raises(ValueError):
+        futures[1].result(5)
+    assert isinstance(futures[2].result(5), int)
+    assert _codes(session_factory) == ["A1", "B1"]
+
+
+def test_timeout_cancels_queued_operation_and_reports_running_one(write_queue, session_factory):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking(db):
+        started.set()
+        release.wait(5)
+        return _add_product("SLOW")(db)
+
+    # La operación ya tomada por el escritor no se puede cancelar: resultado desconocido
+    with pytest.raises(WriteOutcomeUnknown) as outcome:
+        write_queue.execute(blocking, timeout=0.2)
+    assert started.is_set()
+    assert write_queue.lookup(outcome.value.operation_id) is outcome.value.future
+
+    # La que sigue en cola se cancela: repetirla es seguro porque nunca se aplicará
+    with pytest.raises(TimeoutError) as timeout:
+        write_queue.execute(_add_product("QUEUED"), timeout=0.1)
+    assert not isinstance(timeout.value, WriteOutcomeUnknown)
+
+    release.set()
+    assert isinstance(outcome.value.future.result(5), int)
+    assert write_queue.execute(_add_product("AFTER"), timeout=5)
+    assert _codes(session_factory) == ["AFTER", "SLOW"]
+
+
+def test_lookup_unknown_operation(write_queue):
+    assert write_queue.lookup("no-existe") is None